@@ -0,0 +1,80 @@
+"""
+Memoized AI gap analysis, keyed by the set of missing required sections
+
+The gap analysis prompt is built from the missing section names and the
+chunks retrieved for them, and retrieval depends only on those names and
+the knowledge base. So with per-file evidence left out of the prompt, the
+analysis is a function of the missing-section set: 2^5 = 32 sets for the
+five required sections. Entries are keyed by the sorted set, the knowledge
+base version and the model, never expire, and can be generated for every
+set ahead of time with scripts/prewarm_ai_analysis.py. Rebuilding the
+vector store changes its version (and clears the memo), so stale analyses
+are never served.
+
+The memo is opt-in: leaving the section evidence out of the prompt trades
+analyses that cite where each section was found for fewer LLM calls.
+
+Configuration (environment):
+    AI_ANALYSIS_MEMO_ENABLED  - "1"/"true" enables the memo; prompts then leave
+                                out per-file section evidence (default: disabled)
+    AI_ANALYSIS_MEMO_PATH     - SQLite file (default: data/cache/ai_analysis.sqlite3)
+"""
+import os
+import itertools
+import logging
+from typing import Dict, Iterable, Iterator, Optional
+
+from .llm_cache import LLMCache, _env_flag, make_cache_key
+from .knowledge_base import knowledge_base_version
+from .nemotron_llm import NEMOTRON_MODEL
+
+logger = logging.getLogger(__name__)
+
+# Bump when build_ai_analysis_prompt changes
+PROMPT_VERSION = 1
+
+def missing_section_sets(sections: Dict[str, str]) -> Iterator[Dict[str, str]]:
+    """Every non-empty subset of sections, as missing_sections dicts in section order"""
+    names = list(sections)
+    for size in range(1, len(names) + 1):
+        for subset in itertools.combinations(names, size):
+            yield {name: sections[name] for name in subset}
+
+class AIAnalysisMemo:
+    """Missing-section set + knowledge base version -> AI analysis text"""
+
+    def __init__(self, store: LLMCache, model: Optional[str] = None, kb_version=knowledge_base_version):
+        self.store = store
+        self.model = model
+        self._kb_version = kb_version
+
+    @property
+    def enabled(self) -> bool:
+        return self.store.enabled
+
+    def key(self, missing_sections: Iterable[str]) -> str:
+        sections = "|".join(sorted(missing_sections))
+        return make_cache_key(self.model or "", sections, kb_version=self._kb_version(), prompt_version=PROMPT_VERSION)
+
+    def get(self, missing_sections: Iterable[str]) -> Optional[str]:
+        return self.store.get(self.key(missing_sections))
+
+    def put(self, missing_sections: Iterable[str], analysis: str) -> None:
+        self.store.set(self.key(missing_sections), analysis)
+
+    def clear(self) -> None:
+        self.store.clear()
+
+    def stats(self) -> Dict:
+        return self.store.stats()
+
+# Shared memo used by agent.run
+ai_analysis_memo = AIAnalysisMemo(
+    LLMCache(
+        path=os.getenv("AI_ANALYSIS_MEMO_PATH", "data/cache/ai_analysis.sqlite3"),
+        ttl_seconds=0,
+        max_memory_entries=64,
+        enabled=_env_flag("AI_ANALYSIS_MEMO_ENABLED", False)
+    ),
+    model=NEMOTRON_MODEL
+)
@@ -0,0 +1,274 @@
+"""
+Content-addressed cache of generated report artifacts
+
+Downloading a report again re-renders the same PDF from the same analysis
+payload: the frontend refetches /api/generate-pdf on every view and
+Streamlit on every click. Generated PDFs and rendered Markdown reports are
+instead kept as files keyed by the SHA-256 of everything that goes into
+them (the payload, the date printed on the report and a fingerprint of the
+rendering code), so a cached PDF is streamed straight from disk. The key
+doubles as the HTTP ETag of the artifact. Once the directory grows past
+its size budget, least recently used artifacts are removed first.
+
+Callers that read an artifact after the cache call returns (e.g. a
+FileResponse streaming it) check it out: they get a private hard link,
+which stays readable even if eviction removes the artifact meanwhile, and
+delete it when done.
+
+Configuration (environment):
+    ARTIFACT_CACHE_ENABLED    - "0"/"false" disables caching (default: enabled)
+    ARTIFACT_CACHE_DIR        - directory (default: data/cache/artifacts)
+    ARTIFACT_CACHE_MAX_BYTES  - size budget (default: 256MB)
+"""
+import os
+import re
+import json
+import uuid
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+from .llm_cache import _env_flag
+
+logger = logging.getLogger(__name__)
+
+# Bump when artifacts change for the same payload in a way the renderer
+# fingerprint does not capture
+ARTIFACT_VERSION = 1
+
+_ARTIFACT_NAME = re.compile(r'[0-9a-f]{64}\.\w+')
+
+@lru_cache(maxsize=None)
+def source_fingerprint(path: str) -> str:
+    """SHA-256 of a renderer's source file, so code changes invalidate its artifacts"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def artifact_key(kind: str, payload, renderer: str = "") -> str:
+    """
+    Build a content-addressed artifact key
+
+    Args:
+        kind: Artifact type ("pdf", "md")
+        payload: JSON-serializable inputs the artifact is rendered from
+        renderer: Fingerprint of the rendering code
+
+    Returns:
+        Hex SHA-256 digest identifying the artifact
+    """
+    data = json.dumps({"kind": kind, "version": ARTIFACT_VERSION, "renderer": renderer, "payload": payload},
+                      sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def compliance_pdf_key(report_data: Dict) -> str:
+    """Key of the PDF utils.pdf_generator renders for report_data today (the report shows the date)"""
+    from utils import pdf_generator
+
+    return artifact_key("pdf", {"report": report_data, "date": date.today().isoformat()},
+                        source_fingerprint(pdf_generator.__file__))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+class ArtifactCache:
+    """Size-bounded directory of rendered artifacts named by content key"""
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def get(self, key: str, suffix: str) -> Optional[str]:
+        """Return the path of a cached artifact, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        path = self.path(key, suffix)
+        try:
+            os.utime(path)  # mark as recently used for eviction
+        except FileNotFoundError:
+            path = None
+        with self._lock:
+            self._counters["hits" if path else "misses"] += 1
+        return path
+
+    def _link_private(self, path: str, suffix: str) -> Optional[str]:
+        """Hard-link path to a new private name (copy without hard links); None if path is gone"""
+        private = os.path.join(self.directory, f".checkout-{uuid.uuid4().hex}{suffix}")
+        try:
+            os.link(path, private)
+        except FileNotFoundError:
+            return None
+        except OSError:  # filesystem without hard links
+            try:
+                shutil.copyfile(path, private)
+            except FileNotFoundError:
+                return None
+        return private
+
+    def checkout(self, key: str, suffix: str) -> Optional[str]:
+        """
+        Return a private path to a cached artifact, or None on a miss
+
+        The path is a hard link that eviction never removes, so it can be
+        read after this returns; the caller owns it and deletes it when done.
+        """
+        if not self.enabled:
+            return None
+
+        private = self._link_private(self.path(key, suffix), suffix)
+        if private is not None:
+            os.utime(private)  # same file: marks the artifact as recently used
+        with self._lock:
+            self._counters["hits" if private else "misses"] += 1
+        return private
+
+    def put(self, key: str, suffix: str, source: str) -> str:
+        """
+        Move a rendered file into the cache and return its cached path
+
+        source should be in render_directory() so the move is a rename.
+        With the cache disabled the file is left where it is and source is
+        returned; the caller still owns it.
+        """
+        if not self.enabled:
+            return source
+
+        path = self.path(key, suffix)
+        os.replace(source, path)
+        with self._lock:
+            self._counters["writes"] += 1
+            self._evict(keep=path)
+        return path
+
+    def put_and_checkout(self, key: str, suffix: str, source: str) -> str:
+        """
+        Store a rendered file like put(), returning a private path to it
+        like checkout(); the caller owns and deletes the returned path
+
+        With the cache disabled, source itself is returned.
+        """
+        if not self.enabled:
+            return source
+        private = self._link_private(source, suffix)
+        self.put(key, suffix, source)
+        return private
+
+    def render_directory(self) -> Optional[str]:
+        """Directory to render new artifacts into before put(); None (the system temporary directory) when disabled"""
+        if not self.enabled:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        return self.directory
+
+    def get_or_create(self, key: str, suffix: str, create: Callable[[Optional[str]], str]) -> str:
+        """
+        Check out the cached artifact, calling create(directory) to render
+        it into a new file in directory on a miss
+
+        The caller owns the returned path and deletes it when done, whether
+        or not the cache is enabled.
+        """
+        path = self.checkout(key, suffix)
+        if path is not None:
+            return path
+        return self.put_and_checkout(key, suffix, create(self.render_directory()))
+
+    def get_text(self, key: str, suffix: str) -> Optional[str]:
+        """Return a cached text artifact, or None on a miss"""
+        path = self.get(key, suffix)
+        if path is None:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:  # evicted since get()
+            return None
+
+    def put_text(self, key: str, suffix: str, text: str) -> None:
+        """Store a text artifact"""
+        if not self.enabled:
+            return
+        fd, tmp_path = tempfile.mkstemp(prefix=".artifact-", suffix=suffix, dir=self.render_directory())
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        self.put(key, suffix, tmp_path)
+
+    def _artifacts(self):
+        """(last used, size, path) of every cached artifact"""
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return []
+        artifacts = []
+        for entry in entries:
+            if not _ARTIFACT_NAME.fullmatch(entry.name):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # removed by another process
+                continue
+            artifacts.append((stat.st_mtime, stat.st_size, entry.path))
+        return artifacts
+
+    def _evict(self, keep: str) -> None:
+        """Remove least recently used artifacts until the directory is under its size budget"""
+        artifacts = self._artifacts()
+        total = sum(size for _, size, _ in artifacts)
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(artifacts):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """Remove every cached artifact"""
+        with self._lock:
+            for _, _, path in self._artifacts():
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and directory size"""
+        with self._lock:
+            stats = dict(self._counters)
+        artifacts = self._artifacts()
+        stats["enabled"] = self.enabled
+        stats["entries"] = len(artifacts)
+        stats["bytes"] = sum(size for _, size, _ in artifacts)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+# Shared cache used by the PDF endpoint, Streamlit and the analysis pipeline
+artifact_cache = ArtifactCache(
+    directory=os.getenv("ARTIFACT_CACHE_DIR", "data/cache/artifacts"),
+    max_bytes=int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    enabled=_env_flag("ARTIFACT_CACHE_ENABLED", True)
+)
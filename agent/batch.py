@@ -0,0 +1,260 @@
+"""
+Batch analysis of many LDT submissions
+
+Files are analyzed concurrently and one NDJSON record is produced per file
+as soon as it finishes, followed by a summary record with throughput:
+
+- extraction runs on the process pool, several files at a time; with
+  --detect-only, PDFs are only read until every section has been found
+- retrieval runs once per distinct set of missing sections and is shared
+  by every file with that set
+- the AI analysis is generated once per distinct set of missing sections;
+  files with the same gaps share it. The batch prompt leaves out per-file
+  section evidence so it can be shared (the evidence is still in each
+  file's report and section_locations)
+
+Usage:
+    python -m agent.batch submissions/ > results.ndjson
+    python -m agent.batch submissions.zip --detect-only
+
+Configuration (environment):
+    BATCH_CONCURRENCY  - files analyzed at once (default: LDT_PROCESS_WORKERS)
+    BATCH_MAX_FILES    - files accepted per batch (default: 100)
+    BATCH_MAX_BYTES    - total document bytes per uploaded batch, after zip
+                         expansion (default: 200MB)
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import zipfile
+import logging
+import argparse
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .run import (
+    AnalysisPipeline, AnalysisResult, ExtractionError, analysis_pipeline,
+    generate_ai_analysis_async, timed
+)
+from .executors import PROCESS_WORKERS, run_in_thread, shutdown_executors
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('pdf', 'docx', 'doc', 'txt', 'json', 'xml')
+MAX_FILE_BYTES = 10 * 1024 * 1024
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "100"))
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", 200 * 1024 * 1024))
+
+def is_supported(filename: str) -> bool:
+    return '.' in filename and filename.rsplit('.', 1)[-1].lower() in SUPPORTED_EXTENSIONS
+
+def expand_zip(content: bytes, max_files: int = BATCH_MAX_FILES,
+               max_bytes: Optional[int] = None) -> List[Tuple[str, bytes]]:
+    """
+    Return the supported documents inside a zip archive
+
+    Members that are too large are returned empty so they are reported as
+    failures instead of being decompressed.
+
+    Raises:
+        ValueError: If the archive is invalid, holds more than max_files
+            documents or would decompress to more than max_bytes
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Invalid zip archive: {e}")
+
+    members = [info for info in archive.infolist()
+               if not info.is_dir() and not info.filename.startswith("__MACOSX/") and is_supported(info.filename)]
+    if len(members) > max_files:
+        raise ValueError(f"Archive holds {len(members)} documents; the limit is {max_files}")
+    total = sum(info.file_size for info in members if info.file_size <= MAX_FILE_BYTES)
+    if max_bytes is not None and total > max_bytes:
+        raise ValueError(f"Archive expands to {total // (1024 * 1024)}MB of documents; "
+                         f"the limit is {max_bytes // (1024 * 1024)}MB")
+    return [(info.filename, archive.read(info) if info.file_size <= MAX_FILE_BYTES else b"")
+            for info in members]
+
+def load_batch(path: str) -> List[Tuple[str, bytes]]:
+    """Read every supported document in a directory (recursively) or zip file"""
+    if os.path.isfile(path):
+        with open(path, 'rb') as f:
+            return expand_zip(f.read())
+
+    files = []
+    for root, _, names in os.walk(path):
+        for name in sorted(names):
+            if is_supported(name):
+                file_path = os.path.join(root, name)
+                with open(file_path, 'rb') as f:
+                    files.append((os.path.relpath(file_path, path), f.read()))
+    return files
+
+def result_record(result: AnalysisResult, detect_only: bool = False) -> Dict:
+    """NDJSON record for one analyzed file"""
+    analysis = result.analysis
+    record = {
+        "filename": result.filename,
+        "status": "succeeded",
+        "score": analysis['completeness_score'],
+        "missing_sections": analysis['missing_required'],
+        "missing_recommended": analysis['missing_recommended'],
+        "present_sections": analysis['present_sections'],
+        "section_locations": analysis.get('section_locations', {}),
+        "extraction_truncated": analysis.get('extraction_truncated'),
+        "timings": result.timings
+    }
+    if not detect_only:
+        record.update({
+            "executive_summary": result.executive_summary,
+            "ai_analysis": result.ai_analysis,
+            "report_markdown": result.report_markdown
+        })
+    return record
+
+class BatchAnalyzer:
+    """
+    Analyze many files concurrently, sharing retrieval and LLM calls
+
+    One instance serves one batch: shared results are kept for the lifetime
+    of the instance.
+    """
+
+    def __init__(self, pipeline: AnalysisPipeline = analysis_pipeline,
+                 concurrency: Optional[int] = None, detect_only: bool = False):
+        self.pipeline = pipeline
+        self.concurrency = concurrency or int(os.getenv("BATCH_CONCURRENCY", PROCESS_WORKERS))
+        self.detect_only = detect_only
+        self._retrievals: Dict[Tuple[str, ...], asyncio.Future] = {}
+        self._generations: Dict[Tuple[str, ...], asyncio.Future] = {}
+        self.counters = {"retrievals": 0, "retrievals_shared": 0, "llm_calls": 0, "llm_calls_shared": 0}
+
+    async def _shared(self, memo: Dict, key: Tuple[str, ...], counter: str,
+                      factory: Callable[[], Awaitable]):
+        """Run factory once per key; concurrent and later callers await the same result"""
+        future = memo.get(key)
+        if future is None:
+            future = memo[key] = asyncio.ensure_future(factory())
+            self.counters[counter] += 1
+        else:
+            self.counters[f"{counter}_shared"] += 1
+        return await asyncio.shield(future)
+
+    async def analyze_file(self, filename: str, file_content: bytes) -> AnalysisResult:
+        """Run the pipeline stages for one file"""
+        if len(file_content) > MAX_FILE_BYTES or not file_content:
+            raise ExtractionError(f"{filename} is empty or larger than {MAX_FILE_BYTES // (1024 * 1024)}MB")
+        timings = {}
+        text, analysis = await self.pipeline.extract_and_analyze_async(file_content, filename, timings,
+                                                                       detect_only=self.detect_only)
+        if self.detect_only:
+            return AnalysisResult(filename, text, analysis, [], "", "", "", timings)
+
+        missing = analysis['missing_required']
+        key = tuple(missing)
+        with timed(timings, "retrieve"):
+            context_chunks = await self._shared(
+                self._retrievals, key, "retrievals",
+                lambda: run_in_thread(self.pipeline.retrieve, analysis)
+            )
+        with timed(timings, "summarize"):
+            executive_summary = self.pipeline.summarize(analysis, context_chunks)
+        with timed(timings, "generate"):
+            if missing:
+                ai_analysis = await self._shared(
+                    self._generations, key, "llm_calls",
+                    lambda: generate_ai_analysis_async(missing, context_chunks)
+                )
+            else:
+                ai_analysis = await generate_ai_analysis_async(missing, context_chunks)
+        with timed(timings, "render"):
+            report_markdown = await run_in_thread(
+                self.pipeline.render, analysis, executive_summary, ai_analysis, context_chunks
+            )
+        return AnalysisResult(filename, text, analysis, context_chunks,
+                              executive_summary, ai_analysis, report_markdown, timings)
+
+    async def run(self, files: Iterable[Tuple[str, bytes]]) -> AsyncIterator[Dict]:
+        """
+        Analyze files, yielding one record per file in completion order and
+        then {"summary": {...}} with counts and throughput
+        """
+        files = list(files)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+
+        async def analyze(filename: str, file_content: bytes) -> Dict:
+            async with semaphore:
+                try:
+                    return result_record(await self.analyze_file(filename, file_content), self.detect_only)
+                except Exception as e:
+                    logger.error(f"❌ Batch analysis failed for {filename}: {e}")
+                    return {"filename": filename, "status": "failed", "detail": str(e)}
+
+        succeeded = failed = 0
+        tasks = [asyncio.ensure_future(analyze(filename, content)) for filename, content in files]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                record = await next_done
+                if record["status"] == "succeeded":
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield record
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        seconds = time.perf_counter() - start
+        yield {"summary": {
+            "files": len(files),
+            "succeeded": succeeded,
+            "failed": failed,
+            "seconds": round(seconds, 3),
+            "files_per_second": round(len(files) / seconds, 2) if seconds else 0.0,
+            "megabytes": round(sum(len(content) for _, content in files) / (1024 * 1024), 2),
+            "detect_only": self.detect_only,
+            "distinct_missing_sets": len(self._retrievals),
+            **self.counters
+        }}
+
+def analyze_batch(files: Iterable[Tuple[str, bytes]], detect_only: bool = False,
+                  concurrency: Optional[int] = None) -> AsyncIterator[Dict]:
+    """Analyze a batch of (filename, bytes) pairs, yielding NDJSON-ready records"""
+    return BatchAnalyzer(concurrency=concurrency, detect_only=detect_only).run(files)
+
+async def _write_ndjson(files: List[Tuple[str, bytes]], output, detect_only: bool, concurrency: Optional[int]) -> None:
+    async for record in analyze_batch(files, detect_only, concurrency):
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a directory or zip of LDT submissions, writing NDJSON")
+    parser.add_argument("path", help="Directory (searched recursively) or .zip of submissions")
+    parser.add_argument("--output", "-o", help="NDJSON output file (default: stdout)")
+    parser.add_argument("--detect-only", action="store_true",
+                        help="Only extract and detect sections; skip retrieval and AI analysis")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Files analyzed at once (default: BATCH_CONCURRENCY or CPU count)")
+    args = parser.parse_args(argv)
+
+    try:
+        files = load_batch(args.path)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not files:
+        parser.error(f"No supported documents ({', '.join(SUPPORTED_EXTENSIONS)}) found in {args.path}")
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        asyncio.run(_write_ndjson(files, output, args.detect_only, args.concurrency))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        shutdown_executors()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Query embedding cache for the knowledge base
+
+Gap analysis queries the vector store with the same handful of section names
+and the Q&A assistant with the same sample questions, so their embeddings are
+cached instead of re-running the sentence-transformers encoder per request.
+
+Vectors are float32 NumPy arrays keyed by normalized query text. Entries
+loaded from the precomputed file next to the vector store are pinned; vectors
+computed at runtime live in an LRU of bounded size. Persisted runtime
+entries go to their own file, never into the built store, and are loaded
+back into the LRU.
+
+Configuration (environment):
+    QUERY_EMBEDDING_CACHE_ENTRIES  - runtime LRU capacity (default: 1024)
+    QUERY_EMBEDDING_CACHE_PERSIST  - "1"/"true" saves runtime entries on shutdown
+                                     and reloads them on start (default: off)
+    QUERY_EMBEDDING_CACHE_PATH     - runtime entries file (default: data/cache/query_embeddings.npz)
+"""
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .llm_cache import _env_flag
+
+logger = logging.getLogger(__name__)
+
+QUERY_EMBEDDINGS_FILE = "query_embeddings.npz"
+
+_WHITESPACE = re.compile(r"\s+")
+
+def persist_enabled() -> bool:
+    """Whether runtime query embeddings are saved on shutdown and reloaded on start"""
+    return _env_flag("QUERY_EMBEDDING_CACHE_PERSIST", False)
+
+def runtime_embeddings_path() -> str:
+    """File that persisted runtime query embeddings are kept in"""
+    return os.getenv("QUERY_EMBEDDING_CACHE_PATH", "data/cache/query_embeddings.npz")
+
+def normalize_query(text: str) -> str:
+    """Normalize query text for cache lookups (case and whitespace insensitive)"""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+def precomputed_queries() -> List[str]:
+    """Queries whose embeddings are computed when the vector store is built"""
+    from .gap_critic import REQUIRED_SECTIONS, RECOMMENDED_SECTIONS
+    from .sample_questions import SAMPLE_QUESTIONS
+
+    return list(REQUIRED_SECTIONS) + list(RECOMMENDED_SECTIONS) + list(SAMPLE_QUESTIONS)
+
+class QueryEmbeddingCache:
+    """Pinned + LRU cache of float32 query embeddings"""
+
+    def __init__(self, max_entries: int = 1024, model: Optional[str] = None):
+        self.max_entries = max_entries
+        self.model = model
+
+        self._lock = threading.Lock()
+        self._pinned: Dict[str, np.ndarray] = {}
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached vector for text, or None on a miss"""
+        key = normalize_query(text)
+        with self._lock:
+            vector = self._pinned.get(key)
+            if vector is None:
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+            self._counters["hits" if vector is not None else "misses"] += 1
+            return vector
+
+    def put(self, text: str, vector, pinned: bool = False) -> None:
+        """Store a vector, pinned entries are never evicted"""
+        key = normalize_query(text)
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if pinned:
+                self._pinned[key] = vector
+                self._lru.pop(key, None)
+                return
+            if key in self._pinned:
+                return
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def load(self, path: str, pinned: bool = True) -> int:
+        """
+        Load vectors saved by save()
+
+        Args:
+            path: .npz file
+            pinned: Pin the vectors (precomputed files) or add them to the
+                LRU (runtime files); at most max_entries are kept in the LRU
+
+        Returns:
+            Number of vectors loaded (0 if the file is missing or was built
+            with a different embedding model)
+        """
+        if not os.path.exists(path):
+            return 0
+        with np.load(path, allow_pickle=False) as data:
+            model = str(data["model"]) if "model" in data else None
+            if self.model and model and model != self.model:
+                logger.warning(f"Ignoring {path}: built with {model}, expected {self.model}")
+                return 0
+            texts, vectors = data["texts"], data["vectors"]
+            if not pinned:
+                # Saved least recently used first: keep the most recent
+                start = max(len(texts) - self.max_entries, 0)
+                texts, vectors = texts[start:], vectors[start:]
+            for text, vector in zip(texts, vectors):
+                self.put(str(text), vector, pinned=pinned)
+        return len(texts)
+
+    def save(self, path: str, pinned: bool = True) -> int:
+        """
+        Write the pinned vectors, or the LRU's vectors from least to most
+        recently used, to an .npz file atomically
+
+        Returns:
+            Number of vectors written
+        """
+        with self._lock:
+            entries = dict(self._pinned) if pinned else OrderedDict(self._lru)
+        if not entries:
+            return 0
+
+        texts = np.array(list(entries), dtype=str)
+        vectors = np.stack(list(entries.values())).astype(np.float32)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, texts=texts, vectors=vectors, model=np.array(self.model or ""))
+        os.replace(tmp_path, path)
+        return len(texts)
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and entry counts"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["pinned_entries"] = len(self._pinned)
+            stats["lru_entries"] = len(self._lru)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves query vectors from a QueryEmbeddingCache
+
+    Only queries are cached; embed_documents passes through so indexing
+    corpus chunks never fills the cache.
+    """
+
+    def __init__(self, base: Embeddings, cache: Optional[QueryEmbeddingCache] = None):
+        self.base = base
+        self.cache = cache or QueryEmbeddingCache()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = np.asarray(self.base.embed_query(text), dtype=np.float32)
+            self.cache.put(text, vector)
+        return vector.tolist()
+
+    def embed_queries(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Embed several queries, encoding only cache misses in one batch
+
+        Returns:
+            float32 matrix with one row per query
+        """
+        texts = list(texts)
+        vectors = [self.cache.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.base.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                vectors[i] = np.asarray(vector, dtype=np.float32)
+                self.cache.put(texts[i], vectors[i])
+        return np.vstack(vectors).astype(np.float32)
+
+def precompute_query_embeddings(embeddings: Embeddings, store_path: str, model: Optional[str] = None) -> int:
+    """
+    Embed every section name and sample question and save them next to the store
+
+    Args:
+        embeddings: Embedding model used to build the store
+        store_path: Vector store directory
+        model: Embedding model name recorded in the file
+
+    Returns:
+        Number of vectors written
+    """
+    queries = precomputed_queries()
+    cache = QueryEmbeddingCache(model=model)
+    for text, vector in zip(queries, embeddings.embed_documents(queries)):
+        cache.put(text, vector, pinned=True)
+    return cache.save(os.path.join(store_path, QUERY_EMBEDDINGS_FILE))
@@ -0,0 +1,78 @@
+"""
+Bounded executors for blocking work done on behalf of the API server
+
+FastAPI handlers are coroutines, so anything that blocks (PDF parsing,
+FAISS search, synchronous LLM calls, ReportLab rendering) must be moved
+off the event loop. Thread workers handle I/O-bound and GIL-releasing
+work; process workers handle pure-Python CPU work such as PyPDF2 parsing
+and PDF rendering.
+
+Pool sizes are read from the environment:
+    LDT_THREAD_WORKERS   - thread pool size (default: min(32, cpu_count + 4))
+    LDT_PROCESS_WORKERS  - process pool size (default: cpu_count)
+"""
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_cpu_count = os.cpu_count() or 1
+
+THREAD_WORKERS = int(os.getenv("LDT_THREAD_WORKERS", min(32, _cpu_count + 4)))
+PROCESS_WORKERS = int(os.getenv("LDT_PROCESS_WORKERS", _cpu_count))
+
+_lock = threading.Lock()
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Return the shared thread pool, creating it on first use"""
+    global _thread_pool
+    with _lock:
+        if _thread_pool is None:
+            logger.info(f"🧵 Starting thread pool with {THREAD_WORKERS} workers")
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=THREAD_WORKERS,
+                thread_name_prefix="ldt-worker"
+            )
+        return _thread_pool
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool, creating it on first use"""
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            logger.info(f"⚙️ Starting process pool with {PROCESS_WORKERS} workers")
+            _process_pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS)
+        return _process_pool
+
+async def run_in_thread(func: Callable, *args, **kwargs):
+    """Run a blocking callable on the shared thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_thread_pool(), partial(func, *args, **kwargs))
+
+async def run_in_process(func: Callable, *args, **kwargs):
+    """
+    Run a CPU-bound callable on the shared process pool
+
+    The callable and its arguments must be picklable, i.e. a module-level
+    function with plain data arguments.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), partial(func, *args, **kwargs))
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down both pools; they are recreated lazily if used again"""
+    global _thread_pool, _process_pool
+    with _lock:
+        if _thread_pool is not None:
+            _thread_pool.shutdown(wait=wait)
+            _thread_pool = None
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=wait)
+            _process_pool = None
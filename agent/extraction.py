@@ -0,0 +1,266 @@
+"""
+Text extraction for uploaded LDT submissions
+
+Kept free of heavy imports (knowledge base, LLM client) so that it can be
+run inside process pool workers without re-loading the vector store.
+
+PDFs are read page by page through iter_pdf_pages() using the backend
+selected in agent.pdf_backends, with a per-document page and time budget:
+    EXTRACTION_MAX_PAGES    - pages read per upload (default: 500, 0 = unlimited)
+    EXTRACTION_MAX_SECONDS  - seconds spent per upload (default: 60, 0 = unlimited)
+
+Results are cached by content hash (see agent.extraction_cache): identical
+re-uploads return the cached document, and PDF pages unchanged since an
+earlier upload are not extracted again.
+
+detect_document() is the detection-only path: pages are fed to section
+detection as they are extracted, the text is not kept, and reading stops
+once every section has been seen.
+"""
+import io
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .gap_critic import detect_sections
+from .pdf_backends import open_pdf, page_fingerprints, resolve_backends
+from .extraction_cache import ExtractionCache, extraction_cache, content_digest, file_kind
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ExtractionBudget:
+    """
+    Page and time limits for one document
+    
+    exceeded is set to a short reason by iter_pdf_pages() when extraction
+    stops early because a limit was reached.
+    """
+    max_pages: Optional[int] = None
+    max_seconds: Optional[float] = None
+    exceeded: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "ExtractionBudget":
+        max_pages = int(os.getenv("EXTRACTION_MAX_PAGES", "500"))
+        max_seconds = float(os.getenv("EXTRACTION_MAX_SECONDS", "60"))
+        return cls(max_pages=max_pages or None, max_seconds=max_seconds or None)
+
+@dataclass
+class ExtractedDocument:
+    """Extracted text plus the character offset at which each PDF page starts"""
+    text: str
+    page_starts: List[int] = field(default_factory=list)
+    truncated: Optional[str] = None
+
+def iter_pdf_pages(source, budget: Optional[ExtractionBudget] = None,
+                   backend: Optional[str] = None,
+                   cache: Optional[ExtractionCache] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page_no, text) for each PDF page, one page at a time
+    
+    Args:
+        source: PDF bytes, a file path or a binary file object
+        budget: Optional page/time limits; extraction stops (and
+            budget.exceeded is set) once either is reached
+        backend: PDF backend name or "auto" (default: PDF_BACKEND or "auto")
+        cache: Page cache; pages whose fingerprint is cached are not
+            extracted again and newly extracted pages are added. Pages are
+            cached under the requested backend, also when another backend
+            had to open the document, so the next upload finds them
+    
+    Yields:
+        1-based page number and that page's text
+    """
+    fingerprints = None
+    cached = {}
+    if cache is not None and cache.enabled:
+        try:
+            fingerprints = page_fingerprints(source)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not fingerprint PDF pages, page cache not used: {e}")
+        else:
+            requested = resolve_backends(backend)[0].name
+            cached = cache.get_pages(fingerprints, requested)
+    
+    if fingerprints is not None and len(cached) == len(fingerprints):
+        # Every page is cached: the document is never opened by a backend
+        total_pages, pages = len(fingerprints), iter(())
+    else:
+        _, total_pages, pages = open_pdf(source, backend, skip=cached)
+        if fingerprints is not None:
+            total_pages = len(fingerprints)
+    if cached:
+        logger.info(f"Reusing {len(cached)} of {total_pages} cached PDF pages")
+    of_total = f" of {total_pages}" if total_pages is not None else ""
+    start = time.perf_counter()
+    
+    index = 0
+    while total_pages is None or index < total_pages:
+        page_text = cached.get(index)
+        if page_text is None:
+            page_text = next(pages, None)
+            if page_text is None:
+                return
+            if fingerprints is not None:
+                cache.put_page(fingerprints[index], requested, page_text)
+        if budget is not None:
+            if budget.max_pages is not None and index >= budget.max_pages:
+                budget.exceeded = f"page limit of {budget.max_pages} reached"
+                if total_pages is not None:
+                    budget.exceeded += f" ({total_pages} pages)"
+            elif budget.max_seconds is not None and time.perf_counter() - start > budget.max_seconds:
+                budget.exceeded = f"time limit of {budget.max_seconds:g}s reached after {index}{of_total} pages"
+            if budget.exceeded:
+                logger.warning(f"⚠️  Stopped PDF extraction early: {budget.exceeded}")
+                if hasattr(pages, "close"):
+                    pages.close()
+                return
+        yield index + 1, page_text
+        index += 1
+
+def cached_document(file_content: bytes, filename: str,
+                    budget: Optional[ExtractionBudget] = None,
+                    pdf_backend: Optional[str] = None,
+                    cache: Optional[ExtractionCache] = None) -> Optional[ExtractedDocument]:
+    """
+    Return the cached extraction of an identical earlier upload, if any
+    
+    Cheap enough to call before handing extraction to a worker process.
+    A cached PDF with more pages than the budget allows is not returned.
+    """
+    cache = cache or extraction_cache
+    if not cache.enabled:
+        return None
+    kind = file_kind(filename)
+    try:
+        backend = resolve_backends(pdf_backend)[0].name if kind == "pdf" else ""
+    except ValueError:
+        return None
+    cached = cache.get_document(content_digest(file_content), kind, backend)
+    if cached is None:
+        return None
+    budget = budget or ExtractionBudget.from_env()
+    if kind == "pdf" and budget.max_pages is not None and len(cached["page_starts"]) > budget.max_pages:
+        return None
+    return ExtractedDocument(cached["text"], cached["page_starts"])
+
+def extract_document(file_content: bytes, filename: str,
+                     budget: Optional[ExtractionBudget] = None,
+                     pdf_backend: Optional[str] = None,
+                     cache: Optional[ExtractionCache] = None) -> ExtractedDocument:
+    """
+    Extract text from uploaded file based on file type, recording page offsets
+    
+    Args:
+        file_content: Raw file bytes
+        filename: Name of the uploaded file
+        budget: PDF page/time limits (default: from the environment)
+        pdf_backend: PDF backend name or "auto" (default: PDF_BACKEND or "auto")
+        cache: Extraction cache (default: the shared extraction_cache)
+    
+    Returns:
+        ExtractedDocument; page_starts is empty for formats without pages and
+        truncated explains why extraction stopped early, if it did
+    """
+    cache = cache or extraction_cache
+    try:
+        budget = budget or ExtractionBudget.from_env()
+        document = cached_document(file_content, filename, budget, pdf_backend, cache)
+        if document is not None:
+            return document
+        
+        kind = file_kind(filename)
+        if kind == "pdf":
+            pages = []
+            page_starts = []
+            offset = 0
+            for _, page_text in iter_pdf_pages(file_content, budget, pdf_backend, cache):
+                page_starts.append(offset)
+                pages.append(page_text + "\n")
+                offset += len(page_text) + 1
+            document = ExtractedDocument("".join(pages), page_starts, budget.exceeded)
+            
+        elif kind == "docx":
+            from docx import Document
+            
+            doc = Document(io.BytesIO(file_content))
+            document = ExtractedDocument("".join(paragraph.text + "\n" for paragraph in doc.paragraphs))
+        
+        else:
+            # Plain text, or anything else decoded as text
+            document = ExtractedDocument(file_content.decode('utf-8', errors='ignore'))
+        
+        # Truncated extractions depend on the budget, so only complete ones are cached
+        if cache.enabled and document.truncated is None:
+            backend = resolve_backends(pdf_backend)[0].name if kind == "pdf" else ""
+            cache.put_document(content_digest(file_content), kind, backend, document.text, document.page_starts)
+        return document
+            
+    except Exception as e:
+        return ExtractedDocument(f"Error extracting text from {filename}: {e}")
+
+def document_pages(document: ExtractedDocument) -> Iterator[Tuple[int, str]]:
+    """Yield (page_no, text) for each page of an extracted document (one page without page data)"""
+    starts = document.page_starts or [0]
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else len(document.text)
+        yield index + 1, document.text[start:end]
+
+def detect_document(file_content: bytes, filename: str,
+                    budget: Optional[ExtractionBudget] = None,
+                    pdf_backend: Optional[str] = None,
+                    cache: Optional[ExtractionCache] = None) -> Dict:
+    """
+    Detect which sections an upload contains without extracting all of it
+    
+    A cached extraction is used when there is one. Otherwise PDF pages are
+    streamed into detect_sections(), which stops reading once every section
+    has been found; other formats are extracted and scanned as one page.
+    
+    Args:
+        file_content: Raw file bytes
+        filename: Name of the uploaded file
+        budget: PDF page/time limits (default: from the environment)
+        pdf_backend: PDF backend name or "auto" (default: PDF_BACKEND or "auto")
+        cache: Extraction cache (default: the shared extraction_cache)
+    
+    Returns:
+        detect_sections() result plus truncated, the reason extraction
+        stopped at the budget, if it did
+    
+    Raises:
+        ValueError: If no text could be extracted
+    """
+    cache = cache or extraction_cache
+    budget = budget or ExtractionBudget.from_env()
+    document = cached_document(file_content, filename, budget, pdf_backend, cache)
+    if document is None and file_kind(filename) == "pdf":
+        pages = iter_pdf_pages(file_content, budget, pdf_backend, cache)
+    else:
+        document = document or extract_document(file_content, filename, budget, pdf_backend, cache)
+        if document.text.startswith("Error"):
+            raise ValueError(document.text)
+        pages = document_pages(document)
+    
+    try:
+        result = detect_sections(pages)
+    except Exception as e:
+        raise ValueError(f"Error extracting text from {filename}: {e}")
+    result["truncated"] = budget.exceeded
+    return result
+
+def extract_text_from_file(file_content: bytes, filename: str) -> str:
+    """
+    Extract text from uploaded file based on file type
+    
+    Args:
+        file_content: Raw file bytes
+        filename: Name of the uploaded file
+    
+    Returns:
+        Extracted text content
+    """
+    return extract_document(file_content, filename).text
@@ -0,0 +1,117 @@
+"""
+Content-addressed cache of extracted text and gap analysis results
+
+Re-uploading the same submission skips parsing and gap analysis entirely:
+documents and analyses are keyed by the SHA-256 of the uploaded bytes. PDF
+pages are also cached individually, keyed by a fingerprint of the page's
+content stream and fonts (see agent.pdf_backends.page_fingerprints), so an
+edited PDF only re-extracts the pages that changed.
+
+Entries live in the same two-tier store as LLM responses: an in-memory LRU
+plus a size-bounded SQLite file shared by the API process and its parsing
+workers.
+
+Configuration (environment):
+    EXTRACTION_CACHE_ENABLED         - "0"/"false" disables caching (default: enabled)
+    EXTRACTION_CACHE_PATH            - SQLite file (default: data/cache/extractions.sqlite3)
+    EXTRACTION_CACHE_TTL             - seconds before an entry expires (default: 30 days)
+    EXTRACTION_CACHE_MEMORY_ENTRIES  - in-memory LRU capacity (default: 256)
+    EXTRACTION_CACHE_MAX_BYTES       - disk tier size budget (default: 256MB)
+"""
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+from .llm_cache import LLMCache, _env_flag
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction output changes for the same input
+EXTRACTION_VERSION = 1
+
+def content_digest(file_content: bytes) -> str:
+    """Hex SHA-256 of uploaded bytes"""
+    return hashlib.sha256(file_content).hexdigest()
+
+def file_kind(filename: str) -> str:
+    """Extraction path a file takes, which is part of its cache key"""
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        return "pdf"
+    if name.endswith(('.docx', '.doc')):
+        return "docx"
+    return "text"
+
+class ExtractionCache:
+    """Documents, PDF pages and gap analyses keyed by content hash"""
+
+    def __init__(self, store: LLMCache):
+        self.store = store
+
+    @property
+    def enabled(self) -> bool:
+        return self.store.enabled
+
+    def _get_json(self, key: str):
+        value = self.store.get(key)
+        return json.loads(value) if value is not None else None
+
+    def _set_json(self, key: str, value) -> None:
+        self.store.set(key, json.dumps(value))
+
+    def get_document(self, digest: str, kind: str, backend: str) -> Optional[Dict]:
+        """
+        Return a cached extraction as a dict of ExtractedDocument fields
+
+        Args:
+            digest: content_digest() of the upload
+            kind: file_kind() of the upload's filename
+            backend: Preferred PDF backend name ("" for other formats)
+        """
+        return self._get_json(f"doc:{EXTRACTION_VERSION}:{kind}:{backend}:{digest}")
+
+    def put_document(self, digest: str, kind: str, backend: str, text: str, page_starts: List[int]) -> None:
+        self._set_json(f"doc:{EXTRACTION_VERSION}:{kind}:{backend}:{digest}",
+                       {"text": text, "page_starts": page_starts})
+
+    def get_pages(self, fingerprints: List[str], backend: str) -> Dict[int, str]:
+        """Return {0-based page index: text} for every cached page"""
+        pages = {}
+        for index, fingerprint in enumerate(fingerprints):
+            text = self.store.get(f"page:{EXTRACTION_VERSION}:{backend}:{fingerprint}")
+            if text is not None:
+                pages[index] = text
+        return pages
+
+    def put_page(self, fingerprint: str, backend: str, text: str) -> None:
+        self.store.set(f"page:{EXTRACTION_VERSION}:{backend}:{fingerprint}", text)
+
+    def get_analysis(self, digest: str, rules_version: str) -> Optional[Dict]:
+        """
+        Return a cached gap analysis for an upload
+
+        Args:
+            digest: content_digest() of the upload
+            rules_version: SectionRegistry.version the analysis was run with
+        """
+        return self._get_json(f"analysis:{rules_version}:{digest}")
+
+    def put_analysis(self, digest: str, rules_version: str, analysis: Dict) -> None:
+        self._set_json(f"analysis:{rules_version}:{digest}", analysis)
+
+    def clear(self) -> None:
+        self.store.clear()
+
+    def stats(self) -> Dict:
+        return self.store.stats()
+
+# Shared cache used by agent.extraction and the analysis pipeline
+extraction_cache = ExtractionCache(LLMCache(
+    path=os.getenv("EXTRACTION_CACHE_PATH", "data/cache/extractions.sqlite3"),
+    ttl_seconds=float(os.getenv("EXTRACTION_CACHE_TTL", 30 * 24 * 3600)),
+    max_memory_entries=int(os.getenv("EXTRACTION_CACHE_MEMORY_ENTRIES", "256")),
+    max_disk_bytes=int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    enabled=_env_flag("EXTRACTION_CACHE_ENABLED", True)
+))
@@ -1,122 +1,463 @@
 """
 Gap Critic - Identifies missing sections in LDT submissions
+
+Sections are defined declaratively in section_rules.json (or the file named
+by SECTION_RULES_PATH): each rule has a name, a required/recommended tier,
+a description, optional synonyms and regular expressions, and a weight used
+in the completeness score. Rules are loaded and compiled into one matcher at
+import, so adding a section needs no code change. Locating every occurrence
+is a single pass over the text however many rules there are; checking which
+sections are present stops as soon as each section has been seen once.
 """
+import os
 import re
-from typing import Dict, List
-
-# Required sections for LDT submissions
-REQUIRED_SECTIONS = {
-    "Intended Use": "population, analyte, condition",
-    "Analytical Validity": "LoD, LoB, precision, linearity data",
-    "Clinical Validity": "clinical study & stats",
-    "Quality System": "reference 21 CFR 820 or ISO 13485",
-    "Risk Assessment": "provide FMEA / hazard analysis"
-}
-
-# Additional important sections
-RECOMMENDED_SECTIONS = {
-    "Labeling": "per 21 CFR 809 requirements",
-    "Personnel Qualifications": "CLIA personnel requirements",
-    "Specimen Requirements": "collection, handling, storage",
-    "Method Description": "detailed analytical procedure",
-    "Reference Standards": "calibrators and controls"
-}
-
-def find_missing_sections(text: str, include_recommended: bool = False) -> Dict[str, str]:
+import json
+import hashlib
+from bisect import bisect_right
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "section_rules.json")
+
+TIERS = ("required", "recommended")
+
+@dataclass
+class SectionRule:
+    """One section the gap analysis looks for"""
+    name: str
+    tier: str
+    description: str
+    synonyms: List[str] = field(default_factory=list)
+    patterns: List[str] = field(default_factory=list)
+    weight: float = 1.0
+
+    def phrases(self) -> List[str]:
+        """Lowercase literal phrases: the name, its _/- variants and synonyms"""
+        name = self.name.lower()
+        variations = [name, name.replace(" ", "_"), name.replace(" ", "-")]
+        return list(dict.fromkeys(variations + [synonym.lower() for synonym in self.synonyms]))
+
+def load_section_rules(path: Optional[str] = None) -> List[SectionRule]:
+    """
+    Load and validate section rules from a JSON file
+    
+    Args:
+        path: Rules file (default: SECTION_RULES_PATH or agent/section_rules.json)
+    
+    Returns:
+        List of SectionRule in file order
+    
+    Raises:
+        ValueError: If a rule is malformed, duplicated or has an invalid regex
+    """
+    path = path or os.getenv("SECTION_RULES_PATH", DEFAULT_RULES_PATH)
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    rules = []
+    seen = set()
+    for entry in data.get("sections", []):
+        try:
+            rule = SectionRule(
+                name=entry["name"],
+                tier=entry.get("tier", "required"),
+                description=entry.get("description", ""),
+                synonyms=list(entry.get("synonyms", [])),
+                patterns=list(entry.get("patterns", [])),
+                weight=float(entry.get("weight", 1.0))
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid section rule {entry!r} in {path}: {e}")
+        if rule.tier not in TIERS:
+            raise ValueError(f"Section rule '{rule.name}' has unknown tier '{rule.tier}' (expected one of {TIERS})")
+        if rule.name in seen:
+            raise ValueError(f"Duplicate section rule '{rule.name}' in {path}")
+        for pattern in rule.patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Section rule '{rule.name}' has invalid pattern {pattern!r}: {e}")
+        seen.add(rule.name)
+        rules.append(rule)
+    return rules
+
+@dataclass
+class SectionHit:
+    """One occurrence of a section name, variant, synonym or pattern"""
+    section: str
+    pattern: str
+    start: int
+    end: int
+
+class SectionMatcher:
+    """
+    Single-pass multi-pattern matcher for section phrases
+
+    All phrases are compiled once into a prefix trie expressed as one regular
+    expression, so the C regex engine walks the trie at each candidate
+    position instead of the text being rescanned once per phrase. Each match
+    is the longest phrase starting at that position; shorter phrases that are
+    prefixes of it are credited too, and the search resumes one character
+    later so overlapping phrases are all reported.
+
+    Regular expression rules are combined into a second alternation with one
+    named group per pattern and scanned the same way; where several patterns
+    match at the same position only the first is reported. Patterns that
+    begin with a literal (rather than \\b or a class) let the engine skip
+    ahead quickly.
+
+    found_sections() answers presence only and does not use the trie: each
+    phrase is a substring search that stops at its first occurrence, and
+    phrases of sections already seen are skipped, so a complete submission
+    is not read to the end.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]], regexes: Optional[Dict[str, List[str]]] = None):
+        self.sections_by_pattern: Dict[str, List[str]] = {}
+        for section, phrases in patterns.items():
+            for phrase in phrases:
+                self.sections_by_pattern.setdefault(phrase.lower(), []).append(section)
+
+        self._regex_rules: Dict[str, tuple] = {}
+        self._regex_sections: Set[str] = set()
+        alternatives = []
+        for section, section_regexes in (regexes or {}).items():
+            for pattern in section_regexes:
+                group = f"r{len(self._regex_rules)}"
+                self._regex_rules[group] = (section, pattern)
+                self._regex_sections.add(section)
+                alternatives.append(f"(?P<{group}>{pattern})")
+        self._pattern_regex = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+
+        phrases = list(self.sections_by_pattern)
+        # Phrases that are prefixes of each phrase (including itself)
+        self._prefixes = {
+            phrase: [other for other in phrases if phrase.startswith(other)]
+            for phrase in phrases
+        }
+        trie = self._build_trie(phrases)
+        self._regex = re.compile(trie)
+        self._regex_ignorecase = re.compile(trie, re.IGNORECASE)
+
+    @staticmethod
+    def _build_trie(phrases: List[str]) -> str:
+        root: Dict = {}
+        for phrase in phrases:
+            node = root
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def to_regex(node: Dict) -> str:
+            branches = [re.escape(char) + to_regex(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            # A phrase ends here: the longer continuations are optional (greedy)
+            return f"(?:{body})?" if "" in node else body
+
+        return to_regex(root)
+
+    def find_all(self, text: str) -> List[SectionHit]:
+        """
+        Find every section phrase occurrence
+
+        Args:
+            text: Submission text (any case)
+
+        Returns:
+            Hits in text order with character offsets into text
+        """
+        text_lower = text.lower()
+        regex = self._regex
+        if len(text_lower) != len(text):
+            # Some characters change length when lowercased, so match the
+            # original text case-insensitively to keep offsets aligned
+            text_lower, regex = text, self._regex_ignorecase
+
+        hits = []
+        position = 0
+        while True:
+            match = regex.search(text_lower, position)
+            if match is None:
+                break
+            start = match.start()
+            for phrase in self._prefixes.get(match.group().lower(), ()):
+                for section in self.sections_by_pattern[phrase]:
+                    hits.append(SectionHit(section, phrase, start, start + len(phrase)))
+            position = start + 1
+
+        if self._pattern_regex is not None:
+            hits.extend(self._find_pattern_hits(text))
+            hits.sort(key=lambda hit: (hit.start, -hit.end))
+        return hits
+
+    def _find_pattern_hits(self, text: str) -> List[SectionHit]:
+        hits = []
+        position = 0
+        while position <= len(text):
+            match = self._pattern_regex.search(text, position)
+            if match is None:
+                break
+            section, pattern = self._regex_rules[match.lastgroup]
+            hits.append(SectionHit(section, pattern, match.start(), match.end()))
+            position = match.start() + 1
+        return hits
+
+    def found_sections(self, text: str, skip: Iterable[str] = ()) -> Set[str]:
+        """
+        Return the names of sections with at least one phrase in text
+
+        Args:
+            text: Submission text (any case)
+            skip: Sections already known to be present, not searched for
+
+        Returns:
+            Names of the sections found, excluding skip
+        """
+        text_lower = text.lower()
+        if len(text_lower) != len(text):
+            # Case-insensitive matching differs from lower() for these
+            # characters; use the full scan so both agree
+            skip = set(skip)
+            return {hit.section for hit in self.find_all(text)} - skip
+
+        seen = set(skip)
+        for phrase, sections in self.sections_by_pattern.items():
+            if not seen.issuperset(sections) and phrase in text_lower:
+                seen.update(sections)
+
+        pending = self._regex_sections - seen
+        position = 0
+        while pending and position <= len(text):
+            match = self._pattern_regex.search(text, position)
+            if match is None:
+                break
+            section = self._regex_rules[match.lastgroup][0]
+            seen.add(section)
+            pending.discard(section)
+            position = match.start() + 1
+        return seen.difference(skip)
+
+class SectionRegistry:
+    """
+    Section rules by tier plus the matcher compiled from them
+    
+    version is a short hash of the rules, so results cached under one rule
+    set are not reused after the rules change.
+    """
+
+    def __init__(self, rules: List[SectionRule]):
+        self.rules = {rule.name: rule for rule in rules}
+        self.version = hashlib.sha256(
+            json.dumps([asdict(rule) for rule in rules], sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        self.required = {rule.name: rule.description for rule in rules if rule.tier == "required"}
+        self.recommended = {rule.name: rule.description for rule in rules if rule.tier == "recommended"}
+        self.matcher = SectionMatcher(
+            {rule.name: rule.phrases() for rule in rules},
+            {rule.name: rule.patterns for rule in rules if rule.patterns}
+        )
+
+    def find_hits(self, text: str) -> List[SectionHit]:
+        return self.matcher.find_all(text)
+
+    def found_sections(self, text: str, skip: Iterable[str] = ()) -> Set[str]:
+        return self.matcher.found_sections(text, skip)
+
+    def weight(self, section: str) -> float:
+        return self.rules[section].weight
+
+# Loaded and compiled once at import
+section_registry = SectionRegistry(load_section_rules())
+
+# Section name -> description for each tier
+REQUIRED_SECTIONS = section_registry.required
+RECOMMENDED_SECTIONS = section_registry.recommended
+
+def section_patterns() -> Dict[str, List[str]]:
+    """Lowercase phrases that mark each required and recommended section as present"""
+    return {name: rule.phrases() for name, rule in section_registry.rules.items()}
+
+def find_section_hits(text: str, registry: Optional[SectionRegistry] = None) -> List[SectionHit]:
+    """Return every section phrase occurrence in text with character offsets"""
+    return (registry or section_registry).find_hits(text)
+
+def detect_sections(pages: Iterable[Tuple[int, str]], registry: Optional[SectionRegistry] = None,
+                    stop_when_complete: bool = True) -> Dict:
+    """
+    Detection-only pass over a stream of pages, e.g. from iter_pdf_pages()
+    
+    Pages are scanned one at a time and, with stop_when_complete, the stream
+    is abandoned as soon as every required and recommended section has been
+    seen, so the remaining pages are never extracted.
+    
+    Args:
+        pages: (page_no, text) pairs
+        registry: Section rules to apply (default: the loaded rules file)
+        stop_when_complete: Stop reading pages once all sections are found
+    
+    Returns:
+        Dictionary with the completeness_summary() fields, found sections
+        (mapped to the first page each appears on), the number of pages
+        scanned and whether the scan stopped early
+    """
+    registry = registry or section_registry
+    all_sections = set(registry.required) | set(registry.recommended)
+    first_page: Dict[str, int] = {}
+    pages_scanned = 0
+    stopped_early = False
+    
+    for page_no, text in pages:
+        pages_scanned += 1
+        for section in registry.found_sections(text, skip=first_page.keys()):
+            first_page[section] = page_no
+        if stop_when_complete and all_sections <= first_page.keys():
+            stopped_early = True
+            break
+    
+    return {
+        **completeness_summary(first_page.keys(), registry),
+        "found_sections": first_page,
+        "pages_scanned": pages_scanned,
+        "stopped_early": stopped_early
+    }
+
+def page_number(offset: int, page_starts: Optional[List[int]]) -> Optional[int]:
+    """Return the 1-based page containing a character offset, or None without page data"""
+    if not page_starts:
+        return None
+    return max(bisect_right(page_starts, offset), 1)
+
+def evidence_snippet(text: str, start: int, end: int, context: int = 80) -> str:
+    """Return the matched phrase with surrounding context, whitespace collapsed"""
+    snippet_start = max(start - context, 0)
+    snippet_end = min(end + context, len(text))
+    snippet = " ".join(text[snippet_start:snippet_end].split())
+    prefix = "…" if snippet_start > 0 else ""
+    suffix = "…" if snippet_end < len(text) else ""
+    return f"{prefix}{snippet}{suffix}"
+
+def locate_sections(text: str, hits: List[SectionHit], page_starts: Optional[List[int]] = None,
+                    max_per_section: int = 3) -> Dict[str, List[Dict]]:
+    """
+    Describe where each present section appears in the submission
+    
+    Args:
+        text: The submission text
+        hits: find_section_hits(text) result
+        page_starts: Character offset of each page start, from PDF extraction
+        max_per_section: Locations kept per section (earliest first)
+    
+    Returns:
+        Dictionary of section name to a list of locations, each with start,
+        end, page (None without page data), the matched phrase and an
+        evidence snippet
+    """
+    locations: Dict[str, List[Dict]] = {}
+    for hit in hits:
+        section_locations = locations.setdefault(hit.section, [])
+        if len(section_locations) >= max_per_section:
+            continue
+        # Skip phrases overlapping a location already recorded for this section
+        if section_locations and hit.start < section_locations[-1]["end"]:
+            continue
+        section_locations.append({
+            "start": hit.start,
+            "end": hit.end,
+            "page": page_number(hit.start, page_starts),
+            "match": text[hit.start:hit.end],
+            "snippet": evidence_snippet(text, hit.start, hit.end)
+        })
+    return locations
+
+def find_missing_sections(text: str, include_recommended: bool = False,
+                          hits: Optional[List[SectionHit]] = None,
+                          registry: Optional[SectionRegistry] = None) -> Dict[str, str]:
     """
     Analyze text for missing required sections
     
     Args:
         text: The submission text to analyze
         include_recommended: Whether to include recommended sections
+        hits: Precomputed find_section_hits(text) result, to avoid rescanning
+        registry: Section rules to apply (default: the loaded rules file)
     
     Returns:
         Dictionary of missing sections and their descriptions
     """
-    text_lower = text.lower()
-    missing = {}
-    
-    # Check required sections
-    for section, description in REQUIRED_SECTIONS.items():
-        section_variations = [
-            section.lower(),
-            section.lower().replace(" ", "_"),
-            section.lower().replace(" ", "-"),
-            # Add more variations as needed
-        ]
-        
-        found = any(variation in text_lower for variation in section_variations)
-        
-        # Additional specific checks
-        if section == "Intended Use" and not found:
-            # Look for alternative phrasings
-            alternatives = ["intended use", "indication", "clinical use", "purpose"]
-            found = any(alt in text_lower for alt in alternatives)
-        
-        elif section == "Analytical Validity" and not found:
-            # Look for validation terms
-            alternatives = ["validation", "analytical performance", "lod", "lob", "precision", "linearity"]
-            found = any(alt in text_lower for alt in alternatives)
-        
-        elif section == "Clinical Validity" and not found:
-            # Look for clinical study terms
-            alternatives = ["clinical study", "clinical trial", "clinical validation", "sensitivity", "specificity"]
-            found = any(alt in text_lower for alt in alternatives)
-        
-        elif section == "Quality System" and not found:
-            # Look for QMS references
-            alternatives = ["quality system", "qms", "iso 13485", "21 cfr 820", "quality management"]
-            found = any(alt in text_lower for alt in alternatives)
-        
-        elif section == "Risk Assessment" and not found:
-            # Look for risk analysis terms
-            alternatives = ["risk assessment", "risk analysis", "fmea", "hazard analysis", "risk management"]
-            found = any(alt in text_lower for alt in alternatives)
-        
-        if not found:
-            missing[section] = description
+    registry = registry or section_registry
+    if hits is None:
+        found = registry.found_sections(text)
+    else:
+        found = {hit.section for hit in hits}
+    
+    missing = {section: description for section, description in registry.required.items()
+               if section not in found}
     
     # Check recommended sections if requested
     if include_recommended:
-        for section, description in RECOMMENDED_SECTIONS.items():
-            section_lower = section.lower()
-            if section_lower not in text_lower:
-                missing[section] = description
+        missing.update({section: description for section, description in registry.recommended.items()
+                        if section not in found})
     
     return missing
 
-def analyze_completeness(text: str) -> Dict:
+def analyze_completeness(text: str, page_starts: Optional[List[int]] = None,
+                         registry: Optional[SectionRegistry] = None, locate: bool = True) -> Dict:
     """
     Provide a comprehensive analysis of submission completeness
     
     Args:
         text: The submission text to analyze
+        page_starts: Character offset of each page start, from PDF extraction
+        registry: Section rules to apply (default: the loaded rules file)
+        locate: Collect every occurrence for section_locations; when False
+            only presence is checked, which stops once all sections are seen
     
     Returns:
-        Dictionary with analysis results
+        Dictionary with analysis results, including section_locations for
+        every section found (empty when locate is False)
     """
-    missing_required = find_missing_sections(text, include_recommended=False)
-    missing_recommended = find_missing_sections(text, include_recommended=True)
+    registry = registry or section_registry
     
-    # Calculate completeness scores
-    total_required = len(REQUIRED_SECTIONS)
-    missing_req_count = len(missing_required)
-    completeness_score = ((total_required - missing_req_count) / total_required) * 100
+    # One scan serves both the required and recommended checks
+    if not locate:
+        return {**completeness_summary(registry.found_sections(text), registry), "section_locations": {}}
+    hits = registry.find_hits(text)
+    return {
+        **completeness_summary({hit.section for hit in hits}, registry),
+        "section_locations": locate_sections(text, hits, page_starts)
+    }
+
+def completeness_summary(found: Iterable[str], registry: Optional[SectionRegistry] = None) -> Dict:
+    """
+    Score a submission from the names of the sections found in it
+    
+    Args:
+        found: Sections present in the submission
+        registry: Section rules to apply (default: the loaded rules file)
+    
+    Returns:
+        Dictionary with the completeness score, missing required and
+        recommended sections and the required sections present
+    """
+    registry = registry or section_registry
+    found = set(found)
+    missing_required = {k: v for k, v in registry.required.items() if k not in found}
+    missing_recommended = {k: v for k, v in registry.recommended.items() if k not in found}
     
-    # Identify what's present
-    present_sections = []
-    for section in REQUIRED_SECTIONS.keys():
-        if section not in missing_required:
-            present_sections.append(section)
+    # Calculate completeness scores, weighting each required section by its rule
+    total_weight = sum(registry.weight(section) for section in registry.required)
+    missing_weight = sum(registry.weight(section) for section in missing_required)
+    completeness_score = ((total_weight - missing_weight) / total_weight) * 100 if total_weight else 100.0
     
     return {
         "completeness_score": round(completeness_score, 1),
         "missing_required": missing_required,
-        "missing_recommended": {k: v for k, v in missing_recommended.items() 
-                               if k in RECOMMENDED_SECTIONS},
-        "present_sections": present_sections,
-        "total_required": total_required,
-        "missing_count": missing_req_count
+        "missing_recommended": missing_recommended,
+        "present_sections": [section for section in registry.required if section in found],
+        "total_required": len(registry.required),
+        "missing_count": len(missing_required)
     }
 
 def generate_checklist(missing_sections: Dict[str, str]) -> List[str]:
@@ -0,0 +1,366 @@
+"""
+Background analysis jobs backed by a local SQLite queue
+
+Long analyses run outside the HTTP request: a job is stored with its
+uploaded bytes, picked up by one of a fixed number of async workers on the
+server's event loop, and its status, stage, partial results, final result
+and per-stage timings are written back to the same table so clients can
+poll for them. No external broker is needed.
+
+Several servers may share the database. A job is claimed in a single
+write transaction, so exactly one worker gets it, and the claiming store
+records itself as the job's owner with a lease that its worker renews
+while the job runs. Only the owner's writes are applied. Jobs whose lease
+expired (their server stopped or hung) are claimed again by any worker;
+a server that stops cleanly puts its running jobs straight back in the
+queue.
+
+Configuration (environment):
+    JOB_WORKERS          - concurrent jobs (default: 2)
+    JOB_DB_PATH          - SQLite file (default: data/jobs.sqlite3)
+    JOB_RETENTION        - seconds finished jobs are kept (default: 7 days)
+    JOB_LEASE_SECONDS    - seconds a running job stays claimed without a
+                           renewal (default: 60)
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .executors import run_in_thread
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# JSON columns and their defaults
+_JSON_FIELDS = {"timings": dict, "partial": dict, "result": lambda: None, "error": lambda: None}
+
+# Columns that are not part of the Job record
+_INTERNAL_COLUMNS = ("payload", "owner", "lease_expires")
+
+# Clears everything a run wrote, for a job going back to the queue or to a new owner
+_RESET_RUN = "stage = NULL, partial = '{}', timings = '{}'"
+
+@dataclass
+class Job:
+    """One analysis job as stored in the queue"""
+    id: str
+    filename: str
+    status: str = QUEUED
+    stage: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    partial: Dict = field(default_factory=dict)
+    result: Optional[Dict] = None
+    error: Optional[Dict] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+class JobStore:
+    """SQLite table holding queued, running and finished jobs"""
+
+    def __init__(self, path: str = ":memory:", retention_seconds: float = 7 * 24 * 3600,
+                 lease_seconds: float = 60.0):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.lease_seconds = lease_seconds
+        # Identifies this store's claims among every process sharing the database
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, filename TEXT NOT NULL, status TEXT NOT NULL, stage TEXT,"
+                " created_at REAL NOT NULL, started_at REAL, finished_at REAL,"
+                " timings TEXT, partial TEXT, result TEXT, error TEXT, payload BLOB,"
+                " owner TEXT, lease_expires REAL)"
+            )
+            # Databases created before jobs had owners
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("lease_expires", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+        return self._conn
+
+    def _to_job(self, row: sqlite3.Row) -> Job:
+        values = {key: row[key] for key in row.keys() if key not in _INTERNAL_COLUMNS}
+        for key, default in _JSON_FIELDS.items():
+            values[key] = json.loads(values[key]) if values[key] is not None else default()
+        return Job(**values)
+
+    def create(self, filename: str, payload: bytes) -> Job:
+        """Queue a new job for an uploaded file"""
+        job = Job(id=uuid.uuid4().hex, filename=filename, created_at=time.time())
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO jobs (id, filename, status, created_at, timings, partial, payload)"
+                " VALUES (?, ?, ?, ?, '{}', '{}', ?)",
+                (job.id, filename, QUEUED, job.created_at, payload)
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row is not None else None
+
+    def claim_next(self) -> Optional[tuple]:
+        """
+        Claim the oldest queued job, or a running job whose lease expired
+
+        The job becomes running, owned by this store, with a lease of
+        lease_seconds. Claims by other processes cannot interleave: the
+        write lock is taken (BEGIN IMMEDIATE) before the job is chosen.
+
+        Returns:
+            (Job, uploaded bytes), or None if there is nothing to run
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? OR (status = ? AND (lease_expires IS NULL OR lease_expires < ?))"
+                    " ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        f"UPDATE jobs SET status = ?, started_at = ?, owner = ?, lease_expires = ?, {_RESET_RUN}"
+                        " WHERE id = ?",
+                        (RUNNING, now, self.owner, now + self.lease_seconds, row["id"])
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        if row["status"] == RUNNING:
+            logger.warning(f"⚠️  Job {row['id']} lease expired (owner {row['owner']}); running it again")
+        job = self._to_job(row)
+        job.status, job.started_at, job.stage, job.partial, job.timings = RUNNING, now, None, {}, {}
+        return job, row["payload"]
+
+    def renew_lease(self, job_id: str) -> bool:
+        """Extend this store's lease on a running job; False if the job is no longer ours"""
+        with self._lock:
+            cursor = self._connect().execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND owner = ? AND status = ?",
+                (time.time() + self.lease_seconds, job_id, self.owner, RUNNING)
+            )
+        return cursor.rowcount > 0
+
+    def update(self, job_id: str, **fields) -> bool:
+        """
+        Write changed job fields; dict fields are stored as JSON
+
+        Only applied while this store owns the job, so a worker whose lease
+        expired cannot overwrite the run that replaced it.
+
+        Returns:
+            Whether the job was updated
+        """
+        if not fields:
+            return True
+        values = [json.dumps(value) if key in _JSON_FIELDS and value is not None else value
+                  for key, value in fields.items()]
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            cursor = self._connect().execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND owner = ?", (*values, job_id, self.owner)
+            )
+        return cursor.rowcount > 0
+
+    def finish(self, job_id: str, status: str, **fields) -> bool:
+        """Record a job's outcome and drop its uploaded bytes; False if the job is no longer ours"""
+        return self.update(job_id, status=status, finished_at=time.time(), lease_expires=None,
+                           payload=None, **fields)
+
+    def release(self, job_id: str) -> bool:
+        """Put a job this store is running back in the queue, e.g. when shutting down"""
+        with self._lock:
+            cursor = self._connect().execute(
+                f"UPDATE jobs SET status = ?, started_at = NULL, owner = NULL, lease_expires = NULL, {_RESET_RUN}"
+                " WHERE id = ? AND owner = ? AND status = ?",
+                (QUEUED, job_id, self.owner, RUNNING)
+            )
+        return cursor.rowcount > 0
+
+    def requeue_expired(self) -> int:
+        """Put running jobs whose lease expired back in the queue"""
+        with self._lock:
+            cursor = self._connect().execute(
+                f"UPDATE jobs SET status = ?, started_at = NULL, owner = NULL, lease_expires = NULL, {_RESET_RUN}"
+                " WHERE status = ? AND (lease_expires IS NULL OR lease_expires < ?)",
+                (QUEUED, RUNNING, time.time())
+            )
+        return max(cursor.rowcount, 0)
+
+    def prune(self) -> int:
+        """Delete finished jobs older than the retention period"""
+        if self.retention_seconds <= 0:
+            return 0
+        with self._lock:
+            cursor = self._connect().execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (SUCCEEDED, FAILED, time.time() - self.retention_seconds)
+            )
+        return max(cursor.rowcount, 0)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each status"""
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+class JobContext:
+    """Handed to a job handler to report progress"""
+
+    def __init__(self, store: JobStore, job: Job):
+        self.store = store
+        self.job = job
+
+    async def update(self, **fields) -> None:
+        """Persist stage, partial results or timings while the job runs"""
+        for key, value in fields.items():
+            setattr(self.job, key, value)
+        await run_in_thread(self.store.update, self.job.id, **fields)
+
+# Runs one job: (context, filename, uploaded bytes) -> result dict
+JobHandler = Callable[[JobContext, str, bytes], Awaitable[Dict]]
+
+# Maps a handler exception to the {"status_code", "detail"} stored on the job
+ErrorMapper = Callable[[Exception], Dict]
+
+class JobWorkerPool:
+    """
+    Fixed number of async workers draining the job store
+
+    Workers run on the event loop that calls start(); the handler should
+    push blocking work onto the shared executors as the pipeline does.
+    """
+
+    def __init__(self, store: JobStore, handler: JobHandler, workers: int = 2,
+                 error_mapper: Optional[ErrorMapper] = None):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.error_mapper = error_mapper or (lambda e: {"status_code": 500, "detail": str(e)})
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Requeue jobs whose lease expired and start the workers"""
+        if self._tasks:
+            return
+        requeued = await run_in_thread(self.store.requeue_expired)
+        pruned = await run_in_thread(self.store.prune)
+        if requeued or pruned:
+            logger.info(f"📥 Job queue: {requeued} interrupted jobs requeued, {pruned} old jobs pruned")
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)]
+        logger.info(f"📥 Started {self.workers} job workers")
+
+    async def stop(self) -> None:
+        """Cancel the workers; their running jobs go back in the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, filename: str, payload: bytes) -> Job:
+        """Queue a job and wake a worker, starting the workers on first use"""
+        await self.start()
+        job = await run_in_thread(self.store.create, filename, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            # Clear before looking so a submit during the claim is not missed
+            self._wakeup.clear()
+            claim = asyncio.ensure_future(run_in_thread(self.store.claim_next))
+            try:
+                claimed = await asyncio.shield(claim)
+            except asyncio.CancelledError:
+                # Stopped mid-claim: the claim still commits, so hand it back
+                claimed = await claim
+                if claimed is not None:
+                    self.store.release(claimed[0].id)
+                raise
+            if claimed is None:
+                # Wake up at least once per lease to take over jobs whose
+                # lease expired in another process
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.store.lease_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(*claimed)
+
+    async def _keep_lease(self, job_id: str) -> None:
+        """Renew the lease on a running job until cancelled"""
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            if not await run_in_thread(self.store.renew_lease, job_id):
+                logger.warning(f"⚠️  Lost the lease on job {job_id}; its result will not be recorded")
+                return
+
+    async def _run(self, job: Job, payload: bytes) -> None:
+        context = JobContext(self.store, job)
+        context.job.timings = {"queued": round(job.started_at - job.created_at, 3)}
+        lease = asyncio.create_task(self._keep_lease(job.id))
+        try:
+            result = await self.handler(context, job.filename, payload)
+        except asyncio.CancelledError:
+            # Shutting down: let another worker run the job now rather than
+            # after the lease expires
+            self.store.release(job.id)
+            raise
+        except Exception as e:
+            logger.error(f"❌ Job {job.id} failed: {e}")
+            await run_in_thread(self.store.finish, job.id, FAILED, error=self.error_mapper(e),
+                                timings=context.job.timings)
+            return
+        finally:
+            lease.cancel()
+        await run_in_thread(self.store.finish, job.id, SUCCEEDED, stage=None, result=result,
+                            timings=context.job.timings)
+        logger.info(f"✅ Job {job.id} finished in {time.time() - job.started_at:.1f}s")
+
+def job_store_from_env() -> JobStore:
+    return JobStore(
+        path=os.getenv("JOB_DB_PATH", "data/jobs.sqlite3"),
+        retention_seconds=float(os.getenv("JOB_RETENTION", 7 * 24 * 3600)),
+        lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    )
@@ -1,41 +1,440 @@
 """
 Knowledge base loader for FDA/CLIA regulatory documents
+
+The FAISS index and the sentence-transformers embedding model take several
+seconds to load, so nothing is loaded at import time. `knowledge_base` is a
+thread-safe handle that loads the store on first use, or in the background
+via warm_up() so servers can accept traffic while it loads.
+
+Each build is written to its own directory (stores/fda_clia/v1, v2, ...)
+and a CURRENT file in the store root names the one to serve; the build
+script replaces it atomically once the new version is complete. A running
+server picks up a new version with KnowledgeBaseHandle.reload(), which
+loads it alongside the old one and then swaps the reference, so requests
+already searching the old index finish against it. Stores built before
+versioning (index files directly in the root) are still served as is.
 """
 import os
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-
-def load_knowledge_base():
-    """Load the FDA/CLIA vector store"""
-    store_path = "stores/fda_clia"
-    
-    if not os.path.exists(store_path):
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import tempfile
+import threading
+import functools
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STORE_PATH = "stores/fda_clia"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+CURRENT_FILE = "CURRENT"
+
+_VERSION_DIR = re.compile(r"^v(\d+)$")
+
+def store_versions(store_root: str = STORE_PATH) -> List[str]:
+    """Version directory names under the store root, oldest first"""
+    if not os.path.isdir(store_root):
+        return []
+    versions = [name for name in os.listdir(store_root)
+                if _VERSION_DIR.match(name) and os.path.isdir(os.path.join(store_root, name))]
+    return sorted(versions, key=lambda name: int(name[1:]))
+
+def current_version(store_root: str = STORE_PATH) -> Optional[str]:
+    """
+    Name of the version directory the CURRENT pointer names
+
+    Falls back to the newest version directory if there is no pointer.
+    Returns None for an unversioned store or no store at all.
+    """
+    try:
+        with open(os.path.join(store_root, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            version = f.read().strip()
+        if _VERSION_DIR.match(version) and os.path.isdir(os.path.join(store_root, version)):
+            return version
+    except OSError:
+        pass
+    versions = store_versions(store_root)
+    return versions[-1] if versions else None
+
+def set_current_version(store_root: str, version: str) -> None:
+    """Point CURRENT at a version directory, replacing the pointer atomically"""
+    fd, tmp_path = tempfile.mkstemp(prefix=".current-", dir=store_root)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(version + "\n")
+        os.replace(tmp_path, os.path.join(store_root, CURRENT_FILE))
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+def resolve_store_path(store_root: str = STORE_PATH) -> str:
+    """Directory holding the index to serve: the current version, or the root for unversioned stores"""
+    if os.path.exists(os.path.join(store_root, "index.faiss")) and not os.path.exists(
+            os.path.join(store_root, CURRENT_FILE)):
+        return store_root
+    version = current_version(store_root)
+    return os.path.join(store_root, version) if version else store_root
+
+@functools.lru_cache(maxsize=1)
+def _embedding_model():
+    """The sentence-transformers model, loaded once and shared by every store version"""
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+
+def load_knowledge_base(store_path: str = STORE_PATH):
+    """Load the FDA/CLIA vector store (the current version if store_path is a versioned root)"""
+    store_path = resolve_store_path(store_path)
+    if not os.path.exists(os.path.join(store_path, "index.faiss")):
         raise FileNotFoundError(
             f"Vector store not found at {store_path}. "
             "Please run 'python scripts/build_vector_store.py' first."
         )
-    
-    # Initialize embeddings (must match those used during creation)
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
+
+    # Heavy imports are deferred until the store is actually needed
+    from langchain_community.vectorstores import FAISS
+    from .embedding_cache import (
+        CachedQueryEmbeddings, QueryEmbeddingCache, QUERY_EMBEDDINGS_FILE, persist_enabled, runtime_embeddings_path
+    )
+
+    # Initialize embeddings (must match those used during creation); query
+    # vectors precomputed at build time are served without running the encoder
+    cache = QueryEmbeddingCache(
+        max_entries=int(os.getenv("QUERY_EMBEDDING_CACHE_ENTRIES", "1024")),
+        model=EMBEDDING_MODEL
     )
-    
+    precomputed = cache.load(os.path.join(store_path, QUERY_EMBEDDINGS_FILE))
+    if precomputed:
+        logger.info(f"Loaded {precomputed} precomputed query embeddings")
+    if persist_enabled():
+        restored = cache.load(runtime_embeddings_path(), pinned=False)
+        if restored:
+            logger.info(f"Restored {restored} query embeddings from the last run")
+    embeddings = CachedQueryEmbeddings(_embedding_model(), cache)
+
     # Load the vector store
     knowledge_base = FAISS.load_local(
         store_path,
         embeddings=embeddings,
         allow_dangerous_deserialization=True  # Required for FAISS
     )
-    
+
     return knowledge_base
 
-# Initialize knowledge base (will be loaded when imported)
-try:
-    knowledge_base = load_knowledge_base()
-    print("✅ Knowledge base loaded successfully")
-except FileNotFoundError as e:
-    print(f"⚠️  {e}")
-    knowledge_base = None
-except Exception as e:
-    print(f"❌ Error loading knowledge base: {e}")
-    knowledge_base = None
\ No newline at end of file
+def store_fingerprint(store_path: str) -> str:
+    """
+    Short identifier of a built store directory that changes whenever its contents do
+
+    Hashes the build manifest (per-file content hashes, embedding model and
+    chunking settings); stores built without one fall back to the index
+    file's size and modification time. Returns "none" if there is no store.
+    """
+    manifest_path = os.path.join(store_path, "manifest.json")
+    index_path = os.path.join(store_path, "index.faiss")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    if os.path.exists(index_path):
+        stat = os.stat(index_path)
+        return hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+    return "none"
+
+def knowledge_base_version(store_path: Optional[str] = None) -> str:
+    """
+    Fingerprint of the store being served
+
+    With no path, this is the store the shared handle has loaded (which can
+    lag the CURRENT pointer until it is reloaded), or the current version on
+    disk if nothing is loaded yet.
+    """
+    if store_path is None:
+        loaded = knowledge_base.info.get("fingerprint")
+        if loaded:
+            return loaded
+        store_path = STORE_PATH
+    return store_fingerprint(resolve_store_path(store_path))
+
+def describe_store(store_path: str, store=None) -> Dict:
+    """
+    Version, build time, chunk count and per-file chunk counts of a store directory
+
+    Read from the build manifest when there is one; otherwise counted from
+    the loaded store's docstore, if given.
+    """
+    name = os.path.basename(os.path.normpath(store_path))
+    info = {
+        "version": name if _VERSION_DIR.match(name) else None,
+        "path": store_path,
+        "fingerprint": store_fingerprint(store_path),
+        "built_at": None,
+        "chunks": None,
+        "sources": []
+    }
+    counts = None
+    manifest_path = os.path.join(store_path, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        info["built_at"] = manifest.get("built_at")
+        counts = {name: len(entry.get("chunk_ids", [])) for name, entry in manifest.get("files", {}).items()}
+    elif store is not None and hasattr(store, "docstore"):
+        counts = Counter(doc.metadata.get("filename") or doc.metadata.get("source", "unknown")
+                         for doc in store.docstore._dict.values())
+    if info["built_at"] is None and os.path.exists(os.path.join(store_path, "index.faiss")):
+        mtime = os.path.getmtime(os.path.join(store_path, "index.faiss"))
+        info["built_at"] = datetime.fromtimestamp(mtime, timezone.utc).isoformat(timespec="seconds")
+    if store is not None and hasattr(store, "index_to_docstore_id"):
+        info["chunks"] = len(store.index_to_docstore_id)
+    elif counts is not None:
+        info["chunks"] = sum(counts.values())
+    if counts is not None:
+        info["sources"] = [{"name": name, "chunks": count} for name, count in sorted(counts.items())]
+    return info
+
+def batch_similarity_search(store, queries: List[str], k: int = 4) -> List:
+    """
+    Retrieve chunks for several queries with one embedding pass and one index search
+
+    All queries are embedded together and searched as a single query matrix.
+    Results are merged in query order (each query's hits in rank order) and
+    deduplicated by docstore chunk id.
+
+    Args:
+        store: Loaded FAISS vector store
+        queries: Query strings, e.g. missing section names
+        k: Number of chunks to retrieve per query
+
+    Returns:
+        Deduplicated list of Documents
+    """
+    if not queries:
+        return []
+
+    embeddings = getattr(store, "embeddings", None)
+    if embeddings is None or not hasattr(store, "index"):
+        # Not a FAISS store with an embedding model: fall back to one search per query
+        merged, seen = [], set()
+        for query in queries:
+            for doc in store.similarity_search(query, k=k):
+                if doc.page_content not in seen:
+                    seen.add(doc.page_content)
+                    merged.append(doc)
+        return merged
+
+    import numpy as np
+    import faiss
+
+    if hasattr(embeddings, "embed_queries"):
+        vectors = embeddings.embed_queries(queries)
+    else:
+        vectors = np.asarray(embeddings.embed_documents(list(queries)), dtype=np.float32)
+    if getattr(store, "_normalize_L2", False):
+        faiss.normalize_L2(vectors)
+    _, indices = store.index.search(vectors, k)
+
+    merged, seen = [], set()
+    for row in indices:
+        for i in row:
+            if i == -1:
+                continue
+            chunk_id = store.index_to_docstore_id[int(i)]
+            if chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            merged.append(store.docstore.search(chunk_id))
+    return merged
+
+class KnowledgeBaseHandle:
+    """
+    Lazily initialized, thread-safe handle to the vector store
+
+    State moves from "not_loaded" to "loading" and then "ready" or "failed".
+    Concurrent callers of get() during a load wait for the same load rather
+    than starting their own. reload() swaps in the store's current version
+    while callers keep using whichever store get() returned them.
+    """
+
+    def __init__(self, loader=load_knowledge_base, store_root: str = STORE_PATH):
+        self._loader = loader
+        self.store_root = store_root
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._store = None
+        self._thread: Optional[threading.Thread] = None
+        self.state = "not_loaded"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.info: Dict = {}
+        self.reloads = 0
+
+    def _open(self):
+        """Load the current version; returns (store, info)"""
+        store_path = resolve_store_path(self.store_root)
+        store = self._loader(store_path)
+        info = describe_store(store_path, store)
+        info["loaded_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        return store, info
+
+    def _load(self) -> None:
+        start = time.perf_counter()
+        try:
+            self._store, self.info = self._open()
+            self.state = "ready"
+            logger.info(f"✅ Knowledge base loaded successfully ({self.info['path']})")
+        except FileNotFoundError as e:
+            self.error = str(e)
+            self.state = "failed"
+            logger.warning(f"⚠️  {e}")
+        except Exception as e:
+            self.error = str(e)
+            self.state = "failed"
+            logger.error(f"❌ Error loading knowledge base: {e}")
+        finally:
+            self.load_seconds = round(time.perf_counter() - start, 3)
+            self._loaded.set()
+
+    def _claim_load(self) -> bool:
+        """Mark the store as loading; False if another caller already did"""
+        with self._lock:
+            if self.state != "not_loaded":
+                return False
+            self.state = "loading"
+            return True
+
+    def get(self, wait: bool = True):
+        """
+        Return the loaded vector store, loading it on first use
+
+        Args:
+            wait: Block until a load in progress finishes (default: True)
+
+        Returns:
+            The FAISS store, or None if loading failed or is still in
+            progress and wait is False
+        """
+        if self._claim_load():
+            self._load()
+        elif wait:
+            self._loaded.wait()
+        return self._store
+
+    def warm_up(self) -> None:
+        """Start loading the store on a background thread if not already loaded"""
+        if self._claim_load():
+            self._thread = threading.Thread(target=self._load, name="kb-warmup", daemon=True)
+            self._thread.start()
+
+    def stale(self) -> bool:
+        """True if the version on disk differs from the loaded one"""
+        if self.state not in ("ready", "failed"):
+            return False
+        store_path = resolve_store_path(self.store_root)
+        if not os.path.exists(os.path.join(store_path, "index.faiss")):
+            return False
+        return (store_path != self.info.get("path")
+                or store_fingerprint(store_path) != self.info.get("fingerprint"))
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Load the store's current version and swap it in
+
+        The new version is loaded while the old one keeps serving; the swap
+        is a single reference assignment, so searches already running finish
+        against the store they started with. If loading fails the old store
+        stays in place and the error is raised.
+
+        Args:
+            force: Reload even if the loaded version is still current
+
+        Returns:
+            True if a new store was swapped in, False if it was already
+            current or the initial load has not finished
+        """
+        if self.state in ("not_loaded", "loading"):
+            return False
+        with self._reload_lock:
+            if not force and not self.stale():
+                return False
+            start = time.perf_counter()
+            store, info = self._open()
+            with self._lock:
+                self._store, self.info = store, info
+                self.state, self.error = "ready", None
+                self.load_seconds = round(time.perf_counter() - start, 3)
+                self.reloads += 1
+        logger.info(f"🔄 Knowledge base reloaded from {info['path']} in {self.load_seconds}s")
+        return True
+
+    async def watch(self, interval: float) -> None:
+        """Poll the store every interval seconds, reloading when a new version is published"""
+        from .executors import run_in_thread
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await run_in_thread(self.stale):
+                    await run_in_thread(self.reload)
+            except Exception as e:
+                logger.error(f"❌ Knowledge base reload failed, still serving {self.info.get('path')}: {e}")
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def status(self) -> Dict:
+        """Return the load state, error and load time for status endpoints"""
+        return {
+            "state": self.state,
+            "error": self.error,
+            "load_seconds": self.load_seconds
+        }
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs):
+        store = self.get()
+        if store is None:
+            raise RuntimeError(self.error or "Knowledge base not available")
+        return store.similarity_search(query, k=k, **kwargs)
+
+    def batch_similarity_search(self, queries: List[str], k: int = 4) -> List:
+        store = self.get()
+        if store is None:
+            raise RuntimeError(self.error or "Knowledge base not available")
+        return batch_similarity_search(store, queries, k=k)
+
+    def __bool__(self) -> bool:
+        return self.get() is not None
+
+# Shared handle; the store is loaded on first use or by warm_up()
+knowledge_base = KnowledgeBaseHandle()
+
+def save_query_embeddings(path: Optional[str] = None) -> int:
+    """
+    Persist the runtime entries of the loaded store's query embedding cache
+    (to QUERY_EMBEDDING_CACHE_PATH unless path is given)
+
+    Only runs when QUERY_EMBEDDING_CACHE_PERSIST is enabled and the store
+    has been loaded. The precomputed vectors stay in the built store.
+
+    Returns:
+        Number of vectors written
+    """
+    from .embedding_cache import persist_enabled, runtime_embeddings_path
+
+    if not persist_enabled():
+        return 0
+    if not knowledge_base.ready:
+        return 0
+    cache = getattr(getattr(knowledge_base.get(), "embeddings", None), "cache", None)
+    if cache is None:
+        return 0
+
+    try:
+        return cache.save(path or runtime_embeddings_path(), pinned=False)
+    except OSError as e:
+        logger.warning(f"Could not save query embeddings: {e}")
+        return 0
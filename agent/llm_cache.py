@@ -0,0 +1,219 @@
+"""
+Content-addressed cache for Nemotron responses
+
+Two tiers: an in-memory LRU for hot entries and a SQLite file that persists
+across restarts. Keys are SHA-256 hashes of the model, prompt and sampling
+parameters, so identical requests share an entry. Entries expire after a
+TTL and the disk tier is trimmed least-recently-used first once it grows
+past its size budget.
+
+Configuration (environment):
+    LLM_CACHE_ENABLED         - "0"/"false" disables caching (default: enabled)
+    LLM_CACHE_PATH            - SQLite file (default: data/cache/llm_responses.sqlite3)
+    LLM_CACHE_TTL             - seconds before an entry expires (default: 7 days)
+    LLM_CACHE_MEMORY_ENTRIES  - in-memory LRU capacity (default: 256)
+    LLM_CACHE_MAX_BYTES       - disk tier size budget (default: 64MB)
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import weakref
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+def make_cache_key(model: str, prompt: str, **params) -> str:
+    """
+    Build a content-addressed cache key
+
+    Args:
+        model: Model name
+        prompt: Prompt text
+        **params: Sampling parameters (max_tokens, temperature, ...)
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    payload = json.dumps({"model": model, "prompt": prompt_hash, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# Every cache, so a forked child (a process pool worker) can reset them: a
+# SQLite connection must not be used across a fork, and a lock may have
+# been copied while another thread held it
+_instances: "weakref.WeakSet[LLMCache]" = weakref.WeakSet()
+# Connections inherited by forked children; kept referenced so they are
+# never used or closed (closing would also release the parent's locks)
+_inherited_connections = []
+
+def _reset_after_fork() -> None:
+    for cache in list(_instances):
+        cache._reset_after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+class LLMCache:
+    """Two-tier (memory LRU + SQLite) cache of LLM responses with TTL"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_memory_entries: int = 256,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+        enabled: bool = True
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0}
+        _instances.add(self)
+
+    def _reset_after_fork(self) -> None:
+        """In a forked child, use a new lock and open a new SQLite connection on next use"""
+        self._lock = threading.Lock()
+        if self._conn is not None:
+            _inherited_connections.append(self._conn)
+            self._conn = None
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite tier on first use; None if running memory-only"""
+        if self._conn is None and self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        return self._conn
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self._counters["expired"] += 1
+
+            conn = self._connect()
+            if conn is not None:
+                row = conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if not self._expired(created_at, now):
+                        conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                        self._remember(key, value, created_at)
+                        self._counters["disk_hits"] += 1
+                        return value
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._counters["expired"] += 1
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response in both tiers, evicting old disk entries if over budget"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._counters["writes"] += 1
+
+            conn = self._connect()
+            if conn is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at, last_access, size) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, now, now, len(value.encode("utf-8")))
+                )
+                self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under the size budget"""
+        if self.ttl_seconds > 0:
+            cursor = conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._counters["expired"] += max(cursor.rowcount, 0)
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+            if total <= self.max_disk_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+            self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            if conn is not None:
+                conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["enabled"] = self.enabled
+            stats["memory_entries"] = len(self._memory)
+            conn = self._connect()
+            if conn is not None:
+                count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+                stats["disk_entries"] = count
+                stats["disk_bytes"] = size
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+# Shared cache used by agent.nemotron_llm
+llm_cache = LLMCache(
+    path=os.getenv("LLM_CACHE_PATH", "data/cache/llm_responses.sqlite3"),
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600)),
+    max_memory_entries=int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256")),
+    max_disk_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    enabled=_env_flag("LLM_CACHE_ENABLED", True)
+)
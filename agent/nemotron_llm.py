@@ -2,10 +2,21 @@
 NVIDIA Nemotron 3.3 LLM wrapper for LDT compliance queries
 """
 import os
+import time
+import asyncio
 import logging
-from typing import Optional
+import threading
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+from .llm_cache import llm_cache, make_cache_key
+from .executors import run_in_thread
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -15,8 +26,255 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # NVIDIA API configuration using OpenAI client
+# NEMOTRON_BASE_URL can point at a local OpenAI-compatible stub for offline benchmarks
+NVIDIA_BASE_URL = os.getenv("NEMOTRON_BASE_URL", "https://integrate.api.nvidia.com/v1")
+NEMOTRON_MODEL = os.getenv("NEMOTRON_MODEL", "nvidia/llama-3.3-nemotron-super-49b-v1.5")
 
-def nemotron(prompt: str, max_tokens: int = 1024, temperature: float = 0.6) -> str:
+# Connection pool configuration shared by the sync and async clients
+NEMOTRON_MAX_CONNECTIONS = int(os.getenv("NEMOTRON_MAX_CONNECTIONS", "20"))
+NEMOTRON_MAX_KEEPALIVE = int(os.getenv("NEMOTRON_MAX_KEEPALIVE", "10"))
+NEMOTRON_KEEPALIVE_EXPIRY = float(os.getenv("NEMOTRON_KEEPALIVE_EXPIRY", "60"))
+NEMOTRON_CONNECT_TIMEOUT = float(os.getenv("NEMOTRON_CONNECT_TIMEOUT", "10"))
+NEMOTRON_TIMEOUT = float(os.getenv("NEMOTRON_TIMEOUT", "120"))
+NEMOTRON_METRICS_WINDOW = int(os.getenv("NEMOTRON_METRICS_WINDOW", "500"))
+
+@dataclass
+class CallMetrics:
+    """Latency breakdown for a single Nemotron call"""
+    connect_ms: float = 0.0       # TCP + TLS setup, 0 when a pooled connection was reused
+    generation_ms: float = 0.0    # Time spent waiting on the model after connecting
+    total_ms: float = 0.0
+    first_token_ms: Optional[float] = None  # Only set for streamed calls
+    reused_connection: bool = True
+    success: bool = True
+    mode: str = "sync"
+
+class _CallTracer:
+    """Collects httpcore trace events for one call into a CallMetrics record"""
+    
+    def __init__(self, metrics: CallMetrics):
+        self.metrics = metrics
+        self._connect_started: Optional[float] = None
+    
+    def on_event(self, name: str, info: dict) -> None:
+        now = time.perf_counter()
+        if name == "connection.connect_tcp.started":
+            self._connect_started = now
+            self.metrics.reused_connection = False
+        elif name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            if self._connect_started is not None:
+                self.metrics.connect_ms += (now - self._connect_started) * 1000
+                self._connect_started = now
+    
+    async def on_event_async(self, name: str, info: dict) -> None:
+        self.on_event(name, info)
+
+_active_tracer: ContextVar[Optional[_CallTracer]] = ContextVar("nemotron_tracer", default=None)
+_metrics_lock = threading.Lock()
+_metrics_history: deque = deque(maxlen=NEMOTRON_METRICS_WINDOW)
+
+def _install_trace(request: httpx.Request) -> None:
+    tracer = _active_tracer.get()
+    if tracer is not None:
+        request.extensions["trace"] = tracer.on_event
+
+async def _install_async_trace(request: httpx.Request) -> None:
+    tracer = _active_tracer.get()
+    if tracer is not None:
+        request.extensions["trace"] = tracer.on_event_async
+
+@contextmanager
+def _trace_connection(metrics: CallMetrics):
+    """Attach connection trace events from requests made in this block to metrics"""
+    token = _active_tracer.set(_CallTracer(metrics))
+    try:
+        yield metrics
+    finally:
+        _active_tracer.reset(token)
+
+def _record_metrics(metrics: CallMetrics, start: float) -> None:
+    """Finalize timings for a finished call and add it to the metrics window"""
+    metrics.total_ms = (time.perf_counter() - start) * 1000
+    metrics.generation_ms = max(0.0, metrics.total_ms - metrics.connect_ms)
+    with _metrics_lock:
+        _metrics_history.append(metrics)
+    logger.info(
+        f"⏱️ Nemotron {metrics.mode} call: connect={metrics.connect_ms:.1f}ms "
+        f"generation={metrics.generation_ms:.1f}ms total={metrics.total_ms:.1f}ms "
+        f"reused_connection={metrics.reused_connection}"
+    )
+
+@contextmanager
+def _track_call(mode: str):
+    """Time a Nemotron call and record its metrics"""
+    metrics = CallMetrics(mode=mode)
+    start = time.perf_counter()
+    try:
+        with _trace_connection(metrics):
+            yield metrics
+    except Exception:
+        metrics.success = False
+        raise
+    finally:
+        _record_metrics(metrics, start)
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+def get_recent_call_metrics() -> List[Dict]:
+    """Return the per-call metrics recorded in the current window"""
+    with _metrics_lock:
+        return [asdict(m) for m in _metrics_history]
+
+def get_latency_metrics() -> Dict:
+    """
+    Summarize recent Nemotron call latency
+    
+    Returns:
+        Dictionary with call counts, connection reuse rate and p50/p95 of
+        connect, generation and total time in milliseconds
+    """
+    with _metrics_lock:
+        history = list(_metrics_history)
+    
+    if not history:
+        return {"calls": 0}
+    
+    summary = {
+        "calls": len(history),
+        "failures": sum(1 for m in history if not m.success),
+        "connection_reuse_rate": round(sum(1 for m in history if m.reused_connection) / len(history), 3),
+    }
+    for field in ("connect_ms", "generation_ms", "total_ms", "first_token_ms"):
+        values = [getattr(m, field) for m in history if getattr(m, field) is not None]
+        if values:
+            summary[field] = {"p50": _percentile(values, 50), "p95": _percentile(values, 95)}
+    return summary
+
+def reset_latency_metrics() -> None:
+    """Clear the recorded call metrics"""
+    with _metrics_lock:
+        _metrics_history.clear()
+
+# Client registry: one pooled client per (base_url, api_key), reused across calls
+_client_lock = threading.Lock()
+_sync_clients: Dict[Tuple[str, str], OpenAI] = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=NEMOTRON_MAX_CONNECTIONS,
+        max_keepalive_connections=NEMOTRON_MAX_KEEPALIVE,
+        keepalive_expiry=NEMOTRON_KEEPALIVE_EXPIRY
+    )
+
+def _pool_timeout() -> httpx.Timeout:
+    return httpx.Timeout(NEMOTRON_TIMEOUT, connect=NEMOTRON_CONNECT_TIMEOUT)
+
+def get_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> OpenAI:
+    """
+    Return the shared synchronous Nemotron client
+    
+    Args:
+        api_key: API key (default: NVIDIA_API_KEY from the environment)
+        base_url: OpenAI-compatible endpoint (default: NVIDIA_BASE_URL)
+    
+    Returns:
+        Pooled OpenAI client with keep-alive connections
+    """
+    key = (base_url or NVIDIA_BASE_URL, api_key or _get_api_key())
+    with _client_lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            logger.info(f"🔌 Creating pooled Nemotron client for {key[0]}")
+            client = OpenAI(
+                base_url=key[0],
+                api_key=key[1],
+                http_client=DefaultHttpxClient(
+                    limits=_pool_limits(),
+                    timeout=_pool_timeout(),
+                    event_hooks={"request": [_install_trace]}
+                )
+            )
+            _sync_clients[key] = client
+        return client
+
+def get_async_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """
+    Return the shared async Nemotron client for the running event loop
+    
+    Async connection pools are bound to the loop that created them, so
+    clients are kept per loop and dropped when the loop is garbage collected.
+    """
+    key = (base_url or NVIDIA_BASE_URL, api_key or _get_api_key())
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(key)
+        if client is None:
+            logger.info(f"🔌 Creating pooled async Nemotron client for {key[0]}")
+            client = AsyncOpenAI(
+                base_url=key[0],
+                api_key=key[1],
+                http_client=DefaultAsyncHttpxClient(
+                    limits=_pool_limits(),
+                    timeout=_pool_timeout(),
+                    event_hooks={"request": [_install_async_trace]}
+                )
+            )
+            loop_clients[key] = client
+        return client
+
+def close_clients() -> None:
+    """Close pooled sync clients and forget async clients"""
+    with _client_lock:
+        for client in _sync_clients.values():
+            client.close()
+        _sync_clients.clear()
+        _async_clients.clear()
+
+async def aclose_clients() -> None:
+    """Close the pooled async clients owned by the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        loop_clients = _async_clients.pop(loop, {})
+    for client in loop_clients.values():
+        await client.close()
+
+def _get_api_key() -> str:
+    """Return the NVIDIA API key or raise if it is not configured"""
+    api_key = os.getenv('NVIDIA_API_KEY')
+    if not api_key:
+        logger.error("❌ NVIDIA_API_KEY environment variable not set")
+        raise ValueError(
+            "NVIDIA_API_KEY environment variable not set. "
+            "Please set your NVIDIA API key to use Nemotron."
+        )
+    return api_key
+
+def _completion_kwargs(prompt: str, max_tokens: int, temperature: float, stream: bool = False) -> dict:
+    """Build chat completion arguments shared by the sync and async clients"""
+    return dict(
+        model=NEMOTRON_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=temperature,
+        top_p=0.95,
+        max_tokens=max_tokens,
+        frequency_penalty=0,
+        presence_penalty=0,
+        stream=stream
+    )
+
+def _cache_key(prompt: str, max_tokens: int, temperature: float) -> str:
+    """Cache key covering the endpoint, model, prompt and every sampling parameter sent"""
+    kwargs = _completion_kwargs(prompt, max_tokens, temperature)
+    params = {k: v for k, v in kwargs.items() if k not in ("model", "messages", "stream")}
+    # The same model name can be served by different endpoints (e.g. a local stub)
+    return make_cache_key(NEMOTRON_MODEL, prompt, base_url=NVIDIA_BASE_URL.rstrip("/"), **params)
+
+def nemotron(prompt: str, max_tokens: int = 1024, temperature: float = 0.6, use_cache: bool = True) -> str:
     """
     Send prompt to NVIDIA Nemotron using OpenAI client
     
@@ -24,6 +282,7 @@ def nemotron(prompt: str, max_tokens: int = 1024, temperature: float = 0.6) -> s
         prompt: The input prompt for the model
         max_tokens: Maximum tokens to generate (default: 1024)
         temperature: Sampling temperature (default: 0.6)
+        use_cache: Serve and store the response via the LLM cache (default: True)
     
     Returns:
         Generated text response
@@ -32,34 +291,26 @@ def nemotron(prompt: str, max_tokens: int = 1024, temperature: float = 0.6) -> s
     logger.info(f"📝 Prompt length: {len(prompt)} characters")
     logger.info(f"⚙️ Parameters: max_tokens={max_tokens}, temperature={temperature}")
     
-    api_key = os.getenv('NVIDIA_API_KEY')
-    if not api_key:
-        logger.error("❌ NVIDIA_API_KEY environment variable not set")
-        raise ValueError(
-            "NVIDIA_API_KEY environment variable not set. "
-            "Please set your NVIDIA API key to use Nemotron."
-        )
+    api_key = _get_api_key()
+    
+    cache_key = _cache_key(prompt, max_tokens, temperature)
+    if use_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            logger.info("💾 Using cached Nemotron response")
+            return cached
     
     try:
-        # Initialize OpenAI client with NVIDIA base URL
-        client = OpenAI(
-            base_url="https://integrate.api.nvidia.com/v1",
-            api_key=api_key
-        )
+        # Reuse the pooled OpenAI client for the NVIDIA base URL
+        client = get_client(api_key)
         
         logger.info("🌐 Making API request to NVIDIA endpoint")
         
         # Make the API call
-        completion = client.chat.completions.create(
-            model="nvidia/llama-3.3-nemotron-super-49b-v1.5",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature,
-            top_p=0.95,
-            max_tokens=max_tokens,
-            frequency_penalty=0,
-            presence_penalty=0,
-            stream=False
-        )
+        with _track_call("sync"):
+            completion = client.chat.completions.create(
+                **_completion_kwargs(prompt, max_tokens, temperature)
+            )
         
         logger.info("✅ NVIDIA API call successful")
         
@@ -68,6 +319,8 @@ def nemotron(prompt: str, max_tokens: int = 1024, temperature: float = 0.6) -> s
         logger.info(f"📄 Generated response length: {len(generated_content)} characters")
         logger.info("🎯 Using NVIDIA Nemotron model response")
         
+        if use_cache:
+            llm_cache.set(cache_key, generated_content)
         return generated_content
         
     except Exception as e:
@@ -75,6 +328,163 @@ def nemotron(prompt: str, max_tokens: int = 1024, temperature: float = 0.6) -> s
         logger.error("💥 API call failed - no fallback available")
         raise Exception(f"NVIDIA API call failed: {e}")
 
+async def nemotron_async(prompt: str, max_tokens: int = 1024, temperature: float = 0.6, use_cache: bool = True) -> str:
+    """
+    Async variant of nemotron() using AsyncOpenAI
+    
+    Awaiting this does not block the event loop, so API handlers can
+    serve other requests while generation is in progress.
+    
+    Args:
+        prompt: The input prompt for the model
+        max_tokens: Maximum tokens to generate (default: 1024)
+        temperature: Sampling temperature (default: 0.6)
+        use_cache: Serve and store the response via the LLM cache (default: True)
+    
+    Returns:
+        Generated text response
+    """
+    logger.info("🚀 NVIDIA Nemotron async API call initiated")
+    logger.info(f"📝 Prompt length: {len(prompt)} characters")
+    
+    api_key = _get_api_key()
+    
+    cache_key = _cache_key(prompt, max_tokens, temperature)
+    if use_cache:
+        # The disk tier is SQLite; keep it off the event loop
+        cached = await run_in_thread(llm_cache.get, cache_key)
+        if cached is not None:
+            logger.info("💾 Using cached Nemotron response")
+            return cached
+    
+    try:
+        client = get_async_client(api_key)
+        
+        with _track_call("async"):
+            completion = await client.chat.completions.create(
+                **_completion_kwargs(prompt, max_tokens, temperature)
+            )
+        
+        generated_content = completion.choices[0].message.content
+        logger.info(f"✅ NVIDIA async API call successful ({len(generated_content)} characters)")
+        
+        if use_cache:
+            await run_in_thread(llm_cache.set, cache_key, generated_content)
+        return generated_content
+        
+    except Exception as e:
+        logger.error(f"❌ NVIDIA async API call failed: {e}")
+        raise Exception(f"NVIDIA API call failed: {e}")
+
+def _delta_text(chunk) -> str:
+    """Return the content delta carried by a streamed completion chunk"""
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+def nemotron_stream(prompt: str, max_tokens: int = 1024, temperature: float = 0.6, use_cache: bool = True) -> Iterator[str]:
+    """
+    Stream a Nemotron response token by token
+    
+    Args:
+        prompt: The input prompt for the model
+        max_tokens: Maximum tokens to generate (default: 1024)
+        temperature: Sampling temperature (default: 0.6)
+    
+    Yields:
+        Text deltas as they are generated; a cached response is yielded whole
+    """
+    logger.info("🚀 NVIDIA Nemotron streaming API call initiated")
+    logger.info(f"📝 Prompt length: {len(prompt)} characters")
+    
+    api_key = _get_api_key()
+    
+    cache_key = _cache_key(prompt, max_tokens, temperature)
+    if use_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            logger.info("💾 Using cached Nemotron response")
+            yield cached
+            return
+    
+    metrics = CallMetrics(mode="stream")
+    start = time.perf_counter()
+    stream = None
+    parts = []
+    
+    try:
+        client = get_client(api_key)
+        with _trace_connection(metrics):
+            stream = client.chat.completions.create(
+                **_completion_kwargs(prompt, max_tokens, temperature, stream=True)
+            )
+        for chunk in stream:
+            delta = _delta_text(chunk)
+            if delta:
+                if metrics.first_token_ms is None:
+                    metrics.first_token_ms = (time.perf_counter() - start) * 1000
+                parts.append(delta)
+                yield delta
+        if use_cache:
+            llm_cache.set(cache_key, "".join(parts))
+    except Exception as e:
+        metrics.success = False
+        logger.error(f"❌ NVIDIA streaming API call failed: {e}")
+        raise Exception(f"NVIDIA API call failed: {e}")
+    finally:
+        if stream is not None:
+            stream.close()
+        _record_metrics(metrics, start)
+
+async def nemotron_stream_async(prompt: str, max_tokens: int = 1024, temperature: float = 0.6, use_cache: bool = True) -> AsyncIterator[str]:
+    """
+    Async variant of nemotron_stream() using the pooled AsyncOpenAI client
+    
+    Yields:
+        Text deltas as they are generated
+    """
+    logger.info("🚀 NVIDIA Nemotron async streaming API call initiated")
+    logger.info(f"📝 Prompt length: {len(prompt)} characters")
+    
+    api_key = _get_api_key()
+    
+    cache_key = _cache_key(prompt, max_tokens, temperature)
+    if use_cache:
+        cached = await run_in_thread(llm_cache.get, cache_key)
+        if cached is not None:
+            logger.info("💾 Using cached Nemotron response")
+            yield cached
+            return
+    
+    metrics = CallMetrics(mode="async_stream")
+    start = time.perf_counter()
+    stream = None
+    parts = []
+    
+    try:
+        client = get_async_client(api_key)
+        with _trace_connection(metrics):
+            stream = await client.chat.completions.create(
+                **_completion_kwargs(prompt, max_tokens, temperature, stream=True)
+            )
+        async for chunk in stream:
+            delta = _delta_text(chunk)
+            if delta:
+                if metrics.first_token_ms is None:
+                    metrics.first_token_ms = (time.perf_counter() - start) * 1000
+                parts.append(delta)
+                yield delta
+        if use_cache:
+            await run_in_thread(llm_cache.set, cache_key, "".join(parts))
+    except Exception as e:
+        metrics.success = False
+        logger.error(f"❌ NVIDIA async streaming API call failed: {e}")
+        raise Exception(f"NVIDIA API call failed: {e}")
+    finally:
+        if stream is not None:
+            await stream.close()
+        _record_metrics(metrics, start)
+
 def nemotron_fallback(prompt: str) -> str:
     """
     Fallback function when NVIDIA API is not available
@@ -0,0 +1,240 @@
+"""
+Pluggable PDF text extraction backends
+
+pypdfium2 and pdfminer.six are used when installed; PyPDF2 (a core
+dependency) is always available as the fallback. The backend is chosen per
+call or with the PDF_BACKEND environment variable:
+    PDF_BACKEND - "auto" (default), "pypdfium2", "pdfminer" or "pypdf2"
+
+"auto" prefers pypdfium2, then pdfminer, then PyPDF2. A backend that is not
+installed, or that cannot open a particular document, falls back to the
+next available one.
+
+Backends can be told to skip pages (e.g. ones already in the extraction
+cache); page_fingerprints() identifies pages across uploads without
+extracting their text.
+"""
+import io
+import os
+import hashlib
+import itertools
+import logging
+import importlib.util
+from dataclasses import dataclass
+from typing import Callable, Collection, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _as_stream(source):
+    """PDF bytes become a file object; paths and file objects pass through"""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+class _Excluding:
+    """Container of every page number except the skipped ones (pdfminer page_numbers)"""
+
+    def __init__(self, skip: Collection[int]):
+        self.skip = skip
+
+    def __contains__(self, page_number) -> bool:
+        return page_number not in self.skip
+
+    def __bool__(self) -> bool:
+        return True
+
+def _open_pypdfium2(source, skip: Collection[int] = ()) -> Tuple[Optional[int], Iterator[str]]:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(bytes(source) if isinstance(source, bytearray) else source)
+
+    def pages():
+        try:
+            for index in range(len(pdf)):
+                if index in skip:
+                    continue
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_range().replace("\r\n", "\n")
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+
+    return len(pdf), pages()
+
+def _open_pdfminer(source, skip: Collection[int] = ()) -> Tuple[Optional[int], Iterator[str]]:
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    layouts = extract_pages(_as_stream(source), page_numbers=_Excluding(skip) if skip else None)
+    # extract_pages is lazy; parse the first page now so unreadable files
+    # fail here and fall back to the next backend
+    first = next(layouts, None)
+
+    def pages():
+        if first is None:
+            return
+        for layout in itertools.chain([first], layouts):
+            yield "".join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+
+    # Page count is unknown until the whole file has been parsed
+    return None, pages()
+
+def _open_pypdf2(source, skip: Collection[int] = ()) -> Tuple[Optional[int], Iterator[str]]:
+    from PyPDF2 import PdfReader
+
+    pdf_reader = PdfReader(_as_stream(source))
+    return len(pdf_reader.pages), (page.extract_text() or "" for index, page in enumerate(pdf_reader.pages)
+                                   if index not in skip)
+
+@dataclass
+class PdfBackend:
+    """A PDF parser: the module it needs and how to open a document with it"""
+    name: str
+    module: str
+    open: Callable[..., Tuple[Optional[int], Iterator[str]]]
+
+    def available(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+# In "auto" preference order
+BACKENDS = {
+    backend.name: backend for backend in (
+        PdfBackend("pypdfium2", "pypdfium2", _open_pypdfium2),
+        PdfBackend("pdfminer", "pdfminer", _open_pdfminer),
+        PdfBackend("pypdf2", "PyPDF2", _open_pypdf2),
+    )
+}
+
+def available_backends() -> List[str]:
+    """Names of installed backends in preference order"""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+def resolve_backends(name: Optional[str] = None) -> List[PdfBackend]:
+    """
+    Return the backends to try, in order, for a requested backend name
+
+    Args:
+        name: Backend name or "auto" (default: PDF_BACKEND or "auto")
+
+    Raises:
+        ValueError: If name is not a known backend
+    """
+    name = (name or os.getenv("PDF_BACKEND", "auto")).strip().lower()
+    if name != "auto" and name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{name}'. Choose from: auto, {', '.join(BACKENDS)}")
+
+    installed = [BACKENDS[backend] for backend in available_backends()]
+    if name == "auto":
+        return installed
+    if not BACKENDS[name].available():
+        logger.warning(f"⚠️  PDF backend '{name}' is not installed, falling back to {installed[0].name}")
+        return installed
+    return [BACKENDS[name]] + [backend for backend in installed if backend.name != name]
+
+def open_pdf(source, backend: Optional[str] = None,
+             skip: Collection[int] = ()) -> Tuple[str, Optional[int], Iterator[str]]:
+    """
+    Open a PDF with the first backend that can read it
+
+    Args:
+        source: PDF bytes, a file path or a binary file object
+        backend: Backend name or "auto" (default: PDF_BACKEND or "auto")
+        skip: 0-based page indexes whose text is not needed
+
+    Returns:
+        (backend name, page count if known, iterator of page texts for every
+        page not in skip, in page order)
+    """
+    errors = []
+    for candidate in resolve_backends(backend):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        try:
+            page_count, pages = candidate.open(source, skip)
+            return candidate.name, page_count, pages
+        except Exception as e:
+            errors.append(f"{candidate.name}: {e}")
+            logger.warning(f"⚠️  PDF backend '{candidate.name}' failed to open document: {e}")
+    raise ValueError(f"No PDF backend could open the document ({'; '.join(errors)})")
+
+def page_fingerprints(source) -> List[str]:
+    """
+    Hash each page's content stream and the fonts and forms it draws with
+
+    Fonts and forms are hashed by content, following indirect references,
+    so an encoding or ToUnicode map that differs between two uploads
+    changes the fingerprint even when it sits at the same object number.
+    Only the PDF structure is parsed (with PyPDF2) and no text is extracted,
+    so this is much cheaper than extraction. Pages that hash the same in two
+    uploads produce the same text.
+
+    Args:
+        source: PDF bytes, a file path or a binary file object
+
+    Returns:
+        Hex SHA-256 digest per page, in page order
+    """
+    from PyPDF2 import PdfReader
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+    pdf_reader = PdfReader(_as_stream(source))
+    # Fonts and forms are usually shared between pages: hash each object once
+    object_digests = {}
+
+    def object_digest(obj) -> bytes:
+        """Digest of an object's content, following indirect references"""
+        ref = (obj.idnum, obj.generation) if isinstance(obj, IndirectObject) else None
+        if ref is not None:
+            if ref in object_digests:
+                return object_digests[ref]
+            object_digests[ref] = repr(ref).encode()  # stands in for the object inside a reference cycle
+            obj = obj.get_object()
+        digest = hashlib.sha256(type(obj).__name__.encode())
+        if isinstance(obj, StreamObject):
+            digest.update(obj.get_data())
+        if isinstance(obj, DictionaryObject):
+            for key in sorted(obj):
+                if key == "/Parent":
+                    continue
+                digest.update(key.encode())
+                value = obj.raw_get(key)
+                digest.update(resources_digest(value) if key == "/Resources" else object_digest(value))
+        elif isinstance(obj, ArrayObject):
+            for item in obj:
+                digest.update(object_digest(item))
+        elif not isinstance(obj, StreamObject):
+            digest.update(repr(obj).encode())
+        if ref is not None:
+            object_digests[ref] = digest.digest()
+        return digest.digest()
+
+    def resources_digest(resources) -> bytes:
+        digest = hashlib.sha256()
+        if resources is None:
+            return digest.digest()
+        resources = resources.get_object()
+        for category in ("/Font", "/XObject"):
+            entries = resources.get(category)
+            if entries is None:
+                continue
+            for name, obj in sorted(entries.get_object().items()):
+                if category == "/XObject" and obj.get_object().get("/Subtype") != "/Form":
+                    continue  # Images carry no text
+                digest.update(name.encode())
+                digest.update(object_digest(obj))
+        return digest.digest()
+
+    fingerprints = []
+    for page in pdf_reader.pages:
+        digest = hashlib.sha256()
+        contents = page.get_contents()
+        if contents is not None:
+            digest.update(contents.get_data())
+        digest.update(resources_digest(page.get("/Resources")))
+        digest.update(repr(page.rotation).encode())
+        fingerprints.append(digest.hexdigest())
+    return fingerprints
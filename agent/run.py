@@ -2,65 +2,38 @@
 Main agent orchestration for LDT Compliance Copilot
 """
 import os
+import time
+import hashlib
 import logging
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import date
-from jinja2 import Template
-from typing import Dict, List, Optional
+from functools import lru_cache
+from jinja2 import ChoiceLoader, DictLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-from .gap_critic import analyze_completeness, RECOMMENDED_SECTIONS
-from .nemotron_llm import nemotron
-from .knowledge_base import knowledge_base
-
-def extract_text_from_file(file_content: bytes, filename: str) -> str:
-    """
-    Extract text from uploaded file based on file type
-    
-    Args:
-        file_content: Raw file bytes
-        filename: Name of the uploaded file
-    
-    Returns:
-        Extracted text content
-    """
-    try:
-        if filename.lower().endswith('.pdf'):
-            from PyPDF2 import PdfReader
-            import io
-            
-            pdf_reader = PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-            
-        elif filename.lower().endswith(('.docx', '.doc')):
-            from docx import Document
-            import io
-            
-            doc = Document(io.BytesIO(file_content))
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
-            
-        elif filename.lower().endswith('.txt'):
-            return file_content.decode('utf-8', errors='ignore')
-        
-        else:
-            # Try to decode as text
-            return file_content.decode('utf-8', errors='ignore')
-            
-    except Exception as e:
-        return f"Error extracting text from {filename}: {e}"
+from .gap_critic import analyze_completeness, section_registry, RECOMMENDED_SECTIONS
+from .nemotron_llm import nemotron, nemotron_async, nemotron_stream, nemotron_stream_async
+from .knowledge_base import knowledge_base, batch_similarity_search
+from .extraction import extract_text_from_file, extract_document, cached_document, detect_document, ExtractedDocument
+from .extraction_cache import extraction_cache, content_digest
+from .analysis_memo import ai_analysis_memo
+from .artifact_cache import artifact_cache, artifact_key, source_fingerprint
+from .llm_cache import _env_flag
+from .executors import run_in_thread, run_in_process
 
 def get_regulatory_context(missing_sections: List[str], k: int = 3) -> List:
     """
     Get relevant regulatory context from knowledge base
     
+    All sections are embedded and searched in a single batch, and results
+    are deduplicated by chunk id.
+    
     Args:
         missing_sections: List of missing section names
         k: Number of relevant chunks to retrieve per section
@@ -68,27 +41,15 @@ def get_regulatory_context(missing_sections: List[str], k: int = 3) -> List:
     Returns:
         List of relevant document chunks
     """
-    if not knowledge_base:
+    kb = knowledge_base.get()
+    if kb is None:
         return []
     
-    all_chunks = []
-    
-    for section in missing_sections:
-        try:
-            # Search for context related to this section
-            chunks = knowledge_base.similarity_search(section, k=k)
-            all_chunks.extend(chunks)
-        except Exception as e:
-            print(f"Error retrieving context for {section}: {e}")
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_chunks = []
-    for chunk in all_chunks:
-        chunk_text = chunk.page_content
-        if chunk_text not in seen:
-            seen.add(chunk_text)
-            unique_chunks.append(chunk)
+    try:
+        unique_chunks = batch_similarity_search(kb, missing_sections, k=k)
+    except Exception as e:
+        logger.error(f"Error retrieving context for {missing_sections}: {e}")
+        return []
     
     return unique_chunks[:6]  # Limit to 6 most relevant chunks
 
@@ -139,6 +100,9 @@ def generate_executive_summary(analysis: Dict, context_chunks: List) -> str:
         for i, (section, desc) in enumerate(analysis['missing_required'].items(), 1):
             summary += f"{i}. **{section}** - {desc}\n"
     
+    if analysis.get('extraction_truncated'):
+        summary += f"\n**NOTE:** Only part of the document was analyzed ({analysis['extraction_truncated']}).\n"
+    
     summary += f"""
 
 **REGULATORY IMPACT:**
@@ -154,28 +118,55 @@ def generate_executive_summary(analysis: Dict, context_chunks: List) -> str:
     
     return summary
 
-def generate_ai_analysis(missing_sections: Dict[str, str], context_chunks: List) -> str:
+NO_MISSING_SECTIONS_ANALYSIS = "All required regulatory sections have been identified in your submission. Please ensure each section contains comprehensive information meeting FDA and CLIA standards."
+
+def format_section_evidence(section_locations: Optional[Dict[str, List[Dict]]], max_sections: int = 8) -> str:
     """
-    Generate detailed AI analysis of missing sections with regulatory context
+    Format one evidence span per located section for the LLM prompt
+    
+    Args:
+        section_locations: analysis['section_locations'] from analyze_completeness
+        max_sections: Maximum number of sections to include
+    
+    Returns:
+        One line per section with its page (when known) and snippet
+    """
+    lines = []
+    for section, locations in list((section_locations or {}).items())[:max_sections]:
+        if not locations:
+            continue
+        location = locations[0]
+        page = f" (page {location['page']})" if location.get('page') else ""
+        lines.append(f"- {section}{page}: \"{location['snippet']}\"")
+    return "\n".join(lines)
+
+def build_ai_analysis_prompt(missing_sections: Dict[str, str], context_chunks: List,
+                             section_locations: Optional[Dict[str, List[Dict]]] = None) -> str:
+    """
+    Build the Nemotron prompt for the detailed gap analysis
     
     Args:
         missing_sections: Dictionary of missing sections and descriptions
         context_chunks: Relevant regulatory document chunks
+        section_locations: Where present sections were found, so the model
+            sees short evidence spans rather than the whole submission
     
     Returns:
-        AI-generated detailed analysis text
+        Prompt text
     """
-    if not missing_sections:
-        return "All required regulatory sections have been identified in your submission. Please ensure each section contains comprehensive information meeting FDA and CLIA standards."
-    
     # Prepare context for AI
     context_text = "\n\n".join([chunk.page_content for chunk in context_chunks[:4]])
+    evidence_text = format_section_evidence(section_locations)
+    evidence_block = f"""
+Sections Already Present (evidence from the submission):
+{evidence_text}
+""" if evidence_text else ""
     
-    prompt = f"""
+    return f"""
 As a regulatory compliance expert, provide detailed guidance for the missing sections in this LDT submission:
 
 Missing Sections: {list(missing_sections.keys())}
-
+{evidence_block}
 Regulatory Context:
 {context_text}
 
@@ -187,66 +178,141 @@ For each missing section, provide:
 
 Cite specific CFR sections and CLIA requirements where applicable. Focus on actionable guidance for regulatory compliance.
 """
+
+def memoized_ai_analysis(missing_sections: Dict[str, str]) -> Optional[str]:
+    """Return the memoized analysis for this missing-section set, if any"""
+    if not ai_analysis_memo.enabled:
+        return None
+    analysis = ai_analysis_memo.get(missing_sections)
+    if analysis is not None:
+        logger.info(f"♻️  Using memoized analysis for {len(missing_sections)} missing sections")
+    return analysis
+
+def memoizable_prompt(missing_sections: Dict[str, str], context_chunks: List,
+                      section_locations: Optional[Dict[str, List[Dict]]] = None) -> str:
+    """
+    Gap analysis prompt; with the memo enabled, per-file section evidence is
+    left out so the result can be shared by every submission with the same gaps
+    """
+    if ai_analysis_memo.enabled:
+        section_locations = None
+    return build_ai_analysis_prompt(missing_sections, context_chunks, section_locations)
+
+def remember_ai_analysis(missing_sections: Dict[str, str], analysis: str) -> None:
+    if ai_analysis_memo.enabled and analysis:
+        ai_analysis_memo.put(missing_sections, analysis)
+
+def generate_ai_analysis(missing_sections: Dict[str, str], context_chunks: List,
+                         section_locations: Optional[Dict[str, List[Dict]]] = None) -> str:
+    """
+    Generate detailed AI analysis of missing sections with regulatory context
+    
+    Args:
+        missing_sections: Dictionary of missing sections and descriptions
+        context_chunks: Relevant regulatory document chunks
+        section_locations: Where present sections were found in the submission
+    
+    Returns:
+        AI-generated detailed analysis text
+    """
+    if not missing_sections:
+        return NO_MISSING_SECTIONS_ANALYSIS
+    
+    memoized = memoized_ai_analysis(missing_sections)
+    if memoized is not None:
+        return memoized
+    
+    prompt = memoizable_prompt(missing_sections, context_chunks, section_locations)
     
     try:
         logger.info("🔑 Attempting NVIDIA API call for detailed analysis")
         response = nemotron(prompt)
         logger.info("✅ Successfully used NVIDIA API for detailed analysis")
+        remember_ai_analysis(missing_sections, response)
         return response
     except Exception as e:
         logger.error(f"❌ Error generating detailed analysis: {e}")
         logger.error("💥 Detailed analysis failed - NVIDIA API required")
         raise Exception(f"Detailed analysis failed: {e}")
 
-def generate_gap_report(file_content: bytes, filename: str) -> str:
-    """
-    Generate comprehensive gap analysis report
+async def generate_ai_analysis_async(missing_sections: Dict[str, str], context_chunks: List,
+                                     section_locations: Optional[Dict[str, List[Dict]]] = None) -> str:
+    """Async variant of generate_ai_analysis using the non-blocking Nemotron client"""
+    if not missing_sections:
+        return NO_MISSING_SECTIONS_ANALYSIS
     
-    Args:
-        file_content: Raw file bytes
-        filename: Name of the uploaded file
+    memoized = await run_in_thread(memoized_ai_analysis, missing_sections)
+    if memoized is not None:
+        return memoized
+    
+    prompt = memoizable_prompt(missing_sections, context_chunks, section_locations)
     
-    Returns:
-        Formatted markdown report
-    """
-    logger.info(f"📋 Starting gap analysis for file: {filename}")
     try:
-        # Extract text from file
-        text = extract_text_from_file(file_content, filename)
-        
-        if text.startswith("Error"):
-            return f"# Error Processing File\n\n{text}"
-        
-        # Analyze completeness
-        analysis = analyze_completeness(text)
-        
-        # Get regulatory context
-        context_chunks = get_regulatory_context(list(analysis['missing_required'].keys()))
-        
-        # Generate executive summary and detailed analysis
-        executive_summary = generate_executive_summary(analysis, context_chunks)
-        ai_analysis = generate_ai_analysis(analysis['missing_required'], context_chunks)
-        
-        # Prepare template variables
-        template_vars = {
-            'date': date.today().strftime("%B %d, %Y"),
-            'completeness_score': analysis['completeness_score'],
-            'missing_sections': analysis['missing_required'],
-            'recommended_sections': analysis['missing_recommended'],
-            'present_sections': analysis['present_sections'],
-            'executive_summary': executive_summary,
-            'ai_analysis': ai_analysis,
-            'regulatory_sources': context_chunks
-        }
-        
-        # Load and render template
-        template_path = "templates/report_template.md"
-        if os.path.exists(template_path):
-            with open(template_path, 'r') as f:
-                template_content = f.read()
-        else:
-            # Fallback template
-            template_content = """
+        logger.info("🔑 Attempting async NVIDIA API call for detailed analysis")
+        response = await nemotron_async(prompt)
+        await run_in_thread(remember_ai_analysis, missing_sections, response)
+        return response
+    except Exception as e:
+        logger.error(f"❌ Error generating detailed analysis: {e}")
+        raise Exception(f"Detailed analysis failed: {e}")
+
+def generate_ai_analysis_stream(missing_sections: Dict[str, str], context_chunks: List,
+                                section_locations: Optional[Dict[str, List[Dict]]] = None) -> Iterator[str]:
+    """Streaming variant of generate_ai_analysis, yielding text as it is generated"""
+    if not missing_sections:
+        yield NO_MISSING_SECTIONS_ANALYSIS
+        return
+    
+    memoized = memoized_ai_analysis(missing_sections)
+    if memoized is not None:
+        yield memoized
+        return
+    
+    prompt = memoizable_prompt(missing_sections, context_chunks, section_locations)
+    try:
+        logger.info("🔑 Attempting streaming NVIDIA API call for detailed analysis")
+        parts = []
+        for token in nemotron_stream(prompt):
+            parts.append(token)
+            yield token
+        remember_ai_analysis(missing_sections, "".join(parts))
+    except Exception as e:
+        logger.error(f"❌ Error generating detailed analysis: {e}")
+        raise Exception(f"Detailed analysis failed: {e}")
+
+async def generate_ai_analysis_stream_async(missing_sections: Dict[str, str], context_chunks: List,
+                                            section_locations: Optional[Dict[str, List[Dict]]] = None) -> AsyncIterator[str]:
+    """Async streaming variant of generate_ai_analysis"""
+    if not missing_sections:
+        yield NO_MISSING_SECTIONS_ANALYSIS
+        return
+    
+    memoized = await run_in_thread(memoized_ai_analysis, missing_sections)
+    if memoized is not None:
+        yield memoized
+        return
+    
+    prompt = memoizable_prompt(missing_sections, context_chunks, section_locations)
+    try:
+        logger.info("🔑 Attempting async streaming NVIDIA API call for detailed analysis")
+        parts = []
+        async for token in nemotron_stream_async(prompt):
+            parts.append(token)
+            yield token
+        await run_in_thread(remember_ai_analysis, missing_sections, "".join(parts))
+    except Exception as e:
+        logger.error(f"❌ Error generating detailed analysis: {e}")
+        raise Exception(f"Detailed analysis failed: {e}")
+
+def describe_sources(chunks: List) -> List[str]:
+    """Return the source names of retrieved chunks for display"""
+    sources = []
+    for chunk in chunks:
+        if hasattr(chunk, 'metadata'):
+            sources.append(chunk.metadata.get('source', 'Unknown source'))
+    return sources
+
+FALLBACK_REPORT_TEMPLATE = """
 # LDT Compliance Gap Report
 
 **Date:** {{ date }}
@@ -266,40 +332,391 @@ def generate_gap_report(file_content: bytes, filename: str) -> str:
 > *{{ source.metadata.source }}*
 {% endfor %}
 """
+
+REPORT_TEMPLATE_PATH = "templates/report_template.md"
+
+@lru_cache(maxsize=None)
+def report_environment() -> Environment:
+    """
+    Jinja2 environment for the markdown report, created on first use
+    
+    Templates are compiled once per process; compiled code is also kept in
+    REPORT_TEMPLATE_CACHE_DIR (default: data/cache/templates) so new
+    processes skip the compile, unless that directory cannot be written
+    (a read-only working directory). REPORT_TEMPLATE_AUTO_RELOAD=1 (set by
+    the development servers) recompiles templates when their file changes.
+    FALLBACK_REPORT_TEMPLATE is used when the template file does not exist.
+    """
+    cache_dir = os.getenv("REPORT_TEMPLATE_CACHE_DIR", "data/cache/templates")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        if not os.access(cache_dir, os.W_OK):
+            raise PermissionError("not writable")
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    except OSError as e:
+        logger.warning(f"⚠️ Report template bytecode cache disabled ({cache_dir}): {e}")
+        bytecode_cache = None
+    template_dir, template_name = os.path.split(REPORT_TEMPLATE_PATH)
+    return Environment(
+        loader=ChoiceLoader([
+            FileSystemLoader(template_dir),
+            DictLoader({template_name: FALLBACK_REPORT_TEMPLATE})
+        ]),
+        bytecode_cache=bytecode_cache,
+        auto_reload=_env_flag("REPORT_TEMPLATE_AUTO_RELOAD", False)
+    )
+
+# Source hash of each loaded report template, for artifact cache keys
+_template_fingerprints: "weakref.WeakKeyDictionary[Template, str]" = weakref.WeakKeyDictionary()
+
+def report_template() -> Template:
+    """The compiled report template (reloaded first if auto-reload is on and the file changed)"""
+    environment = report_environment()
+    name = os.path.basename(REPORT_TEMPLATE_PATH)
+    template = environment.get_template(name)
+    if template not in _template_fingerprints:
+        source, _, _ = environment.loader.get_source(environment, name)
+        _template_fingerprints[template] = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    return template
+
+def report_template_vars(analysis: Dict, executive_summary: str, ai_analysis: str, context_chunks: List) -> Dict:
+    """Variables the report template is rendered with"""
+    return {
+        'date': date.today().strftime("%B %d, %Y"),
+        'completeness_score': analysis['completeness_score'],
+        'missing_sections': analysis['missing_required'],
+        'recommended_sections': analysis['missing_recommended'],
+        'present_sections': analysis['present_sections'],
+        'section_locations': analysis.get('section_locations', {}),
+        'executive_summary': executive_summary,
+        'ai_analysis': ai_analysis,
+        'regulatory_sources': context_chunks
+    }
+
+def report_markdown_key(analysis: Dict, executive_summary: str, ai_analysis: str, context_chunks: List) -> str:
+    """Artifact cache key of the report render_report produces for these inputs today"""
+    payload = {
+        'date': date.today().isoformat(),
+        'analysis': {name: analysis.get(name) for name in (
+            'completeness_score', 'missing_required', 'missing_recommended', 'present_sections', 'section_locations'
+        )},
+        'executive_summary': executive_summary,
+        'ai_analysis': ai_analysis,
+        'sources': [(chunk.page_content, chunk.metadata) for chunk in context_chunks],
+        'template': _template_fingerprints[report_template()]
+    }
+    return artifact_key("md", payload, source_fingerprint(__file__))
+
+def render_report(analysis: Dict, executive_summary: str, ai_analysis: str, context_chunks: List) -> str:
+    """
+    Render the markdown gap report from already computed analysis results
+    
+    Args:
+        analysis: Complete analysis results from analyze_completeness
+        executive_summary: Executive summary text
+        ai_analysis: AI-generated detailed analysis text
+        context_chunks: Relevant regulatory document chunks
+    
+    Returns:
+        Formatted markdown report
+    """
+    template_vars = report_template_vars(analysis, executive_summary, ai_analysis, context_chunks)
+    return report_template().render(**template_vars)
+
+class ExtractionError(Exception):
+    """Raised when no usable text can be extracted from an uploaded file"""
+
+@dataclass
+class AnalysisResult:
+    """Everything produced by a single pass of the analysis pipeline"""
+    filename: str
+    text: str
+    analysis: Dict
+    context_chunks: List
+    executive_summary: str
+    ai_analysis: str
+    report_markdown: str
+    timings: Dict[str, float] = field(default_factory=dict)
+
+@contextmanager
+def timed(timings: Dict[str, float], stage: str):
+    """Record the seconds spent in a block under timings[stage]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round(time.perf_counter() - start, 3)
+
+class AnalysisPipeline:
+    """
+    Single-pass document analysis pipeline
+    
+    Each stage (extraction, gap analysis, retrieval, LLM analysis, rendering)
+    runs exactly once per document, and every consumer (FastAPI, Streamlit)
+    reads its outputs from the returned AnalysisResult.
+    
+    The stream methods yield (event, data) pairs instead: "analysis" with the
+    gap analysis, executive summary and stage timings so far, "sources" with
+    the retrieved source names, one "token" per generated text delta, and
+    finally "result" with the complete AnalysisResult.
+    
+    Seconds spent in each stage are recorded in AnalysisResult.timings.
+    """
+    
+    def extract(self, file_content: bytes, filename: str) -> ExtractedDocument:
+        document = extract_document(file_content, filename)
+        if document.text.startswith("Error"):
+            raise ExtractionError(document.text)
+        return document
+    
+    def analyze(self, text: str, page_starts: Optional[List[int]] = None,
+                digest: Optional[str] = None) -> Dict:
+        """Gap analysis, cached under digest (the upload's content hash) when given"""
+        if digest is not None:
+            analysis = extraction_cache.get_analysis(digest, section_registry.version)
+            if analysis is not None:
+                return analysis
+        analysis = analyze_completeness(text, page_starts)
+        if digest is not None:
+            extraction_cache.put_analysis(digest, section_registry.version, analysis)
+        return analysis
+    
+    def retrieve(self, analysis: Dict) -> List:
+        return get_regulatory_context(list(analysis['missing_required'].keys()))
+    
+    def summarize(self, analysis: Dict, context_chunks: List) -> str:
+        return generate_executive_summary(analysis, context_chunks)
+    
+    def generate(self, analysis: Dict, context_chunks: List) -> str:
+        return generate_ai_analysis(analysis['missing_required'], context_chunks, analysis.get('section_locations'))
+    
+    def render(self, analysis: Dict, executive_summary: str, ai_analysis: str, context_chunks: List) -> str:
+        """Markdown report, reused from the artifact cache if the same inputs were rendered before"""
+        key = report_markdown_key(analysis, executive_summary, ai_analysis, context_chunks)
+        report = artifact_cache.get_text(key, ".md")
+        if report is None:
+            report = render_report(analysis, executive_summary, ai_analysis, context_chunks)
+            artifact_cache.put_text(key, ".md", report)
+        return report
+    
+    def _prepare(self, file_content: bytes, filename: str,
+                 timings: Dict[str, float]) -> Tuple[str, Dict, List, str]:
+        """Run every stage before the LLM call"""
+        with timed(timings, "extract"):
+            document = self.extract(file_content, filename)
+        text = document.text
+        digest = content_digest(file_content) if document.truncated is None else None
+        with timed(timings, "analyze"):
+            analysis = self.analyze(text, document.page_starts, digest)
+        analysis['extraction_truncated'] = document.truncated
+        with timed(timings, "retrieve"):
+            context_chunks = self.retrieve(analysis)
+        with timed(timings, "summarize"):
+            executive_summary = self.summarize(analysis, context_chunks)
+        return text, analysis, context_chunks, executive_summary
+    
+    async def extract_and_analyze_async(self, file_content: bytes, filename: str, timings: Dict[str, float],
+                                        detect_only: bool = False) -> Tuple[str, Dict]:
+        """
+        Extract an upload and run the gap analysis off the event loop
         
-        template = Template(template_content)
-        report = template.render(**template_vars)
+        With detect_only, an upload that is not in the extraction cache is
+        streamed through detect_document() instead: PDF pages are read only
+        until every section has been seen, the text is not kept (returned
+        as "") and section_locations is empty.
+        """
+        with timed(timings, "extract"):
+            # Identical re-uploads are served from the cache without a trip to the process pool
+            document = await run_in_thread(cached_document, file_content, filename)
+            if document is None and not detect_only:
+                document = await run_in_process(extract_document, file_content, filename)
         
-        return report
+        if document is None:
+            with timed(timings, "detect"):
+                try:
+                    analysis = await run_in_process(detect_document, file_content, filename)
+                except ValueError as e:
+                    raise ExtractionError(str(e))
+            analysis['section_locations'] = {}
+            analysis['extraction_truncated'] = analysis.pop('truncated')
+            return "", analysis
+        
+        text = document.text
+        if text.startswith("Error"):
+            raise ExtractionError(text)
+        digest = content_digest(file_content) if document.truncated is None else None
+        with timed(timings, "analyze"):
+            analysis = await run_in_thread(self.analyze, text, document.page_starts, digest)
+        analysis['extraction_truncated'] = document.truncated
+        return text, analysis
+    
+    async def _prepare_async(self, file_content: bytes, filename: str,
+                             timings: Dict[str, float]) -> Tuple[str, Dict, List, str]:
+        """Run every stage before the LLM call off the event loop"""
+        text, analysis = await self.extract_and_analyze_async(file_content, filename, timings)
+        with timed(timings, "retrieve"):
+            context_chunks = await run_in_thread(self.retrieve, analysis)
+        with timed(timings, "summarize"):
+            executive_summary = self.summarize(analysis, context_chunks)
+        return text, analysis, context_chunks, executive_summary
+    
+    def _finish(self, filename: str, text: str, analysis: Dict, context_chunks: List,
+                executive_summary: str, ai_analysis: str, report_markdown: str,
+                timings: Dict[str, float]) -> AnalysisResult:
+        return AnalysisResult(
+            filename=filename,
+            text=text,
+            analysis=analysis,
+            context_chunks=context_chunks,
+            executive_summary=executive_summary,
+            ai_analysis=ai_analysis,
+            report_markdown=report_markdown,
+            timings=timings
+        )
+    
+    def run(self, file_content: bytes, filename: str) -> AnalysisResult:
+        """
+        Run every pipeline stage once for an uploaded document
+        
+        Args:
+            file_content: Raw file bytes
+            filename: Name of the uploaded file
+        
+        Returns:
+            AnalysisResult with text, analysis, chunks, summary, AI analysis and report
+        
+        Raises:
+            ExtractionError: If text could not be extracted from the file
+        """
+        logger.info(f"📋 Starting analysis pipeline for file: {filename}")
+        timings = {}
+        text, analysis, context_chunks, executive_summary = self._prepare(file_content, filename, timings)
+        with timed(timings, "generate"):
+            ai_analysis = self.generate(analysis, context_chunks)
+        with timed(timings, "render"):
+            report_markdown = self.render(analysis, executive_summary, ai_analysis, context_chunks)
+        return self._finish(filename, text, analysis, context_chunks,
+                            executive_summary, ai_analysis, report_markdown, timings)
+    
+    async def run_async(self, file_content: bytes, filename: str) -> AnalysisResult:
+        """
+        Non-blocking variant of run() for use inside the API event loop
+        
+        Parsing runs on the process pool, retrieval and rendering on the
+        thread pool, and the LLM call uses the async Nemotron client.
+        """
+        logger.info(f"📋 Starting async analysis pipeline for file: {filename}")
+        timings = {}
+        text, analysis, context_chunks, executive_summary = await self._prepare_async(file_content, filename, timings)
+        with timed(timings, "generate"):
+            ai_analysis = await generate_ai_analysis_async(
+                analysis['missing_required'], context_chunks, analysis.get('section_locations')
+            )
+        with timed(timings, "render"):
+            report_markdown = await run_in_thread(
+                self.render, analysis, executive_summary, ai_analysis, context_chunks
+            )
+        return self._finish(filename, text, analysis, context_chunks,
+                            executive_summary, ai_analysis, report_markdown, timings)
+    
+    def stream(self, file_content: bytes, filename: str) -> Iterator[Tuple[str, object]]:
+        """Streaming variant of run(), yielding (event, data) pairs"""
+        logger.info(f"📋 Starting streaming analysis pipeline for file: {filename}")
+        timings = {}
+        text, analysis, context_chunks, executive_summary = self._prepare(file_content, filename, timings)
+        yield "analysis", {"analysis": analysis, "executive_summary": executive_summary, "timings": dict(timings)}
+        yield "sources", describe_sources(context_chunks)
+        
+        parts = []
+        # Time spent by the consumer between tokens is included in "generate"
+        with timed(timings, "generate"):
+            for token in generate_ai_analysis_stream(analysis['missing_required'], context_chunks,
+                                                     analysis.get('section_locations')):
+                parts.append(token)
+                yield "token", token
+        ai_analysis = "".join(parts)
+        
+        with timed(timings, "render"):
+            report_markdown = self.render(analysis, executive_summary, ai_analysis, context_chunks)
+        yield "result", self._finish(filename, text, analysis, context_chunks,
+                                     executive_summary, ai_analysis, report_markdown, timings)
+    
+    async def stream_async(self, file_content: bytes, filename: str) -> AsyncIterator[Tuple[str, object]]:
+        """Non-blocking streaming variant of run(), yielding (event, data) pairs"""
+        logger.info(f"📋 Starting async streaming analysis pipeline for file: {filename}")
+        timings = {}
+        text, analysis, context_chunks, executive_summary = await self._prepare_async(file_content, filename, timings)
+        yield "analysis", {"analysis": analysis, "executive_summary": executive_summary, "timings": dict(timings)}
+        yield "sources", describe_sources(context_chunks)
         
+        parts = []
+        with timed(timings, "generate"):
+            async for token in generate_ai_analysis_stream_async(analysis['missing_required'], context_chunks,
+                                                                 analysis.get('section_locations')):
+                parts.append(token)
+                yield "token", token
+        ai_analysis = "".join(parts)
+        
+        with timed(timings, "render"):
+            report_markdown = await run_in_thread(
+                self.render, analysis, executive_summary, ai_analysis, context_chunks
+            )
+        yield "result", self._finish(filename, text, analysis, context_chunks,
+                                     executive_summary, ai_analysis, report_markdown, timings)
+
+# Shared pipeline instance used by the API server and the Streamlit app
+analysis_pipeline = AnalysisPipeline()
+
+def run_analysis(file_content: bytes, filename: str) -> AnalysisResult:
+    """Run the shared analysis pipeline on an uploaded document"""
+    return analysis_pipeline.run(file_content, filename)
+
+async def run_analysis_async(file_content: bytes, filename: str) -> AnalysisResult:
+    """Run the shared analysis pipeline without blocking the event loop"""
+    return await analysis_pipeline.run_async(file_content, filename)
+
+def stream_analysis(file_content: bytes, filename: str) -> Iterator[Tuple[str, object]]:
+    """Run the shared analysis pipeline, streaming AI analysis tokens as they arrive"""
+    return analysis_pipeline.stream(file_content, filename)
+
+def stream_analysis_async(file_content: bytes, filename: str) -> AsyncIterator[Tuple[str, object]]:
+    """Async streaming variant of stream_analysis"""
+    return analysis_pipeline.stream_async(file_content, filename)
+
+def generate_gap_report(file_content: bytes, filename: str) -> str:
+    """
+    Generate comprehensive gap analysis report
+    
+    Args:
+        file_content: Raw file bytes
+        filename: Name of the uploaded file
+    
+    Returns:
+        Formatted markdown report
+    """
+    logger.info(f"📋 Starting gap analysis for file: {filename}")
+    try:
+        return run_analysis(file_content, filename).report_markdown
+    except ExtractionError as e:
+        return f"# Error Processing File\n\n{e}"
     except Exception as e:
         return f"# Error Generating Report\n\nError: {e}"
 
-def ask_compliance_question(question: str) -> Dict:
+def build_qa_prompt(question: str, relevant_chunks: List) -> str:
     """
-    Answer compliance questions using knowledge base
+    Build the Nemotron prompt for a compliance question
     
     Args:
         question: User's compliance question
+        relevant_chunks: Retrieved regulatory document chunks
     
     Returns:
-        Dictionary with answer and sources
+        Prompt text
     """
-    logger.info(f"❓ Processing compliance question: {question[:50]}...")
-    if not knowledge_base:
-        return {
-            'answer': 'Knowledge base not available. Please build the vector store first.',
-            'sources': []
-        }
+    # Prepare context for AI
+    context = "\n\n".join([chunk.page_content for chunk in relevant_chunks])
     
-    try:
-        # Search for relevant context
-        relevant_chunks = knowledge_base.similarity_search(question, k=4)
-        
-        # Prepare context for AI
-        context = "\n\n".join([chunk.page_content for chunk in relevant_chunks])
-        
-        prompt = f"""
+    return f"""
 Based on the following FDA and CLIA regulatory documents, answer this question:
 
 Question: {question}
@@ -309,6 +726,31 @@ Regulatory Context:
 
 Provide a clear, accurate answer citing specific regulatory requirements where applicable.
 """
+
+KB_UNAVAILABLE_ANSWER = {
+    'answer': 'Knowledge base not available. Please build the vector store first.',
+    'sources': []
+}
+
+def ask_compliance_question(question: str) -> Dict:
+    """
+    Answer compliance questions using knowledge base
+    
+    Args:
+        question: User's compliance question
+    
+    Returns:
+        Dictionary with answer and sources
+    """
+    logger.info(f"❓ Processing compliance question: {question[:50]}...")
+    kb = knowledge_base.get()
+    if kb is None:
+        return dict(KB_UNAVAILABLE_ANSWER)
+    
+    try:
+        # Search for relevant context
+        relevant_chunks = kb.similarity_search(question, k=4)
+        prompt = build_qa_prompt(question, relevant_chunks)
         
         # Generate answer
         logger.info("🔑 Attempting NVIDIA API call for Q&A")
@@ -324,6 +766,76 @@ Provide a clear, accurate answer citing specific regulatory requirements where a
         logger.error(f"❌ Q&A processing failed: {e}")
         raise Exception(f"Question processing failed: {e}")
 
+async def ask_compliance_question_async(question: str) -> Dict:
+    """
+    Non-blocking variant of ask_compliance_question
+    
+    The FAISS search runs on the thread pool and the LLM call uses the
+    async Nemotron client.
+    """
+    logger.info(f"❓ Processing compliance question (async): {question[:50]}...")
+    kb = await run_in_thread(knowledge_base.get)
+    if kb is None:
+        return dict(KB_UNAVAILABLE_ANSWER)
+    
+    try:
+        relevant_chunks = await run_in_thread(kb.similarity_search, question, k=4)
+        prompt = build_qa_prompt(question, relevant_chunks)
+        answer = await nemotron_async(prompt)
+        
+        return {
+            'answer': answer,
+            'sources': relevant_chunks
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Q&A processing failed: {e}")
+        raise Exception(f"Question processing failed: {e}")
+
+def ask_compliance_question_stream(question: str) -> Iterator[Tuple[str, object]]:
+    """
+    Streaming variant of ask_compliance_question
+    
+    Args:
+        question: User's compliance question
+    
+    Yields:
+        ("sources", [source names]) first, then ("token", text) per delta
+    """
+    logger.info(f"❓ Processing compliance question (stream): {question[:50]}...")
+    kb = knowledge_base.get()
+    if kb is None:
+        yield "sources", []
+        yield "token", KB_UNAVAILABLE_ANSWER['answer']
+        return
+    
+    try:
+        relevant_chunks = kb.similarity_search(question, k=4)
+        yield "sources", describe_sources(relevant_chunks)
+        for token in nemotron_stream(build_qa_prompt(question, relevant_chunks)):
+            yield "token", token
+    except Exception as e:
+        logger.error(f"❌ Q&A processing failed: {e}")
+        raise Exception(f"Question processing failed: {e}")
+
+async def ask_compliance_question_stream_async(question: str) -> AsyncIterator[Tuple[str, object]]:
+    """Non-blocking variant of ask_compliance_question_stream"""
+    logger.info(f"❓ Processing compliance question (async stream): {question[:50]}...")
+    kb = await run_in_thread(knowledge_base.get)
+    if kb is None:
+        yield "sources", []
+        yield "token", KB_UNAVAILABLE_ANSWER['answer']
+        return
+    
+    try:
+        relevant_chunks = await run_in_thread(kb.similarity_search, question, k=4)
+        yield "sources", describe_sources(relevant_chunks)
+        async for token in nemotron_stream_async(build_qa_prompt(question, relevant_chunks)):
+            yield "token", token
+    except Exception as e:
+        logger.error(f"❌ Q&A processing failed: {e}")
+        raise Exception(f"Question processing failed: {e}")
+
 # Test function
 def test_agent():
     """Test the agent functionality"""
@@ -0,0 +1,17 @@
+"""
+Sample questions offered by the Q&A assistant
+
+Shared by the API and the vector store build, which precomputes their
+query embeddings.
+"""
+
+SAMPLE_QUESTIONS = [
+    "What are my LDT analytical validation requirements?",
+    "What quality system documentation is needed?",
+    "Who is Elizabeth Holmes and why is LDT compliance important?",
+    "What are Laboratory Developed Tests (LDTs)?",
+    "How do I demonstrate clinical validity?",
+    "What is the FDA and what do they regulate?",
+    "What happened with Theranos and LDT oversight?",
+    "What's the difference between FDA and CLIA regulations?"
+]
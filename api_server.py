@@ -2,14 +2,18 @@
 FastAPI backend server for LDT Compliance Copilot Next.js frontend
 """
 import os
-import io
+import json
+import time
+import asyncio
 import tempfile
 from typing import List, Dict, Optional
 from datetime import datetime
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse, Response
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 import uvicorn
 from dotenv import load_dotenv
@@ -18,15 +22,54 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import our existing agent functionality
-from agent.run import generate_gap_report, ask_compliance_question, analyze_completeness, extract_text_from_file
-from agent.knowledge_base import knowledge_base
-from utils.pdf_generator import generate_compliance_pdf
+from agent.run import (
+    run_analysis_async, stream_analysis_async, ask_compliance_question_async,
+    ask_compliance_question_stream_async, describe_sources, AnalysisResult, ExtractionError
+)
+from agent.knowledge_base import (
+    knowledge_base, save_query_embeddings, resolve_store_path, describe_store, current_version
+)
+from agent.sample_questions import SAMPLE_QUESTIONS
+from agent.executors import run_in_thread, run_in_process, shutdown_executors
+from agent.nemotron_llm import close_clients, aclose_clients, get_latency_metrics
+from agent.llm_cache import llm_cache
+from agent.extraction_cache import extraction_cache
+from agent.analysis_memo import ai_analysis_memo
+from agent.artifact_cache import artifact_cache, compliance_pdf_key, etag_matches
+from agent.jobs import JobContext, JobWorkerPool, job_store_from_env
+from agent.batch import analyze_batch, expand_zip, is_supported, BATCH_MAX_BYTES, BATCH_MAX_FILES
+from utils.pdf_generator import write_compliance_pdf
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start loading the knowledge base in the background, watching for new
+    store versions and the job workers, and on shutdown save cached query
+    embeddings and release the worker pools and pooled LLM clients
+    
+    Set KB_WARMUP=0 to skip the warm-up and load on first use instead, and
+    KB_WATCH_INTERVAL=0 to only reload through the reload endpoint.
+    """
+    if os.getenv("KB_WARMUP", "1").lower() not in ("0", "false", "no"):
+        knowledge_base.warm_up()
+    watch_interval = float(os.getenv("KB_WATCH_INTERVAL", "10"))
+    watcher = asyncio.create_task(knowledge_base.watch(watch_interval)) if watch_interval > 0 else None
+    await job_pool.start()
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    await job_pool.stop()
+    save_query_embeddings()
+    shutdown_executors(wait=False)
+    await aclose_clients()
+    close_clients()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="LDT Compliance Copilot API",
     description="API backend for AI-powered FDA & CLIA compliance analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS for Next.js frontend
@@ -36,6 +79,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # read by the frontend to revalidate PDF downloads
 )
 
 # Pydantic models for API requests/responses
@@ -44,6 +88,7 @@ class ComplianceAnalysis(BaseModel):
     score: float
     missing_sections: Dict[str, str]
     present_sections: List[str]
+    section_locations: Dict[str, List[Dict]] = {}
     executive_summary: str
     ai_analysis: str
     report_markdown: str
@@ -55,12 +100,100 @@ class QAResponse(BaseModel):
     answer: str
     sources: List[str]
 
+class JobResponse(BaseModel):
+    id: str
+    filename: str
+    status: str
+    stage: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    timings: Dict[str, float] = {}
+    partial: Dict = {}
+    result: Optional[ComplianceAnalysis] = None
+    error: Optional[Dict] = None
+
 class StatusResponse(BaseModel):
     nvidia_api_connected: bool
     knowledge_base_ready: bool
+    knowledge_base_state: str
+    knowledge_base_load_seconds: Optional[float] = None
     fda_guidance_updated: bool
     clia_regulations_current: bool
 
+async def read_upload(file: UploadFile) -> bytes:
+    """
+    Validate an uploaded document and return its bytes
+    
+    Raises:
+        HTTPException: 400 for unsupported, oversized or empty files
+    """
+    # Validate file type
+    allowed_types = ['pdf', 'docx', 'doc', 'txt', 'json', 'xml']
+    file_extension = file.filename.split('.')[-1].lower() if '.' in file.filename else ''
+    
+    if file_extension not in allowed_types:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Unsupported file type. Allowed types: {', '.join(allowed_types)}"
+        )
+    
+    # Validate file size (10MB limit)
+    max_size = 10 * 1024 * 1024  # 10MB
+    file_content = await file.read()
+    if len(file_content) > max_size:
+        raise HTTPException(
+            status_code=400,
+            detail="File size exceeds 10MB limit"
+        )
+    
+    if len(file_content) == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="File appears to be empty"
+        )
+    
+    return file_content
+
+def to_compliance_analysis(result: AnalysisResult) -> ComplianceAnalysis:
+    """Convert a pipeline result into the API response model"""
+    analysis = result.analysis
+    return ComplianceAnalysis(
+        filename=result.filename,
+        score=analysis['completeness_score'],
+        missing_sections=analysis['missing_required'],
+        present_sections=analysis['present_sections'],
+        section_locations=analysis.get('section_locations', {}),
+        executive_summary=result.executive_summary,
+        ai_analysis=result.ai_analysis,
+        report_markdown=result.report_markdown
+    )
+
+def analysis_summary(filename: str, data: Dict) -> Dict:
+    """Score and sections from the pipeline's "analysis" event, before AI analysis"""
+    analysis = data['analysis']
+    return {
+        "filename": filename,
+        "score": analysis['completeness_score'],
+        "missing_sections": analysis['missing_required'],
+        "present_sections": analysis['present_sections'],
+        "executive_summary": data['executive_summary']
+    }
+
+def sse_event(event: str, data) -> str:
+    """Format a server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_error_detail(e: Exception) -> Dict:
+    """Map a failure inside a stream to the same status/detail the JSON endpoints use"""
+    if isinstance(e, ExtractionError):
+        return {"status_code": 400, "detail": str(e)}
+    if "NVIDIA API call failed" in str(e):
+        return {"status_code": 503, "detail": "NVIDIA API unavailable. Please check API key configuration."}
+    return {"status_code": 500, "detail": f"Processing failed: {str(e)}"}
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -73,7 +206,9 @@ async def get_status():
     """Get system status including API connectivity and knowledge base"""
     return StatusResponse(
         nvidia_api_connected=bool(os.getenv('NVIDIA_API_KEY')),
-        knowledge_base_ready=knowledge_base is not None,
+        knowledge_base_ready=knowledge_base.ready,
+        knowledge_base_state=knowledge_base.state,
+        knowledge_base_load_seconds=knowledge_base.load_seconds,
         fda_guidance_updated=True,  # Assuming always current for demo
         clia_regulations_current=True  # Assuming always current for demo
     )
@@ -90,61 +225,15 @@ async def analyze_document(file: UploadFile = File(...)):
     Returns:
         Compliance analysis results
     """
-    # Validate file type
-    allowed_types = ['pdf', 'docx', 'doc', 'txt', 'json', 'xml']
-    file_extension = file.filename.split('.')[-1].lower() if '.' in file.filename else ''
-    
-    if file_extension not in allowed_types:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Unsupported file type. Allowed types: {', '.join(allowed_types)}"
-        )
-    
-    # Validate file size (10MB limit)
-    max_size = 10 * 1024 * 1024  # 10MB
-    file_content = await file.read()
-    if len(file_content) > max_size:
-        raise HTTPException(
-            status_code=400,
-            detail="File size exceeds 10MB limit"
-        )
-    
-    if len(file_content) == 0:
-        raise HTTPException(
-            status_code=400,
-            detail="File appears to be empty"
-        )
+    file_content = await read_upload(file)
     
     try:
-        # Extract text and analyze
-        text = extract_text_from_file(file_content, file.filename)
-        
-        if text.startswith("Error"):
-            raise HTTPException(status_code=400, detail=text)
-        
-        # Perform gap analysis
-        analysis = analyze_completeness(text)
-        
-        # Generate detailed report
-        report_markdown = generate_gap_report(file_content, file.filename)
-        
-        # Generate executive summary and AI analysis
-        from agent.run import generate_executive_summary, generate_ai_analysis, get_regulatory_context
-        
-        context_chunks = get_regulatory_context(list(analysis['missing_required'].keys()))
-        executive_summary = generate_executive_summary(analysis, context_chunks)
-        ai_analysis = generate_ai_analysis(analysis['missing_required'], context_chunks)
-        
-        return ComplianceAnalysis(
-            filename=file.filename,
-            score=analysis['completeness_score'],
-            missing_sections=analysis['missing_required'],
-            present_sections=analysis['present_sections'],
-            executive_summary=executive_summary,
-            ai_analysis=ai_analysis,
-            report_markdown=report_markdown
-        )
+        # Run extraction, gap analysis, retrieval and AI analysis in a single pass
+        result = await run_analysis_async(file_content, file.filename)
+        return to_compliance_analysis(result)
         
+    except ExtractionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         if "NVIDIA API call failed" in str(e):
             raise HTTPException(
@@ -157,17 +246,163 @@ async def analyze_document(file: UploadFile = File(...)):
                 detail=f"Analysis failed: {str(e)}"
             )
 
+# Streaming analysis endpoint
+@app.post("/api/analyze/stream")
+async def analyze_document_stream(file: UploadFile = File(...)):
+    """
+    Upload and analyze an LDT document, streaming results as server-sent events
+    
+    Events, in order: "analysis" (score and sections), "sources" (retrieved
+    regulatory sources), "token" (AI analysis text deltas), "result" (the full
+    ComplianceAnalysis) and "done". Failures are sent as an "error" event.
+    """
+    file_content = await read_upload(file)
+    
+    async def event_stream():
+        try:
+            async for event, data in stream_analysis_async(file_content, file.filename):
+                if event == "analysis":
+                    data = analysis_summary(file.filename, data)
+                elif event == "result":
+                    data = to_compliance_analysis(data).model_dump()
+                yield sse_event(event, data)
+            yield sse_event("done", {})
+        except Exception as e:
+            yield sse_event("error", stream_error_detail(e))
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+# Batch analysis endpoint
+@app.post("/api/analyze/batch")
+async def analyze_documents_batch(files: List[UploadFile] = File(...),
+                                  detect_only: bool = Query(False)):
+    """
+    Analyze many LDT documents, streaming one NDJSON line per file as it finishes
+    
+    Accepts several files in one multipart request; .zip uploads are
+    expanded into the documents they contain. Failed files are reported in
+    their own line ({"filename", "status": "failed", "detail"}) and the last
+    line is {"summary": {...}} with counts, throughput and how many
+    retrievals and LLM calls were shared between files.
+    
+    Args:
+        files: Documents and/or zip archives
+        detect_only: Only detect sections; skip retrieval and AI analysis
+    """
+    batch = []
+    batch_bytes = 0
+    size_limit = f"Batch upload exceeds the {BATCH_MAX_BYTES // (1024 * 1024)}MB limit"
+    for file in files:
+        # Refuse before reading when the multipart parser already knows the size
+        if file.size is not None and batch_bytes + file.size > BATCH_MAX_BYTES:
+            raise HTTPException(status_code=400, detail=size_limit)
+        content = await file.read()
+        if file.filename.lower().endswith('.zip'):
+            try:
+                documents = await run_in_thread(expand_zip, content, BATCH_MAX_FILES, BATCH_MAX_BYTES - batch_bytes)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"{file.filename}: {e}")
+        elif is_supported(file.filename):
+            documents = [(file.filename, content)]
+        else:
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {file.filename}")
+        batch_bytes += sum(len(document) for _, document in documents)
+        if batch_bytes > BATCH_MAX_BYTES:
+            raise HTTPException(status_code=400, detail=size_limit)
+        batch.extend(documents)
+    
+    if not batch:
+        raise HTTPException(status_code=400, detail="No supported documents in upload")
+    if len(batch) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Batch holds {len(batch)} documents; the limit is {BATCH_MAX_FILES}")
+    
+    async def ndjson_stream():
+        async for record in analyze_batch(batch, detect_only=detect_only):
+            yield json.dumps(record) + "\n"
+    
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson", headers=SSE_HEADERS)
+
+# Seconds between saves of partial AI analysis text while a job generates
+JOB_PARTIAL_INTERVAL = 1.0
+
+async def run_analysis_job(job: JobContext, filename: str, file_content: bytes) -> Dict:
+    """
+    Job handler: run the streaming pipeline, saving partial results as they arrive
+    
+    The job's stage is "preparing" until the gap analysis is ready, then
+    "generating" while the AI analysis streams in.
+    """
+    await job.update(stage="preparing")
+    partial = {}
+    parts = []
+    last_saved = time.monotonic()
+    async for event, data in stream_analysis_async(file_content, filename):
+        if event == "analysis":
+            partial.update(analysis_summary(filename, data))
+            await job.update(stage="generating", partial=partial, timings={**job.job.timings, **data['timings']})
+        elif event == "sources":
+            partial["sources"] = data
+        elif event == "token":
+            parts.append(data)
+            if time.monotonic() - last_saved >= JOB_PARTIAL_INTERVAL:
+                partial["ai_analysis"] = "".join(parts)
+                await job.update(partial=partial)
+                last_saved = time.monotonic()
+        elif event == "result":
+            job.job.timings.update(data.timings)
+            return to_compliance_analysis(data).model_dump()
+    raise RuntimeError("Analysis finished without a result")
+
+# Background analysis jobs, drained by JOB_WORKERS workers on the server loop
+job_pool = JobWorkerPool(
+    job_store_from_env(),
+    run_analysis_job,
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    error_mapper=stream_error_detail
+)
+
+# Background analysis job endpoints
+@app.post("/api/jobs", response_model=JobResponse, status_code=202)
+async def create_analysis_job(file: UploadFile = File(...)):
+    """
+    Queue an LDT document for analysis and return immediately
+    
+    Poll GET /api/jobs/{id} for status, partial results and the final
+    ComplianceAnalysis.
+    """
+    file_content = await read_upload(file)
+    job = await job_pool.submit(file.filename, file_content)
+    return JobResponse(**job.to_dict())
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+async def get_analysis_job(job_id: str):
+    """
+    Get a job's status ("queued", "running", "succeeded" or "failed"),
+    stage, per-stage timings, partial results and, once finished, its
+    result or error
+    """
+    job = await run_in_thread(job_pool.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job.to_dict())
+
 # PDF generation endpoint
 @app.post("/api/generate-pdf")
-async def generate_pdf_report(analysis: ComplianceAnalysis):
+async def generate_pdf_report(analysis: ComplianceAnalysis,
+                              if_none_match: Optional[str] = Header(None)):
     """
     Generate PDF report from analysis results
     
+    The response's ETag is the content key of the report, so a client that
+    sends it back in If-None-Match for the same analysis gets 304 Not
+    Modified. PDFs already in the artifact cache are sent without rendering.
+    
     Args:
         analysis: Compliance analysis data
+        if_none_match: ETag of a copy the client already has
     
     Returns:
-        PDF file as streaming response
+        PDF file, streamed from disk with a Content-Length and ETag
     """
     try:
         # Prepare data for PDF generation
@@ -176,25 +411,33 @@ async def generate_pdf_report(analysis: ComplianceAnalysis):
             'score': analysis.score,
             'missing_sections': analysis.missing_sections,
             'present_sections': analysis.present_sections,
+            'section_locations': analysis.section_locations,
             'executive_summary': analysis.executive_summary,
             'ai_analysis': analysis.ai_analysis
         }
         
-        # Generate PDF
-        pdf_buffer = generate_compliance_pdf(pdf_data)
-        
-        # Return as streaming response
-        pdf_buffer.seek(0)
+        key = compliance_pdf_key(pdf_data)
+        headers = {"ETag": f'"{key}"', "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
         
-        def iter_file():
-            yield from pdf_buffer
+        # Render on the process pool into a file so rendering does not block
+        # the event loop and the PDF is never copied into memory here. The
+        # response streams a checked out link to the cached file, which
+        # eviction cannot remove mid-response, and deletes it once sent
+        pdf_path = await run_in_thread(artifact_cache.checkout, key, ".pdf")
+        if pdf_path is None:
+            rendered = await run_in_process(write_compliance_pdf, pdf_data, artifact_cache.render_directory())
+            pdf_path = await run_in_thread(artifact_cache.put_and_checkout, key, ".pdf", rendered)
         
         filename = f"LDT_Compliance_Report_{analysis.filename.split('.')[0]}.pdf"
+        headers["Content-Disposition"] = f"attachment; filename={filename}"
         
-        return StreamingResponse(
-            io.BytesIO(pdf_buffer.getvalue()),
+        return FileResponse(
+            pdf_path,
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            headers=headers,
+            background=BackgroundTask(os.unlink, pdf_path)
         )
         
     except Exception as e:
@@ -215,25 +458,19 @@ async def ask_question(request: QARequest):
     Returns:
         Answer and sources
     """
-    if not knowledge_base:
+    if await run_in_thread(knowledge_base.get) is None:
         raise HTTPException(
             status_code=503,
             detail="Knowledge base not available"
         )
     
     try:
-        response = ask_compliance_question(request.question)
+        response = await ask_compliance_question_async(request.question)
         
         # Extract source metadata for frontend
-        sources = []
-        for source in response.get('sources', []):
-            if hasattr(source, 'metadata'):
-                source_info = source.metadata.get('source', 'Unknown source')
-                sources.append(source_info)
-        
         return QAResponse(
             answer=response['answer'],
-            sources=sources
+            sources=describe_sources(response.get('sources', []))
         )
         
     except Exception as e:
@@ -248,34 +485,99 @@ async def ask_question(request: QARequest):
                 detail=f"Question processing failed: {str(e)}"
             )
 
+# Streaming Q&A endpoint
+@app.post("/api/qa/stream")
+async def ask_question_stream(request: QARequest):
+    """
+    Ask a compliance-related question, streaming the answer as server-sent events
+    
+    Events, in order: "sources" (retrieved source names), "token" (answer text
+    deltas) and "done". Failures are sent as an "error" event.
+    """
+    if await run_in_thread(knowledge_base.get) is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Knowledge base not available"
+        )
+    
+    async def event_stream():
+        try:
+            async for event, data in ask_compliance_question_stream_async(request.question):
+                yield sse_event(event, data)
+            yield sse_event("done", {})
+        except Exception as e:
+            yield sse_event("error", stream_error_detail(e))
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 # Sample questions endpoint
 @app.get("/api/sample-questions")
 async def get_sample_questions():
     """Get sample questions for the Q&A assistant"""
+    return {"questions": SAMPLE_QUESTIONS}
+
+def knowledge_base_info() -> Dict:
+    """
+    Describe the served store version and its source files
+    
+    Reports the loaded version once it is loaded, otherwise the current
+    version on disk. Each source file is an item with status "CURRENT", or
+    "RELOAD_PENDING" if a newer version has been built but not yet loaded.
+    """
+    if knowledge_base.info:
+        info = dict(knowledge_base.info)
+        stale = knowledge_base.stale()
+    else:
+        info = describe_store(resolve_store_path(knowledge_base.store_root))
+        stale = False
+    item_status = "RELOAD_PENDING" if stale else "CURRENT"
     return {
-        "questions": [
-            "What are my LDT analytical validation requirements?",
-            "What quality system documentation is needed?", 
-            "Who is Elizabeth Holmes and why is LDT compliance important?",
-            "What are Laboratory Developed Tests (LDTs)?",
-            "How do I demonstrate clinical validity?",
-            "What is the FDA and what do they regulate?",
-            "What happened with Theranos and LDT oversight?",
-            "What's the difference between FDA and CLIA regulations?"
-        ]
+        **info,
+        **knowledge_base.status(),
+        "current_version": current_version(knowledge_base.store_root),
+        "reload_pending": stale,
+        "reloads": knowledge_base.reloads,
+        "items": [{"name": source["name"], "chunks": source["chunks"], "status": item_status}
+                  for source in info["sources"]]
     }
 
 # Knowledge base status endpoint
 @app.get("/api/knowledge-base-status")
 async def get_knowledge_base_status():
-    """Get knowledge base status and information"""
-    return {
-        "items": [
-            {"name": "FDA LDT Guidance", "status": "CURRENT"},
-            {"name": "CLIA Regulations", "status": "CURRENT"}, 
-            {"name": "ISO 13485", "status": "CURRENT"}
-        ]
-    }
+    """
+    Get the served knowledge base version, build time, chunk count and
+    source files (as "items", one per file)
+    """
+    return await run_in_thread(knowledge_base_info)
+
+# Knowledge base reload endpoint
+@app.post("/api/knowledge-base/reload")
+async def reload_knowledge_base(force: bool = Query(False, description="Reload even if the loaded version is current")):
+    """
+    Swap in the store's current version without restarting
+    
+    Requests already running finish against the previous version. If the
+    new version cannot be loaded the previous one keeps serving.
+    """
+    if knowledge_base.state in ("not_loaded", "loading"):
+        raise HTTPException(status_code=409, detail="Knowledge base is still loading")
+    try:
+        reloaded = await run_in_thread(knowledge_base.reload, force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Knowledge base reload failed: {str(e)}")
+    return {"reloaded": reloaded, **await run_in_thread(knowledge_base_info)}
+
+# LLM latency metrics endpoint
+@app.get("/api/llm-metrics")
+async def get_llm_metrics():
+    """Get recent Nemotron call latency split into connect and generation time, plus cache stats"""
+    metrics = get_latency_metrics()
+    # Cache stats count SQLite rows and scan the artifact directory
+    metrics["cache"] = await run_in_thread(llm_cache.stats)
+    metrics["extraction_cache"] = await run_in_thread(extraction_cache.stats)
+    metrics["ai_analysis_memo"] = await run_in_thread(ai_analysis_memo.stats)
+    metrics["artifact_cache"] = await run_in_thread(artifact_cache.stats)
+    return metrics
 
 # Error handlers
 @app.exception_handler(404)
@@ -294,6 +596,8 @@ async def internal_error_handler(request, exc):
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
+    # Development server: pick up report template edits too
+    os.environ.setdefault("REPORT_TEMPLATE_AUTO_RELOAD", "1")
     uvicorn.run(
         "api_server:app",
         host="0.0.0.0",
@@ -6,13 +6,17 @@ import tempfile
 import os
 from io import BytesIO
 from dotenv import load_dotenv
-from agent.run import generate_gap_report, ask_compliance_question, analyze_completeness, extract_text_from_file
+from agent.run import stream_analysis, ask_compliance_question_stream, analyze_completeness, extract_text_from_file, ExtractionError
 from agent.knowledge_base import knowledge_base
-from utils.pdf_generator import generate_compliance_pdf
+from agent.artifact_cache import artifact_cache, compliance_pdf_key
+from utils.pdf_generator import write_compliance_pdf
 
 # Load environment variables
 load_dotenv()
 
+# Start loading the vector store in the background; first use waits for it
+knowledge_base.warm_up()
+
 # Page configuration
 st.set_page_config(
     page_title="LDT Compliance Copilot",
@@ -558,17 +562,23 @@ def main():
                             st.error("File appears to be empty. Please upload a valid document.")
                             return
                             
-                        # Generate report and extract analysis data
-                        report_md = generate_gap_report(file_content, uploaded_file.name)
-                        
-                        # Also store the raw analysis data for accurate score display
-                        text = extract_text_from_file(file_content, uploaded_file.name)
-                        analysis = analyze_completeness(text)
+                        # Run the shared single-pass pipeline, showing AI analysis as it streams in
+                        result = None
+                        live_analysis = st.empty()
+                        streamed_text = ""
+                        for event, data in stream_analysis(file_content, uploaded_file.name):
+                            if event == "token":
+                                streamed_text += data
+                                live_analysis.markdown(streamed_text)
+                            elif event == "result":
+                                result = data
                         
                         st.session_state.analysis_complete = True
-                        st.session_state.report_md = report_md
-                        st.session_state.analysis_data = analysis  # Store raw analysis
+                        st.session_state.report_md = result.report_markdown
+                        st.session_state.analysis_data = result.analysis  # Store raw analysis
                         st.rerun()
+                    except ExtractionError as e:
+                        st.error(f"Error analyzing file: {e}")
                     except Exception as e:
                         if "NVIDIA API call failed" in str(e):
                             st.error("🔑 NVIDIA API Error: Please set your NVIDIA_API_KEY environment variable to use AI-powered analysis.")
@@ -766,12 +776,20 @@ The following {missing_count} sections are mandatory for FDA/CLIA compliance:
                                 'ai_analysis': ai_analysis_text
                             }
                             
-                            # Generate PDF
-                            pdf_buffer = generate_compliance_pdf(pdf_data)
+                            # Generate PDF, or reuse it if this report was rendered before
+                            pdf_path = artifact_cache.get_or_create(
+                                compliance_pdf_key(pdf_data), ".pdf",
+                                lambda directory: write_compliance_pdf(pdf_data, directory)
+                            )
+                            try:
+                                with open(pdf_path, 'rb') as f:
+                                    pdf_bytes = f.read()
+                            finally:
+                                os.unlink(pdf_path)
                             
                             st.download_button(
                                 label="📑 Download PDF Report",
-                                data=pdf_buffer.getvalue(),
+                                data=pdf_bytes,
                                 file_name=f"LDT_Compliance_Report_{uploaded_file.name.split('.')[0]}.pdf",
                                 mime="application/pdf"
                             )
@@ -847,9 +865,15 @@ The following {missing_count} sections are mandatory for FDA/CLIA compliance:
         if st.button("🚀 Ask Question", key="ask_question") and chat_input:
             if knowledge_base:
                 try:
-                    response = ask_compliance_question(chat_input)
+                    # Stream the answer into place as tokens arrive
+                    live_answer = st.empty()
+                    answer = ""
+                    for event, data in ask_compliance_question_stream(chat_input):
+                        if event == "token":
+                            answer += data
+                            live_answer.markdown(answer)
                     user_msg = {"type": "user", "content": chat_input}
-                    assistant_msg = {"type": "assistant", "content": response["answer"]}
+                    assistant_msg = {"type": "assistant", "content": answer}
                     st.session_state.chat_messages.extend([user_msg, assistant_msg])
                     st.rerun()
                 except Exception as e:
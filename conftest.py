@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Shared test fixtures
+
+Every on-disk cache and the job database default to a temporary directory
+for the whole session, set before the agent modules are imported, so tests
+and the process pool workers they fork never touch data/. Tests that need
+caches of their own still patch them in.
+"""
+import os
+import re
+import atexit
+import shutil
+import tempfile
+
+import pytest
+
+_SESSION_DATA = tempfile.mkdtemp(prefix="ldt-tests-")
+atexit.register(shutil.rmtree, _SESSION_DATA, True)
+
+for variable, name in {
+    "LLM_CACHE_PATH": "llm_responses.sqlite3",
+    "EXTRACTION_CACHE_PATH": "extractions.sqlite3",
+    "AI_ANALYSIS_MEMO_PATH": "ai_analysis.sqlite3",
+    "ARTIFACT_CACHE_DIR": "artifacts",
+    "REPORT_TEMPLATE_CACHE_DIR": "templates",
+    "JOB_DB_PATH": "jobs.sqlite3",
+    "QUERY_EMBEDDING_CACHE_PATH": "query_embeddings.npz",
+}.items():
+    os.environ[variable] = os.path.join(_SESSION_DATA, name)
+
+
+class FakeChunk:
+    def __init__(self, text, source):
+        self.page_content = text
+        self.metadata = {"source": source}
+
+
+class FakeKnowledgeBase:
+    def __init__(self):
+        self.queries = []
+
+    def get(self, wait=True):
+        return self
+
+    def similarity_search(self, query, k=4):
+        self.queries.append(query)
+        return [FakeChunk(f"Guidance for {query} ({i})", "corpus/fake.pdf") for i in range(k)]
+
+
+@pytest.fixture
+def llm_calls(monkeypatch, tmp_path):
+    """
+    Replace Nemotron and the knowledge base with counting fakes, and give
+    the test its own extraction cache, artifact cache and template bytecode cache
+    """
+    import agent.extraction as extraction
+    import agent.run as run
+    from agent.analysis_memo import AIAnalysisMemo
+    from agent.artifact_cache import ArtifactCache
+    from agent.extraction_cache import ExtractionCache
+    from agent.llm_cache import LLMCache
+
+    calls = []
+
+    def fake_nemotron(prompt, max_tokens=1024, temperature=0.6):
+        calls.append(prompt)
+        return "Detailed regulatory guidance."
+
+    async def fake_nemotron_async(prompt, max_tokens=1024, temperature=0.6):
+        return fake_nemotron(prompt, max_tokens, temperature)
+
+    def fake_nemotron_stream(prompt, max_tokens=1024, temperature=0.6):
+        text = fake_nemotron(prompt, max_tokens, temperature)
+        yield from re.findall(r"\S+\s*", text)
+
+    async def fake_nemotron_stream_async(prompt, max_tokens=1024, temperature=0.6):
+        for token in fake_nemotron_stream(prompt, max_tokens, temperature):
+            yield token
+
+    monkeypatch.setattr(run, "nemotron", fake_nemotron)
+    monkeypatch.setattr(run, "nemotron_async", fake_nemotron_async)
+    monkeypatch.setattr(run, "nemotron_stream", fake_nemotron_stream)
+    monkeypatch.setattr(run, "nemotron_stream_async", fake_nemotron_stream_async)
+    monkeypatch.setattr(run, "knowledge_base", FakeKnowledgeBase())
+    monkeypatch.setattr(run, "ai_analysis_memo", AIAnalysisMemo(LLMCache(enabled=False)))
+
+    caches = tmp_path / "caches"
+    extraction_cache = ExtractionCache(LLMCache(path=str(caches / "extractions.sqlite3")))
+    monkeypatch.setattr(run, "extraction_cache", extraction_cache)
+    monkeypatch.setattr(extraction, "extraction_cache", extraction_cache)
+    monkeypatch.setattr(run, "artifact_cache", ArtifactCache(str(caches / "artifacts")))
+    monkeypatch.setenv("REPORT_TEMPLATE_CACHE_DIR", str(caches / "templates"))
+    run.report_environment.cache_clear()
+    yield calls
+    run.report_environment.cache_clear()
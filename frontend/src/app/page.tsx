@@ -8,11 +8,20 @@ import KnowledgeBaseStatus from "@/components/compliance/knowledge-base-status"
 import QAAssistant from "@/components/compliance/qa-assistant"
 import AppFooter from "@/components/compliance/app-footer"
 
+interface SectionLocation {
+  start: number
+  end: number
+  page: number | null
+  match: string
+  snippet: string
+}
+
 interface ComplianceAnalysis {
   filename: string
   score: number
   missing_sections: Record<string, string>
   present_sections: string[]
+  section_locations?: Record<string, SectionLocation[]>
   executive_summary: string
   ai_analysis: string
   report_markdown: string
@@ -121,6 +130,14 @@ export default function HomePage() {
                       {analysisResult.present_sections.map((section, index) => (
                         <div key={index} className="bg-emerald-500/10 border border-emerald-500/30 rounded-lg p-3">
                           <p className="text-emerald-400 font-medium text-sm">✓ {section}</p>
+                          {analysisResult.section_locations?.[section]?.[0] && (
+                            <p className="text-slate-400 text-xs mt-1 line-clamp-2">
+                              {analysisResult.section_locations[section][0].page
+                                ? `Page ${analysisResult.section_locations[section][0].page}: `
+                                : ""}
+                              {analysisResult.section_locations[section][0].snippet}
+                            </p>
+                          )}
                         </div>
                       ))}
                     </div>
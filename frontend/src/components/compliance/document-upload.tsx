@@ -4,17 +4,38 @@ import { useState } from "react"
 import { Upload, FileText, CheckCircle, TrendingUp, Clock, Download } from "lucide-react"
 import { Button } from "@/components/ui/button"
 import { cn } from "@/lib/utils"
+import { streamEvents } from "@/lib/sse"
+
+interface SectionLocation {
+  start: number
+  end: number
+  page: number | null
+  match: string
+  snippet: string
+}
 
 interface ComplianceAnalysis {
   filename: string
   score: number
   missing_sections: Record<string, string>
   present_sections: string[]
+  section_locations?: Record<string, SectionLocation[]>
   executive_summary: string
   ai_analysis: string
   report_markdown: string
 }
 
+// Score and sections sent before the AI analysis is generated
+interface AnalysisPreview {
+  score: number
+  missing_sections: Record<string, string>
+  present_sections: string[]
+}
+
+// Last PDF downloaded per analysis body, revalidated with its ETag so the
+// server can answer 304 instead of sending (or rendering) it again
+const pdfDownloads = new Map<string, { etag: string; blob: Blob }>()
+
 interface DocumentUploadProps {
   onFileUpload?: (files: File[]) => void
   onGenerateReport?: (analysis: ComplianceAnalysis) => void
@@ -32,6 +53,9 @@ export default function DocumentUpload({
   const [uploadedFiles, setUploadedFiles] = useState<File[]>([])
   const [isProcessing, setIsProcessing] = useState(false)
   const [analysisResult, setAnalysisResult] = useState<ComplianceAnalysis | null>(null)
+  const [analysisPreview, setAnalysisPreview] = useState<AnalysisPreview | null>(null)
+  const [sources, setSources] = useState<string[]>([])
+  const [streamedAnalysis, setStreamedAnalysis] = useState("")
 
   const handleDragOver = (e: React.DragEvent) => {
     e.preventDefault()
@@ -95,17 +119,36 @@ export default function DocumentUpload({
     
     try {
       setIsProcessing(true);
+      setAnalysisResult(null);
+      setAnalysisPreview(null);
+      setSources([]);
+      setStreamedAnalysis("");
       
-      const response = await fetch('http://localhost:8000/api/analyze', {
-        method: 'POST',
-        body: formData,
-      });
+      // Score, sources and AI analysis tokens are shown as they arrive;
+      // the final "result" event carries the complete analysis
+      let analysis = null as ComplianceAnalysis | null;
+      await streamEvents(
+        'http://localhost:8000/api/analyze/stream',
+        {
+          method: 'POST',
+          body: formData,
+        },
+        ({ event, data }) => {
+          if (event === 'analysis') {
+            setAnalysisPreview(data);
+          } else if (event === 'sources') {
+            setSources(data);
+          } else if (event === 'token') {
+            setStreamedAnalysis(text => text + data);
+          } else if (event === 'result') {
+            analysis = data;
+          }
+        }
+      );
       
-      if (!response.ok) {
-        throw new Error(`Analysis failed: ${response.statusText}`);
+      if (!analysis) {
+        throw new Error("Analysis stream ended without a result");
       }
-      
-      const analysis: ComplianceAnalysis = await response.json();
       console.log("Analysis complete:", analysis);
       
       // Store the result and call the callback
@@ -122,19 +165,31 @@ export default function DocumentUpload({
 
   const downloadPDF = async (analysis: ComplianceAnalysis) => {
     try {
+      const body = JSON.stringify(analysis);
+      const previous = pdfDownloads.get(body);
       const response = await fetch('http://localhost:8000/api/generate-pdf', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          ...(previous ? { 'If-None-Match': previous.etag } : {}),
         },
-        body: JSON.stringify(analysis),
+        body,
       });
       
-      if (!response.ok) {
+      if (response.status !== 304 && !response.ok) {
         throw new Error('PDF generation failed');
       }
       
-      const blob = await response.blob();
+      let blob: Blob;
+      if (response.status === 304 && previous) {
+        blob = previous.blob;
+      } else {
+        blob = await response.blob();
+        const etag = response.headers.get('ETag');
+        if (etag) {
+          pdfDownloads.set(body, { etag, blob });
+        }
+      }
       const url = window.URL.createObjectURL(blob);
       const a = document.createElement('a');
       a.href = url;
@@ -296,6 +351,34 @@ export default function DocumentUpload({
             </p>
           )}
           
+          {/* Streaming Analysis */}
+          {isProcessing && analysisPreview && !analysisResult && (
+            <div className="mt-8 p-6 bg-slate-700/40 rounded-xl border border-slate-600/50 space-y-4">
+              <div className="grid grid-cols-2 gap-4">
+                <div className="text-center">
+                  <div className="text-2xl font-bold text-emerald-400 mb-1">{analysisPreview.score.toFixed(0)}%</div>
+                  <p className="text-xs text-slate-400">Compliance Score</p>
+                </div>
+                <div className="text-center">
+                  <div className="text-2xl font-bold text-orange-400 mb-1">{Object.keys(analysisPreview.missing_sections).length}</div>
+                  <p className="text-xs text-slate-400">Missing Sections</p>
+                </div>
+              </div>
+              
+              {sources.length > 0 && (
+                <div className="text-xs text-slate-400">
+                  Sources: {Array.from(new Set(sources)).join(", ")}
+                </div>
+              )}
+              
+              {streamedAnalysis && (
+                <p className="text-sm text-slate-200 whitespace-pre-wrap max-h-64 overflow-y-auto">
+                  {streamedAnalysis}
+                </p>
+              )}
+            </div>
+          )}
+          
           {/* Analysis Results Preview */}
           {analysisResult && (
             <div className="mt-8 p-6 bg-slate-700/40 rounded-xl border border-slate-600/50">
@@ -4,6 +4,7 @@ import React, { useState, useEffect } from "react"
 import { MessageCircle, ChevronRight, Send, Bot, User } from "lucide-react"
 import { Button } from "@/components/ui/button"
 import { cn } from "@/lib/utils"
+import { streamEvents } from "@/lib/sse"
 
 interface QAAssistantProps {
   onQuestionClick?: (question: string) => void
@@ -64,27 +65,35 @@ export default function QAAssistant({ onQuestionClick }: QAAssistantProps) {
     setIsLoading(true)
 
     try {
-      const response = await fetch('http://localhost:8000/api/qa', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ question }),
-      })
-
-      if (!response.ok) {
-        throw new Error(`Request failed: ${response.statusText}`)
+      // Stream sources first, then answer tokens as they are generated
+      let assistantAdded = false
+      const updateAssistant = (update: (message: ChatMessage) => ChatMessage) => {
+        if (!assistantAdded) {
+          assistantAdded = true
+          setChatMessages(prev => [...prev, update({ type: 'assistant', content: '' })])
+        } else {
+          setChatMessages(prev => [...prev.slice(0, -1), update(prev[prev.length - 1])])
+        }
       }
 
-      const data = await response.json()
-      
-      const assistantMessage: ChatMessage = {
-        type: 'assistant',
-        content: data.answer,
-        sources: data.sources
-      }
-
-      setChatMessages(prev => [...prev, assistantMessage])
+      await streamEvents(
+        'http://localhost:8000/api/qa/stream',
+        {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({ question }),
+        },
+        ({ event, data }) => {
+          if (event === 'sources') {
+            updateAssistant(message => ({ ...message, sources: data }))
+          } else if (event === 'token') {
+            setIsLoading(false)
+            updateAssistant(message => ({ ...message, content: message.content + data }))
+          }
+        }
+      )
     } catch (error) {
       console.error("Error asking question:", error)
       
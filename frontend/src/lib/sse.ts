@@ -0,0 +1,49 @@
+// Minimal server-sent events reader for POST endpoints such as /api/qa/stream.
+// EventSource only supports GET, so the response body is parsed by hand.
+
+export interface StreamEvent {
+  event: string
+  data: any
+}
+
+export async function streamEvents(
+  url: string,
+  init: RequestInit,
+  onEvent: (event: StreamEvent) => void
+): Promise<void> {
+  const response = await fetch(url, init)
+  if (!response.ok || !response.body) {
+    throw new Error(`Request failed: ${response.statusText}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ""
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary = buffer.indexOf("\n\n")
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf("\n\n")
+
+      let event = "message"
+      const dataLines: string[] = []
+      for (const line of rawEvent.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim()
+        else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim())
+      }
+      if (dataLines.length === 0) continue
+
+      const data = JSON.parse(dataLines.join("\n"))
+      if (event === "error") {
+        throw new Error(data.detail ?? "Stream failed")
+      }
+      onEvent({ event, data })
+    }
+  }
+}
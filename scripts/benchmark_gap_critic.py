@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark section detection in agent.gap_critic on large submissions
+
+Compares the previous implementation, which lowercased the text and ran
+one substring scan per section variant and alternative phrase (twice per
+analyze_completeness call), against analyze_completeness with locate=False
+(presence only) and with the default single-pass SectionMatcher scan that
+also collects every occurrence for section locations. All are checked to
+agree on the sections the legacy code knew about before timing.
+
+A complete submission names every section in its first pages, so the
+presence check should stop there; the script exits with an error if it is
+slower than the legacy scans on that case.
+
+Usage:
+    python scripts/benchmark_gap_critic.py --pages 300 --runs 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.gap_critic import analyze_completeness, section_registry
+
+FILLER_WORDS = (
+    "the laboratory shall maintain records of all testing performed including patient "
+    "samples controls calibrators reagent lots instrument maintenance and operator training"
+).split()
+
+LEGACY_REQUIRED_SECTIONS = {
+    "Intended Use": "population, analyte, condition",
+    "Analytical Validity": "LoD, LoB, precision, linearity data",
+    "Clinical Validity": "clinical study & stats",
+    "Quality System": "reference 21 CFR 820 or ISO 13485",
+    "Risk Assessment": "provide FMEA / hazard analysis"
+}
+
+LEGACY_RECOMMENDED_SECTIONS = {
+    "Labeling": "per 21 CFR 809 requirements",
+    "Personnel Qualifications": "CLIA personnel requirements",
+    "Specimen Requirements": "collection, handling, storage",
+    "Method Description": "detailed analytical procedure",
+    "Reference Standards": "calibrators and controls"
+}
+
+LEGACY_ALTERNATIVES = {
+    "Intended Use": ["intended use", "indication", "clinical use", "purpose"],
+    "Analytical Validity": ["validation", "analytical performance", "lod", "lob", "precision", "linearity"],
+    "Clinical Validity": ["clinical study", "clinical trial", "clinical validation", "sensitivity", "specificity"],
+    "Quality System": ["quality system", "qms", "iso 13485", "21 cfr 820", "quality management"],
+    "Risk Assessment": ["risk assessment", "risk analysis", "fmea", "hazard analysis", "risk management"]
+}
+
+def legacy_find_missing_sections(text, include_recommended=False):
+    """The previous implementation: one substring scan per phrase"""
+    text_lower = text.lower()
+    missing = {}
+    for section, description in LEGACY_REQUIRED_SECTIONS.items():
+        section_variations = [
+            section.lower(),
+            section.lower().replace(" ", "_"),
+            section.lower().replace(" ", "-"),
+        ]
+        found = any(variation in text_lower for variation in section_variations)
+        if not found:
+            found = any(alt in text_lower for alt in LEGACY_ALTERNATIVES[section])
+        if not found:
+            missing[section] = description
+    if include_recommended:
+        for section, description in LEGACY_RECOMMENDED_SECTIONS.items():
+            if section.lower() not in text_lower:
+                missing[section] = description
+    return missing
+
+def legacy_analyze(text):
+    return (legacy_find_missing_sections(text), legacy_find_missing_sections(text, include_recommended=True))
+
+def current_analyze(text, locate=False):
+    analysis = analyze_completeness(text, locate=locate)
+    return (analysis["missing_required"], {**analysis["missing_required"], **analysis["missing_recommended"]})
+
+def locating_analyze(text):
+    return current_analyze(text, locate=True)
+
+def legacy_sections_only(result):
+    """Drop sections added to the rules file since the legacy implementation"""
+    known = set(LEGACY_REQUIRED_SECTIONS) | set(LEGACY_RECOMMENDED_SECTIONS)
+    return tuple({k: v for k, v in missing.items() if k in known} for missing in result)
+
+def make_document(pages, sections, seed=0, within_pages=None):
+    """
+    Build a synthetic submission of roughly 3,000 characters per page, with
+    sections inserted at random in the first within_pages pages (default: anywhere)
+    """
+    rng = random.Random(seed)
+    words = [rng.choice(FILLER_WORDS) for _ in range(pages * 450)]
+    span = len(words) if within_pages is None else within_pages * 450
+    for section in sections:
+        words.insert(rng.randrange(span), section)
+    return " ".join(words)
+
+def time_call(func, text, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(text)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gap_critic section detection")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    all_sections = list(section_registry.rules)
+    cases = {
+        "no sections present": make_document(args.pages, []),
+        "half the sections": make_document(args.pages, ["Intended Use", "FMEA", "Labeling", "ISO 13485"]),
+        "all sections present": make_document(args.pages, all_sections),
+        "complete submission": make_document(args.pages, all_sections, within_pages=3),
+    }
+
+    print(f"\n🔎 Section detection benchmark ({args.pages} pages, median of {args.runs} runs)")
+    print("=" * 84)
+    print(f"{'case':<24}{'chars':>12}{'legacy':>12}{'presence':>12}{'speedup':>10}{'locating':>14}")
+    for label, text in cases.items():
+        expected = legacy_analyze(text)
+        if expected != legacy_sections_only(current_analyze(text)) or expected != legacy_sections_only(locating_analyze(text)):
+            raise SystemExit(f"Implementations disagree on '{label}'")
+        legacy = time_call(legacy_analyze, text, args.runs)
+        current = time_call(current_analyze, text, args.runs)
+        locating = time_call(locating_analyze, text, args.runs)
+        print(f"{label:<24}{len(text):>12,}{legacy * 1000:>10.1f}ms{current * 1000:>10.1f}ms"
+              f"{legacy / current:>9.2f}x{locating * 1000:>12.1f}ms")
+        if label == "complete submission" and current > legacy:
+            raise SystemExit(f"Regression: presence check on a complete submission is slower than legacy "
+                             f"({current * 1000:.1f}ms vs {legacy * 1000:.1f}ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark pooled vs per-call Nemotron clients against the local stub server
+
+Runs the same number of chat completions twice: once creating a fresh
+OpenAI client per call (the old behaviour) and once through the pooled
+client registry in agent.nemotron_llm. Reports connect vs generation time
+and connection reuse for each, without any network access.
+
+Usage:
+    python scripts/benchmark_nemotron_client.py --calls 50 --concurrency 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai import OpenAI
+
+from nemotron_stub_server import start_stub_server
+from agent import nemotron_llm
+
+def run_unpooled(base_url, calls, concurrency):
+    """Old behaviour: a new client (and connection pool) per call"""
+    def one_call(_):
+        client = OpenAI(base_url=base_url, api_key="stub")
+        try:
+            client.chat.completions.create(**nemotron_llm._completion_kwargs("ping", 16, 0.0))
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_call, range(calls)))
+    return time.perf_counter() - start
+
+def run_pooled(calls, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: nemotron_llm.nemotron("ping", max_tokens=16, use_cache=False), range(calls)))
+    return time.perf_counter() - start
+
+async def run_pooled_async(calls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_call():
+        async with semaphore:
+            await nemotron_llm.nemotron_async("ping", max_tokens=16, use_cache=False)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_call() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    await nemotron_llm.aclose_clients()
+    return elapsed
+
+def report(label, elapsed, calls, metrics=None):
+    print(f"\n{label}")
+    print("-" * 50)
+    print(f"Wall time:        {elapsed * 1000:.1f} ms ({calls / elapsed:.1f} calls/s)")
+    if metrics and metrics.get("calls"):
+        print(f"Connection reuse: {metrics['connection_reuse_rate'] * 100:.0f}%")
+        print(f"Connect p50/p95:  {metrics['connect_ms']['p50']} / {metrics['connect_ms']['p95']} ms")
+        print(f"Generate p50/p95: {metrics['generation_ms']['p50']} / {metrics['generation_ms']['p95']} ms")
+        print(f"Total p50/p95:    {metrics['total_ms']['p50']} / {metrics['total_ms']['p95']} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Nemotron client pooling offline")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.02, help="Stub generation delay in seconds")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(delay=args.delay)
+    os.environ["NVIDIA_API_KEY"] = "stub"
+    nemotron_llm.NVIDIA_BASE_URL = base_url
+    nemotron_llm.logger.setLevel("WARNING")
+
+    print(f"🧪 Benchmarking {args.calls} calls at concurrency {args.concurrency} against {base_url}")
+    try:
+        elapsed = run_unpooled(base_url, args.calls, args.concurrency)
+        report("Per-call client (unpooled)", elapsed, args.calls)
+
+        nemotron_llm.reset_latency_metrics()
+        elapsed = run_pooled(args.calls, args.concurrency)
+        report("Pooled sync client", elapsed, args.calls, nemotron_llm.get_latency_metrics())
+
+        nemotron_llm.reset_latency_metrics()
+        elapsed = asyncio.run(run_pooled_async(args.calls, args.concurrency))
+        report("Pooled async client", elapsed, args.calls, nemotron_llm.get_latency_metrics())
+    finally:
+        nemotron_llm.close_clients()
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF text extraction backends on the shipped corpus
+
+For every installed backend (see agent.pdf_backends) and every PDF, reports
+pages/sec and fidelity measures: characters and words extracted, word
+overlap (Jaccard) with the other backends, and which gap-analysis sections
+are detected in the extracted text.
+
+Usage:
+    python scripts/benchmark_pdf_backends.py [--runs 3] [files.pdf ...]
+"""
+import argparse
+import glob
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.extraction import iter_pdf_pages
+from agent.gap_critic import find_section_hits
+from agent.pdf_backends import available_backends
+
+WORD = re.compile(r"[a-z0-9]+")
+
+def extract(path, backend):
+    """Return (pages, text, seconds) for one full extraction"""
+    start = time.perf_counter()
+    pages = [text for _, text in iter_pdf_pages(path, backend=backend)]
+    return len(pages), "\n".join(pages), time.perf_counter() - start
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction backends")
+    parser.add_argument("files", nargs="*", help="PDFs to extract (default: corpus/*.pdf)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join("corpus", "*.pdf")))
+    if not files:
+        raise SystemExit("No PDFs found; pass file paths or run from the repository root")
+    backends = available_backends()
+    print(f"📄 Backends installed: {', '.join(backends)}")
+
+    for path in files:
+        results = {}
+        for backend in backends:
+            timings = []
+            for _ in range(args.runs):
+                pages, text, seconds = extract(path, backend)
+                timings.append(seconds)
+            words = WORD.findall(text.lower())
+            results[backend] = {
+                "pages": pages,
+                "seconds": statistics.median(timings),
+                "chars": len(text),
+                "words": words,
+                "sections": sorted({hit.section for hit in find_section_hits(text)})
+            }
+
+        print(f"\n{os.path.basename(path)} ({os.path.getsize(path) / 1024:.0f} KB, median of {args.runs} runs)")
+        print("=" * 78)
+        print(f"{'backend':<12}{'pages':>7}{'seconds':>10}{'pages/s':>10}{'chars':>10}{'words':>9}{'overlap':>10}{'sections':>10}")
+        for backend, result in results.items():
+            others = [set(other["words"]) for name, other in results.items() if name != backend]
+            overlap = statistics.mean(jaccard(set(result["words"]), other) for other in others) if others else 1.0
+            pages_per_second = result["pages"] / result["seconds"] if result["seconds"] else float("inf")
+            print(f"{backend:<12}{result['pages']:>7}{result['seconds']:>10.3f}{pages_per_second:>10.1f}"
+                  f"{result['chars']:>10,}{len(result['words']):>9,}{overlap:>10.3f}{len(result['sections']):>10}")
+
+        section_sets = {backend: set(result["sections"]) for backend, result in results.items()}
+        common = set.intersection(*section_sets.values())
+        for backend, sections in section_sets.items():
+            extra = sorted(sections - common)
+            if extra:
+                print(f"  {backend} alone detects: {', '.join(extra)}")
+        print(f"  sections detected by every backend: {', '.join(sorted(common)) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark compliance PDF report rendering
+
+Renders sample reports with utils.pdf_generator.generate_compliance_pdf
+and reports milliseconds per report, output size, and memory: the peak
+traced by tracemalloc during one render and the number of memory blocks
+still allocated afterwards (a leak check across repeated renders).
+
+It then renders one long report (--pages, default 100) on a worker process
+as /api/generate-pdf does, and compares the server process's peak memory
+when the PDF comes back as a BytesIO and is copied into the response
+(the previous endpoint) with streaming it from a temporary file. Long
+reports take a while: ReportLab lays the analysis out as one paragraph.
+
+Usage:
+    python scripts/benchmark_pdf_report.py [--runs 50] [--analysis-kb 4] [--pages 100]
+"""
+import argparse
+import gc
+import io
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pdf_generator import generate_compliance_pdf, write_compliance_pdf
+
+CHUNK_SIZE = 64 * 1024
+# AI analysis text per rendered page, measured on sample_report
+ANALYSIS_KB_PER_PAGE = 4.6
+
+ANALYSIS_PARAGRAPH = (
+    "**Quality System** documentation is incomplete. The laboratory should establish "
+    "document control, CAPA and management review procedures under 21 CFR 820 and "
+    "maintain training records for all personnel performing the test."
+)
+
+def sample_report(analysis_kb):
+    """A report payload with every section present and an AI analysis of about analysis_kb KB"""
+    paragraphs = max(1, analysis_kb * 1024 // (len(ANALYSIS_PARAGRAPH) + 2))
+    return {
+        "filename": "ldt_submission_panel_v3.pdf",
+        "score": 60.0,
+        "missing_sections": {
+            "Quality System": "Quality management system documentation per 21 CFR 820",
+            "Risk Assessment": "Risk management file and hazard analysis per ISO 14971"
+        },
+        "present_sections": ["Intended Use", "Analytical Validity", "Clinical Validity"],
+        "section_locations": {
+            "Intended Use": [{"page": 1, "snippet": "The test is intended for the qualitative detection of"}],
+            "Analytical Validity": [{"page": 4, "snippet": "Limit of detection was established at 5 copies/uL"}]
+        },
+        "executive_summary": "",
+        "ai_analysis": "\n\n".join([ANALYSIS_PARAGRAPH] * paragraphs),
+        "report_markdown": ""
+    }
+
+def measure(report, runs):
+    """Return (median ms, output bytes, peak traced KB, blocks retained after runs)"""
+    generate_compliance_pdf(report)  # warm imports and font caches
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = len(generate_compliance_pdf(report).getvalue())
+        timings.append((time.perf_counter() - start) * 1000)
+
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    generate_compliance_pdf(report)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for _ in range(runs):
+        generate_compliance_pdf(report)
+    gc.collect()
+    retained = sys.getallocatedblocks() - blocks_before
+    return statistics.median(timings), size, peak / 1024, retained
+
+def render_in_worker(render, analysis_kb):
+    """Build and render the report on a worker; returns (result, worker max RSS in KB)"""
+    result = render(sample_report(analysis_kb))
+    return result, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def drain(file):
+    """Read a file in response-sized chunks, as the server sends it"""
+    return sum(len(chunk) for chunk in iter(lambda: file.read(CHUNK_SIZE), b""))
+
+def deliver_buffered(future):
+    """The previous endpoint: BytesIO pickled back from the worker, then copied into the response"""
+    buffer, worker_rss = future.result()
+    return drain(io.BytesIO(buffer.getvalue())), worker_rss
+
+def deliver_streamed(future):
+    """Render into a temporary file on the worker and stream it from disk"""
+    path, worker_rss = future.result()
+    try:
+        with open(path, 'rb') as f:
+            return drain(f), worker_rss
+    finally:
+        os.unlink(path)
+
+def delivery_memory(analysis_kb):
+    """
+    Peak memory traced in this (server) process while each strategy hands
+    back and sends one report; the report is built on the worker so only
+    the PDF crosses the process boundary
+
+    Returns:
+        Dict of strategy -> (server peak KB, worker max RSS KB, bytes sent, seconds)
+    """
+    strategies = {
+        "BytesIO + copy (previous)": (generate_compliance_pdf, deliver_buffered),
+        "temporary file, streamed": (write_compliance_pdf, deliver_streamed),
+    }
+    results = {}
+    for name, (render, deliver) in strategies.items():
+        # A fresh worker per strategy so its max RSS is its own
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            start = time.perf_counter()
+            tracemalloc.start()
+            sent, worker_rss = deliver(pool.submit(render_in_worker, render, analysis_kb))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[name] = (peak / 1024, worker_rss, sent, time.perf_counter() - start)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compliance PDF report rendering")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--analysis-kb", type=int, nargs="+", default=[0, 4, 32],
+                        help="AI analysis sizes to render, in KB (default: 0 4 32)")
+    parser.add_argument("--pages", type=int, default=100,
+                        help="Approximate length of the long report for the delivery comparison; 0 skips it")
+    args = parser.parse_args()
+
+    print(f"📄 Compliance PDF rendering (median of {args.runs} runs)")
+    print("=" * 66)
+    print(f"{'analysis':>10}{'ms/report':>12}{'reports/s':>12}{'PDF KB':>10}{'peak KB':>10}{'retained':>12}")
+    for analysis_kb in args.analysis_kb:
+        report = sample_report(analysis_kb)
+        if analysis_kb == 0:
+            report["ai_analysis"] = ""
+        ms, size, peak_kb, retained = measure(report, args.runs)
+        print(f"{analysis_kb:>8}KB{ms:>12.2f}{1000 / ms:>12.1f}{size / 1024:>10.1f}{peak_kb:>10.0f}{retained:>12,}")
+
+    if args.pages:
+        analysis_kb = int(args.pages * ANALYSIS_KB_PER_PAGE)
+        print(f"\n📦 Delivering a ~{args.pages}-page report ({analysis_kb}KB AI analysis)")
+        print("=" * 78)
+        print(f"{'strategy':<28}{'server peak KB':>16}{'worker RSS KB':>15}{'sent KB':>10}{'seconds':>9}")
+        for strategy, (server_kb, worker_kb, sent, seconds) in delivery_memory(analysis_kb).items():
+            print(f"{strategy:<28}{server_kb:>16.0f}{worker_kb:>15,}{sent / 1024:>10.1f}{seconds:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the text normalization done before a compliance PDF is laid out
+
+Times utils.pdf_generator's markdown cleanup and third-person rewrite of
+the AI analysis, and the executive summary cleanup, against the previous
+implementation (one re.sub per step, patterns compiled on every call via
+the re module cache), on AI analyses of a few sizes. Both produce the same
+text, which is checked before timing. markdown.markdown, which both run
+first, is timed on its own so its share of the total is visible.
+
+Usage:
+    python scripts/benchmark_pdf_text.py [--runs 20] [--analysis-kb 5 50]
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown
+
+from utils.pdf_generator import (
+    THIRD_PERSON_REPLACEMENTS, convert_to_third_person_analysis, generate_professional_regulatory_analysis,
+    normalize_summary_text
+)
+
+ANALYSIS_PARAGRAPH = (
+    "## Risk Assessment\n\n"
+    "Based on the retrieved FDA context, **your submission** does not include a risk management file. "
+    "I recommend that you add an FMEA under ISO 14971; we found no hazard analysis in our review, "
+    "and the user provided only a summary table.\n\n"
+    "- Document control per *21 CFR 820.40*\n"
+    "- Training records for `all` personnel\n\n"
+    "---\n\n"
+)
+
+def previous_third_person(ai_analysis):
+    """convert_to_third_person_analysis before the patterns were precompiled"""
+    clean_text = re.sub(r'<[^>]+>', '', markdown.markdown(ai_analysis))
+    clean_text = re.sub(r'\*\*(.*?)\*\*', r'\1', clean_text)
+    clean_text = re.sub(r'\*(.*?)\*', r'\1', clean_text)
+    clean_text = re.sub(r'`(.*?)`', r'\1', clean_text)
+    clean_text = re.sub(r'#{1,6}\s+', '', clean_text)
+    clean_text = re.sub(r'\n\s*\n', '\n\n', clean_text)
+    clean_text = re.sub(r'---+', '', clean_text).strip()
+    if "Okay, let's tackle this query" in clean_text or "The user is asking" in clean_text:
+        return generate_professional_regulatory_analysis(clean_text)
+    for pattern, replacement in THIRD_PERSON_REPLACEMENTS:
+        clean_text = re.sub(pattern, replacement, clean_text, flags=re.IGNORECASE)
+    return clean_text
+
+def previous_summary(text):
+    """The executive summary cleanup in generate_compliance_pdf before it was precompiled"""
+    text = re.sub(r'[^\w\s\.\,\!\?\;\:\(\)\-\%]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r'^\s+|\s+$', '', text, flags=re.MULTILINE)
+    return text.replace('\t', ' ').strip()
+
+def median_ms(fn, text, runs):
+    fn(text)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text normalization")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--analysis-kb", type=int, nargs="+", default=[5, 50],
+                        help="AI analysis sizes, in KB (default: 5 50)")
+    args = parser.parse_args()
+
+    print(f"📝 PDF text normalization (median of {args.runs} runs, ms)")
+    print("=" * 72)
+    print(f"{'analysis':>10}{'markdown':>10}{'previous':>10}{'current':>10}"
+          f"{'after markdown':>16}{'summary':>16}")
+    for analysis_kb in args.analysis_kb:
+        text = (ANALYSIS_PARAGRAPH * (analysis_kb * 1024 // len(ANALYSIS_PARAGRAPH) + 1))[:analysis_kb * 1024]
+        assert convert_to_third_person_analysis(text) == previous_third_person(text)
+        assert normalize_summary_text(text) == previous_summary(text)
+
+        markdown_ms = median_ms(markdown.markdown, text, args.runs)
+        previous_ms = median_ms(previous_third_person, text, args.runs)
+        current_ms = median_ms(convert_to_third_person_analysis, text, args.runs)
+        summary = (median_ms(previous_summary, text, args.runs), median_ms(normalize_summary_text, text, args.runs))
+        rewrite = f"{previous_ms - markdown_ms:.1f} -> {current_ms - markdown_ms:.1f}"
+        print(f"{analysis_kb:>8}KB{markdown_ms:>10.1f}{previous_ms:>10.1f}{current_ms:>10.1f}"
+              f"{rewrite:>16}{f'{summary[0]:.2f} -> {summary[1]:.2f}':>16}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark API server startup time and knowledge base load time
+
+Each measurement runs in a fresh interpreter so module caches do not hide
+import cost. Reports:
+  - import time of api_server (what every --reload restart pays)
+  - time until /health answers, with the knowledge base warming in background
+  - time until the knowledge base is ready (lazy load on first use)
+
+Usage:
+    python scripts/benchmark_startup.py --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE_SNIPPET = r"""
+import json, time
+start = time.perf_counter()
+import api_server
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+with TestClient(api_server.app) as client:
+    client.get("/health")
+    health = time.perf_counter()
+    from agent.knowledge_base import knowledge_base
+    knowledge_base.get()
+    kb_ready = time.perf_counter()
+
+print(json.dumps({
+    "import_s": imported - start,
+    "health_s": health - start,
+    "kb_ready_s": kb_ready - start,
+    "kb_state": knowledge_base.state,
+    "kb_load_s": knowledge_base.load_seconds,
+}))
+"""
+
+def measure_once():
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE_SNIPPET],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONWARNINGS": "ignore"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "measurement failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API startup and knowledge base loading")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+
+    print(f"\n🚀 Startup benchmark ({args.runs} runs, median)")
+    print("=" * 50)
+    print(f"import api_server:      {statistics.median(r['import_s'] for r in runs) * 1000:8.0f} ms")
+    print(f"first /health response: {statistics.median(r['health_s'] for r in runs) * 1000:8.0f} ms")
+    print(f"knowledge base ready:   {statistics.median(r['kb_ready_s'] for r in runs) * 1000:8.0f} ms")
+    kb_loads = [r['kb_load_s'] for r in runs if r['kb_load_s'] is not None]
+    if kb_loads:
+        print(f"knowledge base load:    {statistics.median(kb_loads) * 1000:8.0f} ms (state: {runs[-1]['kb_state']})")
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,58 @@
 """
 Build vector store from FDA/CLIA regulatory documents
 Supports: PDF, JSON, XML, TXT files
+
+Builds are incremental: a manifest next to the store records each corpus
+file's SHA-256 and chunk ids, so only new or changed files are re-embedded
+and chunks of deleted files are removed from the index. Use --full to
+rebuild from scratch.
+
+Each build that changes the index is saved as a new version directory
+(stores/fda_clia/v1, v2, ...) and the store's CURRENT pointer is switched
+to it once it is complete, so a running server never sees a partial store
+and can reload the new version without a restart. The newest --keep
+versions are kept.
+
+Extraction and chunking run on a process pool; chunks are embedded in
+fixed-size batches on a thread pool and streamed into the index as they
+arrive, so the whole corpus is never held in memory at once.
+
+Usage:
+    python scripts/build_vector_store.py [--full] [--corpus corpus] [--store stores/fda_clia]
+                                         [--workers N] [--batch-size 64] [--embed-threads 1]
+                                         [--pdf-backend auto|pypdfium2|pdfminer|pypdf2] [--keep 3]
 """
+import argparse
 import glob
+import hashlib
 import os
+import shutil
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import json
+import tempfile
+import time
+from datetime import datetime, timezone
 import xml.etree.ElementTree as ET
-from PyPDF2 import PdfReader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.knowledge_base import (
+    EMBEDDING_MODEL, STORE_PATH, resolve_store_path, set_current_version, store_versions
+)
+from agent.embedding_cache import precompute_query_embeddings
+from agent.extraction import iter_pdf_pages
+from agent.pdf_backends import BACKENDS, resolve_backends
+from agent.analysis_memo import ai_analysis_memo
+
 def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF using PyPDF2"""
-    text = ""
-    with open(pdf_path, 'rb') as file:
-        pdf_reader = PdfReader(file)
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-    return text
+    """Extract text from PDF page by page with the PDF_BACKEND parser (no page or time limit)"""
+    return "".join(page_text + "\n" for _, page_text in iter_pdf_pages(pdf_path))
 
 def extract_text_from_json(json_path):
     """Extract text from JSON file"""
@@ -96,88 +129,426 @@ def extract_text_from_file(file_path):
     except Exception as e:
         return f"Error extracting text from {file_path}: {e}"
 
-def main():
-    print("Building FDA/CLIA regulatory vector store...")
-    
-    # Check if corpus directory exists
-    corpus_dir = "corpus"
-    if not os.path.exists(corpus_dir):
-        print(f"Error: {corpus_dir} directory not found!")
-        return
-    
-    # Find all supported file types
-    supported_extensions = ['*.pdf', '*.json', '*.xml', '*.xsd', '*.txt', '*.md']
+SUPPORTED_EXTENSIONS = ['*.pdf', '*.json', '*.xml', '*.xsd', '*.txt', '*.md']
+MANIFEST_FILE = "manifest.json"
+CHUNK_SIZE = 900
+CHUNK_OVERLAP = 150
+# PDFs are chunked page by page so chunks carry page numbers; bump when the
+# chunking method changes so existing stores are rebuilt
+CHUNKING = "page"
+DEFAULT_BATCH_SIZE = 64
+KEEP_VERSIONS = 3
+
+_text_splitter = None
+
+def find_corpus_files(corpus_dir):
+    """Return every supported file in the corpus directory"""
     all_files = []
-    
-    for ext in supported_extensions:
-        files = glob.glob(os.path.join(corpus_dir, ext))
-        all_files.extend(files)
-    
+    for ext in SUPPORTED_EXTENSIONS:
+        all_files.extend(glob.glob(os.path.join(corpus_dir, ext)))
+    return sorted(all_files)
+
+def file_sha256(file_path):
+    """Hash a file's contents in 1MB blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(store_path):
+    """Load the build manifest, or None if the store has none"""
+    manifest_path = os.path.join(store_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def new_manifest():
+    return {
+        "embedding_model": EMBEDDING_MODEL,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "chunking": CHUNKING,
+        "pdf_backend": resolve_backends()[0].name,
+        "files": {}
+    }
+
+def manifest_compatible(manifest):
+    """True if the existing store was built with the current embedding and chunking settings"""
+    return (
+        manifest is not None
+        and manifest.get("embedding_model") == EMBEDDING_MODEL
+        and manifest.get("chunk_size") == CHUNK_SIZE
+        and manifest.get("chunk_overlap") == CHUNK_OVERLAP
+        and manifest.get("chunking") == CHUNKING
+        and manifest.get("pdf_backend") == resolve_backends()[0].name
+    )
+
+def get_text_splitter():
+    """Return this process's text splitter, created on first use"""
+    global _text_splitter
+    if _text_splitter is None:
+        _text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP
+        )
+    return _text_splitter
+
+def iter_file_text(file_path):
+    """
+    Yield (page_no, text) for a corpus file
+
+    PDFs are read one page at a time so a large regulation never has to be
+    held in memory as one string; other formats yield a single item with
+    page_no None.
+    """
+    if os.path.splitext(file_path)[1].lower() == '.pdf':
+        yield from iter_pdf_pages(file_path)
+    else:
+        yield None, extract_text_from_file(file_path)
+
+def chunk_file(file_path, name, file_hash):
+    """
+    Extract and split one corpus file (runs in a worker process)
+
+    Chunk ids are derived from the file name and hash, so unchanged files
+    keep stable ids across builds. PDF chunks record their page number.
+
+    Returns:
+        (name, chunk Documents, warning message or None, seconds taken)
+    """
+    start = time.perf_counter()
+    metadata = {
+        "source": file_path,
+        "file_type": os.path.splitext(file_path)[1],
+        "filename": os.path.basename(file_path)
+    }
+    text_splitter = get_text_splitter()
+    chunks = []
+    try:
+        for page_no, text in iter_file_text(file_path):
+            if text.startswith("Error"):
+                return name, [], f"No text extracted from {file_path}\n      {text}", time.perf_counter() - start
+            if not text.strip():
+                continue
+            page_metadata = metadata if page_no is None else {**metadata, "page": page_no}
+            # Split each page into chunks as it is read
+            for piece in text_splitter.split_text(text):
+                chunks.append(Document(page_content=piece, metadata=dict(page_metadata),
+                                       id=f"{name}:{file_hash[:12]}:{len(chunks)}"))
+    except Exception as e:
+        return name, [], f"No text extracted from {file_path}\n      Error extracting text from {file_path}: {e}", time.perf_counter() - start
+
+    if not chunks:
+        return name, [], f"No text extracted from {file_path}", time.perf_counter() - start
+    return name, chunks, None, time.perf_counter() - start
+
+def iter_chunked_files(jobs, workers):
+    """
+    Yield chunk_file results as files finish, fanned out over a process pool
+
+    Args:
+        jobs: (file_path, name, file_hash) tuples
+        workers: Worker processes; 1 runs inline
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            try:
+                yield chunk_file(*job)
+            except Exception as e:
+                yield job[1], None, str(e), 0.0
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = {pool.submit(chunk_file, *job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield futures[future][1], None, str(e), 0.0
+
+class BatchIndexer:
+    """
+    Embed chunks in fixed-size batches and stream them into a FAISS store
+
+    Batches are embedded on a thread pool with a bounded number in flight
+    and added to the index in submission order.
+    """
+
+    def __init__(self, vectorstore, embeddings, batch_size=DEFAULT_BATCH_SIZE, threads=1):
+        self.vectorstore = vectorstore
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight = max(1, threads) * 2
+        self._pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="embed")
+        self._pending = []
+        self._in_flight = deque()
+        self.chunks = 0
+        self.embed_seconds = 0.0
+        self.index_seconds = 0.0
+
+    def _embed(self, batch):
+        start = time.perf_counter()
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in batch])
+        return batch, vectors, time.perf_counter() - start
+
+    def _drain_one(self):
+        batch, vectors, seconds = self._in_flight.popleft().result()
+        self.embed_seconds += seconds
+
+        start = time.perf_counter()
+        text_embeddings = list(zip([doc.page_content for doc in batch], vectors))
+        metadatas = [doc.metadata for doc in batch]
+        ids = [doc.id for doc in batch]
+        if self.vectorstore is None:
+            self.vectorstore = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas, ids=ids)
+        else:
+            self.vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+        self.index_seconds += time.perf_counter() - start
+        self.chunks += len(batch)
+
+    def _submit(self, batch):
+        if len(self._in_flight) >= self.max_in_flight:
+            self._drain_one()
+        self._in_flight.append(self._pool.submit(self._embed, batch))
+
+    def add(self, documents):
+        self._pending.extend(documents)
+        while len(self._pending) >= self.batch_size:
+            self._submit(self._pending[:self.batch_size])
+            self._pending = self._pending[self.batch_size:]
+
+    def finish(self):
+        """Embed the final partial batch, wait for all batches and return the store"""
+        if self._pending:
+            self._submit(self._pending)
+            self._pending = []
+        try:
+            while self._in_flight:
+                self._drain_one()
+        finally:
+            self._pool.shutdown(wait=True)
+        return self.vectorstore
+
+def next_version(store_path):
+    """Name of the version directory the next build is saved to"""
+    versions = store_versions(store_path)
+    return f"v{int(versions[-1][1:]) + 1}" if versions else "v1"
+
+def prune_versions(store_path, keep=KEEP_VERSIONS):
+    """Delete all but the newest keep version directories; the current one is never deleted"""
+    current = os.path.basename(resolve_store_path(store_path))
+    versions = store_versions(store_path)
+    for version in versions[:-keep] if keep > 0 else []:
+        if version != current:
+            shutil.rmtree(os.path.join(store_path, version), ignore_errors=True)
+
+def save_store_atomically(vectorstore, manifest, store_path, embeddings, keep=KEEP_VERSIONS):
+    """
+    Write the index, manifest and precomputed query embeddings to a temporary
+    directory in the store, rename it to the next version and point CURRENT
+    at it
+
+    Returns:
+        (number of precomputed query embeddings, version name)
+    """
+    os.makedirs(store_path, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".build-", dir=store_path)
+    try:
+        manifest["built_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        vectorstore.save_local(tmp_dir)
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+
+        # Precompute query embeddings for section names and sample questions
+        precomputed = precompute_query_embeddings(embeddings, tmp_dir, EMBEDDING_MODEL)
+
+        version = next_version(store_path)
+        os.rename(tmp_dir, os.path.join(store_path, version))
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    set_current_version(store_path, version)
+    prune_versions(store_path, keep)
+    return precomputed, version
+
+def build_vector_store(corpus_dir, store_path, embeddings, full=False,
+                       workers=None, batch_size=DEFAULT_BATCH_SIZE, embed_threads=1, keep=KEEP_VERSIONS):
+    """
+    Build or incrementally update the vector store
+
+    Args:
+        corpus_dir: Directory of regulatory documents
+        store_path: Vector store root; each build is saved to a new version in it
+        embeddings: Embedding model
+        full: Rebuild every file even if unchanged
+        workers: Extraction worker processes (default: CPU count)
+        batch_size: Chunks per embedding batch
+        embed_threads: Threads embedding batches concurrently
+        keep: Number of version directories to keep
+
+    Returns:
+        Dict of counts (added, updated, removed, unchanged files and total
+        chunks), the saved version and per-stage timings, or None if there
+        was nothing to index
+    """
+    build_start = time.perf_counter()
+    timings = {}
+    all_files = find_corpus_files(corpus_dir)
     if not all_files:
         print(f"Warning: No supported files found in {corpus_dir}/")
-        print(f"Supported formats: {', '.join(supported_extensions)}")
+        print(f"Supported formats: {', '.join(SUPPORTED_EXTENSIONS)}")
         print("Please add regulatory documents to the corpus folder")
-        return
-    
-    print(f"Found {len(all_files)} document(s):")
-    for file in all_files:
-        print(f"  - {os.path.basename(file)} ({os.path.splitext(file)[1]})")
-    
-    # Initialize text splitter and embeddings
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=900, 
-        chunk_overlap=150
-    )
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
+        return None
+
+    stage_start = time.perf_counter()
+    # Start from the version currently served (or an unversioned store)
+    previous_path = resolve_store_path(store_path)
+    manifest = None if full else load_manifest(previous_path)
+    vectorstore = None
+    if manifest_compatible(manifest):
+        vectorstore = FAISS.load_local(previous_path, embeddings, allow_dangerous_deserialization=True)
+    else:
+        if manifest is not None:
+            print("Embedding, chunking or PDF backend settings changed; rebuilding from scratch")
+        manifest = new_manifest()
+    timings["load"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    previous = manifest["files"]
+    current = {os.path.relpath(path, corpus_dir): path for path in all_files}
+    hashes = {name: file_sha256(path) for name, path in current.items()}
+    timings["hash"] = time.perf_counter() - stage_start
+
+    changed = [name for name in current if previous.get(name, {}).get("sha256") != hashes[name]]
+    removed = [name for name in previous if name not in current]
+    stats = {
+        "added": sum(1 for name in changed if name not in previous),
+        "updated": sum(1 for name in changed if name in previous),
+        "removed": len(removed),
+        "unchanged": len(current) - len(changed)
+    }
+    print(f"Found {len(all_files)} document(s): {stats['added']} new, {stats['updated']} changed, "
+          f"{stats['removed']} deleted, {stats['unchanged']} unchanged")
+
+    if vectorstore is not None and not changed and not removed:
+        stats["chunks"] = len(vectorstore.index_to_docstore_id)
+        print("✅ Vector store is up to date")
+        return stats
+
+    # Drop chunks of deleted and changed files from the index
+    stale_ids = [chunk_id for name in removed + changed for chunk_id in previous.get(name, {}).get("chunk_ids", [])]
+    if vectorstore is not None and stale_ids:
+        vectorstore.delete(stale_ids)
+    for name in removed:
+        print(f"Removed: {name}")
+        del previous[name]
+
+    # Extract and split new or changed files in parallel, embedding chunks
+    # in batches as each file finishes
+    stage_start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    indexer = BatchIndexer(vectorstore, embeddings, batch_size=batch_size, threads=embed_threads)
+    extract_seconds = 0.0
+    jobs = [(current[name], name, hashes[name]) for name in changed]
+    for name, chunks, warning, seconds in iter_chunked_files(jobs, workers):
+        extract_seconds += seconds
+        if chunks is None:
+            print(f"  -> Error processing {current[name]}: {warning}")
+            previous.pop(name, None)
+            continue
+        if warning:
+            print(f"  -> Warning: {warning}")
+        print(f"Processed: {current[name]} ({len(chunks)} chunks, {seconds:.2f}s)")
+        previous[name] = {"sha256": hashes[name], "chunk_ids": [chunk.id for chunk in chunks]}
+        indexer.add(chunks)
+    vectorstore = indexer.finish()
+    ingest_seconds = time.perf_counter() - stage_start
+    timings["extract"] = extract_seconds
+    timings["embed"] = indexer.embed_seconds
+    timings["index"] = indexer.index_seconds
+    timings["ingest_wall"] = ingest_seconds
+
+    if vectorstore is None or not vectorstore.index_to_docstore_id:
+        print("Error: No documents were successfully processed!")
+        return None
+
+    stage_start = time.perf_counter()
+    precomputed, version = save_store_atomically(vectorstore, manifest, store_path, embeddings, keep)
+    timings["save"] = time.perf_counter() - stage_start
+    timings["total"] = time.perf_counter() - build_start
+
+    stats["chunks"] = len(vectorstore.index_to_docstore_id)
+    stats["version"] = version
+    stats["embedded_chunks"] = indexer.chunks
+    stats["chunks_per_second"] = indexer.chunks / ingest_seconds if ingest_seconds else 0.0
+    stats["timings"] = timings
+
+    print(f"✅ Vector store now holds {stats['chunks']} chunks")
+    print(f"🧮 Precomputed {precomputed} query embeddings")
+    print(f"📁 Saved to: {os.path.join(store_path, version)}/ (now current)")
+    print_timings(stats, workers, batch_size, embed_threads)
+    return stats
+
+def print_timings(stats, workers, batch_size, embed_threads):
+    """Print per-stage timings and embedding throughput"""
+    timings = stats["timings"]
+    print(f"\n⏱️  Stage timings ({workers} workers, batch size {batch_size}, {embed_threads} embed threads)")
+    print(f"  load store:        {timings['load']:8.2f}s")
+    print(f"  hash files:        {timings['hash']:8.2f}s")
+    print(f"  extract + chunk:   {timings['extract']:8.2f}s (summed across workers)")
+    print(f"  embed:             {timings['embed']:8.2f}s (summed across threads)")
+    print(f"  index add:         {timings['index']:8.2f}s")
+    print(f"  ingest wall time:  {timings['ingest_wall']:8.2f}s")
+    print(f"  save:              {timings['save']:8.2f}s")
+    print(f"  total:             {timings['total']:8.2f}s")
+    print(f"  throughput:        {stats['chunks_per_second']:8.1f} chunks/sec ({stats['embedded_chunks']} chunks embedded)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the FDA/CLIA regulatory vector store")
+    parser.add_argument("--full", action="store_true", help="Rebuild every file instead of only new or changed ones")
+    parser.add_argument("--corpus", default="corpus", help="Corpus directory (default: corpus)")
+    parser.add_argument("--store", default=STORE_PATH, help=f"Vector store directory (default: {STORE_PATH})")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"Chunks per embedding batch (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--embed-threads", type=int, default=1, help="Threads embedding batches concurrently (default: 1)")
+    parser.add_argument("--keep", type=int, default=KEEP_VERSIONS,
+                        help=f"Store versions to keep (default: {KEEP_VERSIONS})")
+    parser.add_argument("--pdf-backend", choices=["auto", *BACKENDS], default=None,
+                        help="PDF text extraction backend (default: PDF_BACKEND or auto)")
+    args = parser.parse_args()
     
-    # Process documents
-    documents = []
-    for file_path in all_files:
-        print(f"Processing: {file_path}")
-        try:
-            text = extract_text_from_file(file_path)
-            if text.strip() and not text.startswith("Error"):
-                # Create document with metadata
-                doc = Document(
-                    page_content=text,
-                    metadata={
-                        "source": file_path,
-                        "file_type": os.path.splitext(file_path)[1],
-                        "filename": os.path.basename(file_path)
-                    }
-                )
-                # Split document into chunks
-                chunks = text_splitter.split_documents([doc])
-                documents.extend(chunks)
-                print(f"  -> Extracted {len(chunks)} chunks")
-            else:
-                print(f"  -> Warning: No text extracted from {file_path}")
-                if text.startswith("Error"):
-                    print(f"      {text}")
-        except Exception as e:
-            print(f"  -> Error processing {file_path}: {e}")
+    if args.pdf_backend:
+        # Set in the environment so extraction worker processes use it too
+        os.environ["PDF_BACKEND"] = args.pdf_backend
+
+    print("Building FDA/CLIA regulatory vector store...")
     
-    if not documents:
-        print("Error: No documents were successfully processed!")
+    # Check if corpus directory exists
+    if not os.path.exists(args.corpus):
+        print(f"Error: {args.corpus} directory not found!")
         return
     
-    # Create vector store
-    print(f"Creating vector store with {len(documents)} document chunks...")
+    embeddings = HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL
+    )
     try:
-        vectorstore = FAISS.from_documents(documents, embeddings)
-        
-        # Save vector store
-        store_dir = "stores"
-        os.makedirs(store_dir, exist_ok=True)
-        vectorstore.save_local(os.path.join(store_dir, "fda_clia"))
-        
-        print(f"✅ Successfully created vector store with {len(documents)} chunks")
-        print(f"📁 Saved to: {store_dir}/fda_clia/")
-        
+        stats = build_vector_store(
+            args.corpus, args.store, embeddings, full=args.full,
+            workers=args.workers, batch_size=args.batch_size, embed_threads=args.embed_threads,
+            keep=args.keep
+        )
     except Exception as e:
         print(f"Error creating vector store: {e}")
+        return
+    
+    if stats and "timings" in stats:
+        # Memoized AI analyses were generated from the previous store's chunks
+        ai_analysis_memo.clear()
+        print("🧹 Cleared memoized AI analyses (regenerate with scripts/prewarm_ai_analysis.py)")
+        print("🔄 Running servers pick up the new version within KB_WATCH_INTERVAL, "
+              "or POST /api/knowledge-base/reload")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the LDT Compliance Copilot API
+
+Fires concurrent /api/qa and /api/analyze requests at a running server
+while probing /health, and reports throughput and latency percentiles.
+If the handlers block the event loop, /health latency rises to match the
+slowest request; with the executor-backed handlers it should stay flat and
+throughput should scale with LDT_THREAD_WORKERS / LDT_PROCESS_WORKERS.
+
+Usage:
+    python scripts/load_test.py --concurrency 8 --requests 32
+    python scripts/load_test.py --endpoint analyze --file corpus/2024-13872.pdf
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+DEFAULT_QUESTION = "What are my LDT analytical validation requirements?"
+
+def percentile(values, pct):
+    """Return the pct-th percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def call_qa(client, question):
+    response = await client.post("/api/qa", json={"question": question})
+    return response.status_code
+
+async def call_analyze(client, file_path):
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    files = {'file': (os.path.basename(file_path), content)}
+    response = await client.post("/api/analyze", files=files)
+    return response.status_code
+
+async def probe_health(client, stop_event, latencies):
+    """Poll /health until stopped, recording latency in milliseconds"""
+    while not stop_event.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get("/health")
+            latencies.append((time.perf_counter() - start) * 1000)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.1)
+
+async def run_load(args):
+    latencies = []
+    statuses = []
+    health_latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    stop_event = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+        async def one_request():
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    if args.endpoint == "qa":
+                        status = await call_qa(client, args.question)
+                    else:
+                        status = await call_analyze(client, args.file)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses.append(status)
+
+        health_task = asyncio.create_task(probe_health(client, stop_event, health_latencies))
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(args.requests)))
+        wall_time = time.perf_counter() - wall_start
+        stop_event.set()
+        await health_task
+
+    ok = sum(1 for s in statuses if s == 200)
+    print(f"\n📊 /api/{args.endpoint} load test")
+    print("=" * 50)
+    print(f"Requests:        {args.requests} (concurrency {args.concurrency})")
+    print(f"Succeeded:       {ok}/{len(statuses)}")
+    print(f"Wall time:       {wall_time:.2f}s")
+    print(f"Throughput:      {len(statuses) / wall_time:.2f} req/s")
+    print(f"Latency p50:     {percentile(latencies, 50):.0f} ms")
+    print(f"Latency p95:     {percentile(latencies, 95):.0f} ms")
+    print(f"Latency max:     {max(latencies, default=0):.0f} ms")
+    if health_latencies:
+        print(f"/health p50:     {statistics.median(health_latencies):.1f} ms")
+        print(f"/health max:     {max(health_latencies):.1f} ms")
+    errors = [s for s in statuses if s != 200]
+    if errors:
+        print(f"Non-200 results: {sorted(set(map(str, errors)))}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the LDT Compliance Copilot API")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--endpoint", choices=["qa", "analyze"], default="qa")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--question", default=DEFAULT_QUESTION)
+    parser.add_argument("--file", default="corpus/sample_ldt_requirements.txt",
+                        help="Document to upload for --endpoint analyze")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    asyncio.run(run_load(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub for the Nemotron chat completions endpoint
+
+Serves POST /v1/chat/completions with a canned answer after a fixed delay
+(streamed word by word when stream=true) over HTTP/1.1 keep-alive, so the
+Nemotron client pooling, streaming and latency metrics can be exercised and
+benchmarked without network access.
+
+Usage:
+    python scripts/nemotron_stub_server.py --port 8001 --delay 0.05
+    NEMOTRON_BASE_URL=http://127.0.0.1:8001/v1 NVIDIA_API_KEY=stub python api_server.py
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_ANSWER = "**Stub Nemotron response.** Cite 21 CFR 809.10 and 21 CFR 820 where applicable."
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+    answer = STUB_ANSWER
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        if request.get("stream"):
+            self._send_stream(request)
+            return
+
+        time.sleep(self.delay)
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.answer},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        })
+
+    def _send_stream(self, request):
+        """Send the answer as chat.completion.chunk SSE events, one word at a time"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        words = self.answer.split(" ")
+        per_token_delay = self.delay / max(1, len(words))
+
+        def write_event(data):
+            payload = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(payload):X}\r\n".encode("ascii") + payload + b"\r\n")
+            self.wfile.flush()
+
+        for i, word in enumerate(words):
+            time.sleep(per_token_delay)
+            write_event(json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": None
+                }]
+            }))
+        write_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, delay: float = 0.0):
+    """
+    Start the stub server on a background thread
+
+    Returns:
+        (server, base_url) - call server.shutdown() to stop it
+    """
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"delay": delay})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}/v1"
+    return server, base_url
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible Nemotron stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay", type=float, default=0.05, help="Simulated generation time in seconds")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.host, args.port, args.delay)
+    print(f"🧪 Nemotron stub listening on {base_url} (delay {args.delay}s)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Pre-generate the memoized AI gap analysis for every missing-section set
+
+With five required sections there are 31 non-empty missing-section sets
+(the empty set needs no LLM call). Each is retrieved against the current
+knowledge base and sent to Nemotron once; afterwards analyses whose gaps
+match a memoized set skip the LLM entirely. Sets already memoized for the
+current knowledge base version are skipped unless --force is given.
+
+Usage:
+    python scripts/prewarm_ai_analysis.py --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.analysis_memo import ai_analysis_memo, missing_section_sets
+from agent.gap_critic import REQUIRED_SECTIONS
+from agent.knowledge_base import knowledge_base, knowledge_base_version
+from agent.run import generate_ai_analysis, get_regulatory_context
+
+def prewarm(missing_sections):
+    start = time.perf_counter()
+    context_chunks = get_regulatory_context(list(missing_sections))
+    generate_ai_analysis(missing_sections, context_chunks)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoize the AI gap analysis for every missing-section set")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent LLM calls (default: 2)")
+    parser.add_argument("--force", action="store_true", help="Regenerate sets that are already memoized")
+    args = parser.parse_args()
+
+    if not ai_analysis_memo.enabled:
+        parser.error("The AI analysis memo is off; set AI_ANALYSIS_MEMO_ENABLED=1 to prewarm it")
+    if knowledge_base.get() is None:
+        parser.error(f"Knowledge base not available: {knowledge_base.error}")
+
+    sets = list(missing_section_sets(REQUIRED_SECTIONS))
+    if args.force:
+        ai_analysis_memo.clear()
+    todo = [missing for missing in sets if ai_analysis_memo.get(missing) is None]
+    print(f"🔥 Knowledge base version {knowledge_base_version()}: "
+          f"{len(sets) - len(todo)} of {len(sets)} missing-section sets already memoized")
+
+    start = time.perf_counter()
+    failures = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [(missing, pool.submit(prewarm, missing)) for missing in todo]
+        for missing, future in futures:
+            try:
+                print(f"  ✅ {', '.join(missing)} ({future.result():.1f}s)")
+            except Exception as e:
+                failures += 1
+                print(f"  ❌ {', '.join(missing)}: {e}")
+
+    print(f"Memoized {len(todo) - failures} sets in {time.perf_counter() - start:.1f}s ({failures} failed)")
+    print(f"Memo: {ai_analysis_memo.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,7 @@ def start_backend():
         "--host", "0.0.0.0",
         "--port", "8000",
         "--reload"
-    ], cwd=Path(__file__).parent)
+    ], cwd=Path(__file__).parent, env={"REPORT_TEMPLATE_AUTO_RELOAD": "1", **os.environ})
     return backend_process
 
 def start_frontend():
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the missing-section-set memo of AI gap analyses
+"""
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+import agent.run as run
+from agent.analysis_memo import AIAnalysisMemo, missing_section_sets
+from agent.gap_critic import REQUIRED_SECTIONS
+from agent.llm_cache import LLMCache
+from test_analysis_pipeline import SAMPLE_SUBMISSION
+
+
+@pytest.fixture
+def memo(monkeypatch, tmp_path, llm_calls):
+    version = {"value": "v1"}
+    memo = AIAnalysisMemo(LLMCache(path=str(tmp_path / "memo.sqlite3"), ttl_seconds=0),
+                          model="model", kb_version=lambda: version["value"])
+    monkeypatch.setattr(run, "ai_analysis_memo", memo)
+    memo.version = version
+    return memo
+
+
+def test_memo_is_off_unless_enabled():
+    environment = {k: v for k, v in os.environ.items() if k != "AI_ANALYSIS_MEMO_ENABLED"}
+    check = "from agent.analysis_memo import ai_analysis_memo; print(ai_analysis_memo.enabled)"
+
+    output = subprocess.run([sys.executable, "-c", check], env=environment, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+
+    assert output.strip() == "False"
+
+
+def test_every_required_section_combination_is_enumerated():
+    sets = list(missing_section_sets(REQUIRED_SECTIONS))
+
+    assert len(sets) == 2 ** len(REQUIRED_SECTIONS) - 1
+    assert len({tuple(missing) for missing in sets}) == len(sets)
+
+
+def test_key_ignores_order_but_not_knowledge_base_version(memo):
+    key = memo.key(["Risk Assessment", "Intended Use"])
+
+    assert key == memo.key(["Intended Use", "Risk Assessment"])
+    memo.version["value"] = "v2"
+    assert key != memo.key(["Intended Use", "Risk Assessment"])
+
+
+def test_submissions_with_the_same_gaps_share_one_llm_call(memo, llm_calls):
+    first = run.run_analysis(SAMPLE_SUBMISSION, "a.txt")
+    second = run.run_analysis(SAMPLE_SUBMISSION + b"\nAppendix: Intended Use details", "b.txt")
+    streamed = list(run.stream_analysis(SAMPLE_SUBMISSION, "c.txt"))
+
+    assert len(llm_calls) == 1
+    assert "evidence from the submission" not in llm_calls[0]
+    assert second.ai_analysis == first.ai_analysis
+    assert streamed[-1][1].ai_analysis == first.ai_analysis
+
+
+def test_async_analyses_share_the_memo(memo, llm_calls):
+    first = asyncio.run(run.run_analysis_async(SAMPLE_SUBMISSION, "a.txt"))
+
+    async def stream():
+        return [event async for event in run.stream_analysis_async(SAMPLE_SUBMISSION, "b.txt")]
+
+    streamed = asyncio.run(stream())
+
+    assert len(llm_calls) == 1
+    assert streamed[-1][1].ai_analysis == first.ai_analysis
+
+
+def test_rebuilt_knowledge_base_misses_the_memo(memo, llm_calls):
+    run.run_analysis(SAMPLE_SUBMISSION, "a.txt")
+    memo.version["value"] = "v2"
+    run.run_analysis(SAMPLE_SUBMISSION, "a.txt")
+
+    assert len(llm_calls) == 2
+
+
+def test_streamed_analysis_is_memoized(memo, llm_calls):
+    list(run.stream_analysis(SAMPLE_SUBMISSION, "a.txt"))
+
+    missing = run.analyze_completeness(SAMPLE_SUBMISSION.decode())['missing_required']
+    assert memo.get(missing) == "Detailed regulatory guidance."
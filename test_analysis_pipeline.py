@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass analysis pipeline
+Verifies that each upload costs exactly one LLM call
+"""
+import os
+import time
+
+import pytest
+
+import agent.run as run
+from conftest import FakeChunk
+
+
+SAMPLE_SUBMISSION = b"""
+Laboratory Developed Test Submission
+
+1. Intended Use
+This test is intended for the quantitative measurement of biomarker X in human serum.
+
+2. Precision Studies
+Within-run CV: 5.2%
+"""
+
+
+def test_pipeline_makes_one_llm_call(llm_calls):
+    result = run.run_analysis(SAMPLE_SUBMISSION, "submission.txt")
+
+    assert len(llm_calls) == 1
+    assert result.ai_analysis == "Detailed regulatory guidance."
+    assert "Intended Use" in result.analysis['present_sections']
+    assert result.context_chunks
+    assert result.executive_summary
+    assert "Detailed regulatory guidance." in result.report_markdown
+
+
+def test_prompt_and_report_cite_section_evidence(llm_calls):
+    result = run.run_analysis(SAMPLE_SUBMISSION, "submission.txt")
+
+    locations = result.analysis['section_locations']
+    assert locations["Intended Use"][0]["match"] == "Intended Use"
+    assert "This test is intended for" in llm_calls[0]
+    assert "Sections Already Present" in llm_calls[0]
+    assert "quantitative measurement" in result.report_markdown
+
+
+def test_gap_report_makes_one_llm_call(llm_calls):
+    report = run.generate_gap_report(SAMPLE_SUBMISSION, "submission.txt")
+
+    assert len(llm_calls) == 1
+    assert "Detailed regulatory guidance." in report
+
+
+def test_async_pipeline_makes_one_llm_call(llm_calls):
+    import asyncio
+
+    result = asyncio.run(run.run_analysis_async(SAMPLE_SUBMISSION, "submission.txt"))
+
+    assert len(llm_calls) == 1
+    assert result.ai_analysis == "Detailed regulatory guidance."
+
+
+def test_extraction_error_raises(llm_calls):
+    with pytest.raises(run.ExtractionError):
+        run.analysis_pipeline.extract(b"%PDF-broken", "broken.pdf")
+    assert llm_calls == []
+
+
+def test_analyze_endpoint_makes_one_llm_call(llm_calls):
+    from fastapi.testclient import TestClient
+    import api_server
+
+    client = TestClient(api_server.app)
+    response = client.post(
+        "/api/analyze",
+        files={"file": ("submission.txt", SAMPLE_SUBMISSION, "text/plain")}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(llm_calls) == 1
+    assert data['ai_analysis'] == "Detailed regulatory guidance."
+    assert "Detailed regulatory guidance." in data['report_markdown']
+
+
+def test_pipeline_records_stage_timings(llm_calls):
+    result = run.run_analysis(SAMPLE_SUBMISSION, "submission.txt")
+
+    assert list(result.timings) == ["extract", "analyze", "retrieve", "summarize", "generate", "render"]
+
+
+def test_job_endpoints_run_analysis_in_background(llm_calls, monkeypatch, tmp_path):
+    import time
+    from fastapi.testclient import TestClient
+    import api_server
+    from agent.jobs import JobStore
+
+    monkeypatch.setenv("KB_WARMUP", "0")
+    monkeypatch.setattr(api_server.job_pool, "store", JobStore(str(tmp_path / "jobs.sqlite3")))
+    with TestClient(api_server.app) as client:
+        response = client.post(
+            "/api/jobs",
+            files={"file": ("submission.txt", SAMPLE_SUBMISSION, "text/plain")}
+        )
+        assert response.status_code == 202
+        job_id = response.json()['id']
+
+        for _ in range(200):
+            job = client.get(f"/api/jobs/{job_id}").json()
+            if job['status'] in ("succeeded", "failed"):
+                break
+            time.sleep(0.01)
+
+        assert client.get("/api/jobs/unknown").status_code == 404
+
+    assert job['status'] == "succeeded"
+    assert job['result']['ai_analysis'] == "Detailed regulatory guidance."
+    assert job['partial']['score'] == job['result']['score']
+    assert {"queued", "extract", "generate", "render"} <= set(job['timings'])
+    assert len(llm_calls) == 1
+
+
+def test_stream_makes_one_llm_call(llm_calls):
+    events = list(run.stream_analysis(SAMPLE_SUBMISSION, "submission.txt"))
+    names = [event for event, _ in events]
+
+    assert len(llm_calls) == 1
+    assert names[:2] == ["analysis", "sources"]
+    assert names[-1] == "result"
+    assert "token" in names
+    result = events[-1][1]
+    assert result.ai_analysis == "".join(data for event, data in events if event == "token")
+
+
+def parse_sse(body):
+    """Split an SSE response body into (event, data) pairs"""
+    import json
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_analyze_stream_endpoint_sends_sources_first(llm_calls):
+    from fastapi.testclient import TestClient
+    import api_server
+
+    client = TestClient(api_server.app)
+    response = client.post(
+        "/api/analyze/stream",
+        files={"file": ("submission.txt", SAMPLE_SUBMISSION, "text/plain")}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    names = [event for event, _ in events]
+    assert names[:2] == ["analysis", "sources"]
+    assert names[-2:] == ["result", "done"]
+    assert events[-2][1]['ai_analysis'] == "Detailed regulatory guidance."
+    assert len(llm_calls) == 1
+
+
+def test_qa_stream_endpoint_sends_sources_first(llm_calls, monkeypatch):
+    from fastapi.testclient import TestClient
+    import api_server
+
+    monkeypatch.setattr(api_server, "knowledge_base", run.knowledge_base)
+    client = TestClient(api_server.app)
+    response = client.post("/api/qa/stream", json={"question": "What is an LDT?"})
+
+    events = parse_sse(response.text)
+    assert events[0] == ("sources", ["corpus/fake.pdf"] * 4)
+    assert "".join(data for event, data in events if event == "token") == "Detailed regulatory guidance."
+    assert events[-1][0] == "done"
+
+
+def test_rendered_report_is_reused_from_artifact_cache(llm_calls, monkeypatch, tmp_path):
+    from agent.artifact_cache import ArtifactCache
+
+    monkeypatch.setattr(run, "artifact_cache", ArtifactCache(str(tmp_path / "reports")))
+    renders = []
+    render_report = run.render_report
+    monkeypatch.setattr(run, "render_report", lambda *args: renders.append(args) or render_report(*args))
+
+    first = run.run_analysis(SAMPLE_SUBMISSION, "submission.txt")
+    second = run.run_analysis(SAMPLE_SUBMISSION, "copy.txt")
+
+    assert second.report_markdown == first.report_markdown
+    assert len(renders) == 1
+    assert [path.suffix for path in (tmp_path / "reports").iterdir()] == [".md"]
+
+
+REPORT_INPUTS = (
+    {"completeness_score": 60.0, "missing_required": {"Risk Assessment": "Risk management file"},
+     "missing_recommended": {}, "present_sections": ["Intended Use"]},
+    "Summary", "Detailed regulatory guidance.", [FakeChunk("Guidance for risk", "corpus/fake.pdf")]
+)
+
+
+@pytest.fixture
+def template_dir(monkeypatch, tmp_path):
+    """Run from a directory with its own report template and a fresh environment"""
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates" / "report_template.md").write_text("Score {{ completeness_score }}%")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("REPORT_TEMPLATE_CACHE_DIR", str(tmp_path / "bytecode"))
+    run.report_environment.cache_clear()
+    yield tmp_path / "templates" / "report_template.md"
+    run.report_environment.cache_clear()
+
+
+def test_report_template_is_compiled_once():
+    from jinja2 import Template
+
+    with open(run.REPORT_TEMPLATE_PATH) as f:
+        expected = Template(f.read()).render(**run.report_template_vars(*REPORT_INPUTS))
+
+    assert run.report_template() is run.report_template()
+    assert run.render_report(*REPORT_INPUTS) == expected
+
+
+@pytest.mark.parametrize("auto_reload, expected", [("0", "Score 60.0%"), ("1", "Updated 60.0%")])
+def test_report_template_reloads_only_when_enabled(template_dir, monkeypatch, auto_reload, expected):
+    monkeypatch.setenv("REPORT_TEMPLATE_AUTO_RELOAD", auto_reload)
+    assert run.render_report(*REPORT_INPUTS) == "Score 60.0%"
+    key = run.report_markdown_key(*REPORT_INPUTS)
+
+    template_dir.write_text("Updated {{ completeness_score }}%")
+    os.utime(template_dir, (time.time() + 5, time.time() + 5))
+
+    assert run.render_report(*REPORT_INPUTS) == expected
+    assert (run.report_markdown_key(*REPORT_INPUTS) == key) is (auto_reload == "0")
+
+
+def test_report_renders_without_a_writable_bytecode_cache(template_dir, monkeypatch):
+    blocker = template_dir.parent.parent / "read-only"
+    blocker.write_text("")
+    monkeypatch.setenv("REPORT_TEMPLATE_CACHE_DIR", str(blocker / "templates"))
+
+    assert run.report_environment().bytecode_cache is None
+    assert run.render_report(*REPORT_INPUTS) == "Score 60.0%"
+
+
+def test_fallback_template_is_used_without_a_template_file(template_dir):
+    template_dir.unlink()
+
+    assert run.render_report(*REPORT_INPUTS).lstrip().startswith("# LDT Compliance Gap Report")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed report artifact cache
+"""
+import os
+import time
+
+import pytest
+
+from agent.artifact_cache import ArtifactCache, artifact_key, compliance_pdf_key, etag_matches
+
+
+def write_file(directory, data):
+    path = os.path.join(directory, f"render-{time.perf_counter_ns()}.tmp")
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def test_key_depends_on_payload_and_renderer():
+    key = artifact_key("pdf", {"score": 80.0, "sections": ["a", "b"]})
+
+    assert key == artifact_key("pdf", {"sections": ["a", "b"], "score": 80.0})
+    assert key != artifact_key("pdf", {"score": 80.5, "sections": ["a", "b"]})
+    assert key != artifact_key("md", {"score": 80.0, "sections": ["a", "b"]})
+    assert key != artifact_key("pdf", {"score": 80.0, "sections": ["a", "b"]}, renderer="v2")
+    assert compliance_pdf_key({"score": 80.0}) != compliance_pdf_key({"score": 81.0})
+
+
+def test_rendered_file_is_moved_into_the_cache(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    key = artifact_key("pdf", {"score": 80.0})
+    assert cache.get(key, ".pdf") is None
+
+    path = cache.put(key, ".pdf", write_file(cache.render_directory(), b"%PDF-1"))
+
+    assert cache.get(key, ".pdf") == path
+    with open(path, 'rb') as f:
+        assert f.read() == b"%PDF-1"
+    assert [entry.name for entry in tmp_path.iterdir()] == [os.path.basename(path)]
+    assert cache.stats()["hits"] == 1
+
+
+def test_get_or_create_renders_once(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    renders = []
+
+    def render(directory):
+        renders.append(directory)
+        return write_file(directory, b"%PDF-1")
+
+    first = cache.get_or_create("a" * 64, ".pdf", render)
+    second = cache.get_or_create("a" * 64, ".pdf", render)
+
+    assert renders == [str(tmp_path)]
+    for path in (first, second):
+        with open(path, 'rb') as f:
+            assert f.read() == b"%PDF-1"
+        os.unlink(path)
+    assert [entry.name for entry in tmp_path.iterdir()] == ["a" * 64 + ".pdf"]
+
+
+def test_checked_out_artifact_survives_eviction(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=150)
+    key = artifact_key("pdf", {"score": 80.0})
+    assert cache.checkout(key, ".pdf") is None
+
+    sending = cache.put_and_checkout(key, ".pdf", write_file(cache.render_directory(), b"%PDF-" + b"1" * 95))
+    cached = cache.checkout(key, ".pdf")
+    past = time.time() - 60
+    os.utime(cache.path(key, ".pdf"), (past, past))
+    cache.put_text(artifact_key("md", 1), ".md", "x" * 100)  # evicts the PDF
+
+    assert cache.get(key, ".pdf") is None
+    for path in (sending, cached):
+        with open(path, 'rb') as f:
+            assert f.read().startswith(b"%PDF-1")
+    assert cache.stats()["hits"] == 1 and cache.stats()["evictions"] == 1
+
+
+def test_least_recently_used_artifacts_are_evicted_over_budget(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=250)
+    keys = [artifact_key("md", i) for i in range(3)]
+    cache.put_text(keys[0], ".md", "x" * 100)
+    cache.put_text(keys[1], ".md", "y" * 100)
+    past = time.time() - 60
+    os.utime(cache.path(keys[1], ".md"), (past, past))
+
+    cache.put_text(keys[2], ".md", "z" * 100)
+
+    assert cache.get_text(keys[1], ".md") is None
+    assert cache.get_text(keys[0], ".md") == "x" * 100
+    assert cache.get_text(keys[2], ".md") == "z" * 100
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 200
+
+
+def test_disabled_cache_leaves_files_with_the_caller(tmp_path):
+    cache = ArtifactCache(str(tmp_path / "artifacts"), enabled=False)
+    source = write_file(str(tmp_path), b"%PDF-1")
+
+    assert cache.put("b" * 64, ".pdf", source) == source
+    assert cache.put_and_checkout("b" * 64, ".pdf", source) == source
+    assert cache.get("b" * 64, ".pdf") is None
+    assert cache.checkout("b" * 64, ".pdf") is None
+    assert not (tmp_path / "artifacts").exists()
+
+
+@pytest.mark.parametrize("header, matches", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ('*', True),
+    ('"xyz"', False),
+    (None, False),
+])
+def test_etag_matching(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+def test_generate_pdf_endpoint_serves_cached_pdf_and_304(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import api_server
+
+    renders = []
+
+    async def run_in_process(fn, *args):
+        renders.append(fn)
+        return fn(*args)
+
+    monkeypatch.setattr(api_server, "run_in_process", run_in_process)
+    monkeypatch.setattr(api_server, "artifact_cache", ArtifactCache(str(tmp_path)))
+    payload = {
+        "filename": "submission.pdf", "score": 80.0,
+        "missing_sections": {"Risk Assessment": "Risk management file per ISO 14971"},
+        "present_sections": ["Intended Use"], "executive_summary": "",
+        "ai_analysis": "You should add an FMEA.", "report_markdown": ""
+    }
+    client = TestClient(api_server.app)
+
+    first = client.post("/api/generate-pdf", json=payload)
+    second = client.post("/api/generate-pdf", json=payload)
+    not_modified = client.post("/api/generate-pdf", json=payload, headers={"If-None-Match": first.headers["etag"]})
+    changed = client.post("/api/generate-pdf", json={**payload, "score": 81.0},
+                          headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == second.status_code == changed.status_code == 200
+    assert first.content.startswith(b"%PDF-")
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"] != changed.headers["etag"]
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert len(renders) == 2
+    # Only the cached PDFs remain: the checked out copies were deleted once sent
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == [".pdf", ".pdf"]
+    assert not any(path.name.startswith(".") for path in tmp_path.iterdir())
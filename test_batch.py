@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for batch analysis: shared retrieval/LLM calls, NDJSON endpoint and CLI
+"""
+import io
+import json
+import asyncio
+import zipfile
+
+import pytest
+
+from agent import batch
+from agent.gap_critic import section_registry
+from test_analysis_pipeline import SAMPLE_SUBMISSION
+
+OTHER_GAPS = b"Intended Use\nQuality System per ISO 13485\nRisk Assessment (FMEA)\n"
+
+
+def collect(files, **kwargs):
+    async def run():
+        return [record async for record in batch.analyze_batch(files, **kwargs)]
+    return asyncio.run(run())
+
+
+def test_identical_missing_sets_share_one_llm_call(llm_calls):
+    files = [("a.txt", SAMPLE_SUBMISSION), ("b.txt", SAMPLE_SUBMISSION + b"\nAppendix"), ("c.txt", OTHER_GAPS)]
+
+    records = collect(files)
+
+    assert sorted(record["filename"] for record in records[:-1]) == ["a.txt", "b.txt", "c.txt"]
+    assert len(llm_calls) == 2
+    summary = records[-1]["summary"]
+    assert summary["files"] == 3 and summary["succeeded"] == 3
+    assert summary["llm_calls"] == 2 and summary["llm_calls_shared"] == 1
+    assert summary["distinct_missing_sets"] == 2
+    assert all(record["ai_analysis"] == "Detailed regulatory guidance." for record in records[:-1])
+
+
+def test_failed_file_is_reported_without_stopping_batch(llm_calls):
+    records = collect([("empty.txt", b""), ("a.txt", SAMPLE_SUBMISSION)], detect_only=True)
+
+    by_name = {record.get("filename"): record for record in records}
+    assert by_name["empty.txt"]["status"] == "failed"
+    assert by_name["a.txt"]["status"] == "succeeded"
+    assert "ai_analysis" not in by_name["a.txt"]
+    assert llm_calls == []
+
+
+def test_detect_only_streams_pdf_pages(llm_calls):
+    from test_extraction import make_pdf
+
+    every_section = " ".join(list(section_registry.required) + list(section_registry.recommended))
+    pdf = make_pdf(["Cover", every_section] + ["Appendix"] * 20)
+
+    records = collect([("complete.pdf", pdf)], detect_only=True)
+
+    assert records[0]["status"] == "succeeded"
+    assert records[0]["score"] == 100.0
+    assert "detect" in records[0]["timings"]
+    assert records[0]["section_locations"] == {}
+    assert llm_calls == []
+
+
+def test_zip_archives_are_expanded():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("docs/a.txt", "Intended Use")
+        archive.writestr("__MACOSX/docs/._a.txt", "junk")
+        archive.writestr("notes.exe", "binary")
+
+    assert batch.expand_zip(buffer.getvalue()) == [("docs/a.txt", b"Intended Use")]
+    with pytest.raises(ValueError, match="Archive expands to"):
+        batch.expand_zip(buffer.getvalue(), max_bytes=4)
+
+
+def test_batch_endpoint_streams_ndjson(llm_calls):
+    from fastapi.testclient import TestClient
+    import api_server
+
+    client = TestClient(api_server.app)
+    response = client.post(
+        "/api/analyze/batch",
+        files=[("files", ("a.txt", SAMPLE_SUBMISSION, "text/plain")),
+               ("files", ("b.txt", SAMPLE_SUBMISSION, "text/plain"))]
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["status"] for line in lines[:-1]] == ["succeeded", "succeeded"]
+    assert lines[-1]["summary"]["files"] == 2
+    assert len(llm_calls) == 1
+
+
+def test_batch_endpoint_limits_total_upload_size(llm_calls, monkeypatch):
+    from fastapi.testclient import TestClient
+    import api_server
+
+    monkeypatch.setattr(api_server, "BATCH_MAX_BYTES", len(SAMPLE_SUBMISSION) + 10)
+    client = TestClient(api_server.app)
+    response = client.post(
+        "/api/analyze/batch",
+        files=[("files", ("a.txt", SAMPLE_SUBMISSION, "text/plain")),
+               ("files", ("b.txt", SAMPLE_SUBMISSION, "text/plain"))]
+    )
+
+    assert response.status_code == 400
+    assert "Batch upload exceeds" in response.json()["detail"]
+    assert llm_calls == []
+
+
+def test_cli_writes_ndjson(tmp_path, capsys):
+    (tmp_path / "a.txt").write_bytes(SAMPLE_SUBMISSION)
+    (tmp_path / "skip.bin").write_bytes(b"ignored")
+    output = tmp_path / "results.ndjson"
+
+    batch.main([str(tmp_path), "--detect-only", "--output", str(output)])
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert lines[0]["filename"] == "a.txt"
+    assert "Intended Use" in lines[0]["present_sections"]
+    assert lines[-1]["summary"]["succeeded"] == 1
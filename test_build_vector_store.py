@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental vector store builds
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("faiss")
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agent.embedding_cache import precomputed_queries
+from agent.knowledge_base import KnowledgeBaseHandle, current_version, resolve_store_path
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts", "build_vector_store.py")
+spec = importlib.util.spec_from_file_location("build_vector_store", SCRIPT)
+build = importlib.util.module_from_spec(spec)
+# Registered so worker processes can unpickle chunk_file
+sys.modules["build_vector_store"] = build
+spec.loader.exec_module(build)
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    embedded: list = []
+
+    def embed_documents(self, texts):
+        self.embedded = self.embedded + list(texts)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    corpus_dir = tmp_path / "corpus"
+    corpus_dir.mkdir()
+    (corpus_dir / "guidance.txt").write_text("Analytical validity guidance. " * 60)
+    (corpus_dir / "clia.md").write_text("CLIA personnel requirements. " * 60)
+    return corpus_dir
+
+
+def sources(store_path, embeddings):
+    store = build.FAISS.load_local(resolve_store_path(str(store_path)), embeddings, allow_dangerous_deserialization=True)
+    return sorted({doc.metadata["filename"] for doc in store.docstore._dict.values()}), store
+
+
+def test_unchanged_corpus_embeds_nothing(corpus, tmp_path):
+    store_path = tmp_path / "store"
+    embeddings = CountingEmbedding(size=8)
+    build.build_vector_store(str(corpus), str(store_path), embeddings)
+    embeddings.embedded = []
+
+    stats = build.build_vector_store(str(corpus), str(store_path), embeddings)
+
+    assert stats["unchanged"] == 2
+    assert stats["chunks"] > 0
+    assert embeddings.embedded == []
+
+
+def test_only_new_files_are_embedded_and_deleted_files_removed(corpus, tmp_path):
+    store_path = tmp_path / "store"
+    embeddings = CountingEmbedding(size=8)
+    build.build_vector_store(str(corpus), str(store_path), embeddings)
+
+    (corpus / "clia.md").unlink()
+    (corpus / "new.txt").write_text("New FDA guidance on labeling. " * 10)
+    embeddings.embedded = []
+    stats = build.build_vector_store(str(corpus), str(store_path), embeddings)
+
+    assert (stats["added"], stats["removed"], stats["unchanged"]) == (1, 1, 1)
+    chunks_embedded = [text for text in embeddings.embedded if text not in precomputed_queries()]
+    assert chunks_embedded and all("labeling" in text for text in chunks_embedded)
+    names, store = sources(store_path, embeddings)
+    assert names == ["guidance.txt", "new.txt"]
+    assert store.index.ntotal == len(store.index_to_docstore_id) == stats["chunks"]
+
+
+def test_full_rebuild_reembeds_everything(corpus, tmp_path):
+    store_path = tmp_path / "store"
+    embeddings = CountingEmbedding(size=8)
+    first = build.build_vector_store(str(corpus), str(store_path), embeddings)
+    embeddings.embedded = []
+
+    stats = build.build_vector_store(str(corpus), str(store_path), embeddings, full=True)
+
+    assert stats["added"] == 2
+    assert stats["chunks"] == first["chunks"]
+    assert not [name for name in os.listdir(store_path) if name.startswith(".build-")]
+
+
+def test_parallel_batched_build_matches_serial_build(corpus, tmp_path):
+    for i in range(4):
+        (corpus / f"extra{i}.txt").write_text(f"Specimen handling section {i}. " * 80)
+    embeddings = CountingEmbedding(size=8)
+
+    serial = build.build_vector_store(str(corpus), str(tmp_path / "serial"), embeddings, workers=1)
+    parallel = build.build_vector_store(
+        str(corpus), str(tmp_path / "parallel"), embeddings, workers=2, batch_size=3, embed_threads=2
+    )
+
+    assert parallel["chunks"] == serial["chunks"] == parallel["embedded_chunks"]
+    assert parallel["chunks_per_second"] > 0
+    _, serial_store = sources(tmp_path / "serial", embeddings)
+    _, parallel_store = sources(tmp_path / "parallel", embeddings)
+    assert set(parallel_store.index_to_docstore_id.values()) == set(serial_store.index_to_docstore_id.values())
+    assert parallel_store.index.ntotal == parallel["chunks"]
+
+
+def test_pdf_chunks_record_page_numbers(corpus, tmp_path):
+    from io import BytesIO
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for text in ["21 CFR 493 Subpart H", "Proficiency testing enrollment"]:
+        pdf.drawString(72, 720, text)
+        pdf.showPage()
+    pdf.save()
+    (corpus / "clia.pdf").write_bytes(buffer.getvalue())
+
+    name, chunks, warning, _ = build.chunk_file(str(corpus / "clia.pdf"), "clia.pdf", "0" * 64)
+
+    assert warning is None
+    assert [chunk.metadata["page"] for chunk in chunks] == [1, 2]
+    assert [chunk.id for chunk in chunks] == ["clia.pdf:000000000000:0", "clia.pdf:000000000000:1"]
+
+
+def test_each_build_publishes_a_new_version(corpus, tmp_path):
+    store_path = tmp_path / "store"
+    embeddings = CountingEmbedding(size=8)
+
+    first = build.build_vector_store(str(corpus), str(store_path), embeddings)
+    (corpus / "new.txt").write_text("New FDA guidance on labeling. " * 10)
+    second = build.build_vector_store(str(corpus), str(store_path), embeddings)
+    unchanged = build.build_vector_store(str(corpus), str(store_path), embeddings)
+
+    assert (first["version"], second["version"]) == ("v1", "v2")
+    assert "version" not in unchanged
+    assert current_version(str(store_path)) == "v2"
+    assert sources(store_path, embeddings)[0] == ["clia.md", "guidance.txt", "new.txt"]
+
+
+def test_old_versions_are_pruned(corpus, tmp_path):
+    store_path = tmp_path / "store"
+    embeddings = CountingEmbedding(size=8)
+    for i in range(4):
+        (corpus / f"extra{i}.txt").write_text(f"Specimen handling section {i}. " * 10)
+        build.build_vector_store(str(corpus), str(store_path), embeddings, keep=2)
+
+    assert sorted(name for name in os.listdir(store_path) if name.startswith("v")) == ["v3", "v4"]
+    assert current_version(str(store_path)) == "v4"
+
+
+def test_reload_swaps_in_new_version_without_disturbing_held_store(corpus, tmp_path):
+    store_path = tmp_path / "store"
+    embeddings = CountingEmbedding(size=8)
+    build.build_vector_store(str(corpus), str(store_path), embeddings)
+    handle = KnowledgeBaseHandle(
+        loader=lambda path: build.FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True),
+        store_root=str(store_path)
+    )
+    in_flight = handle.get()
+    assert handle.info["version"] == "v1"
+    assert not handle.stale() and not handle.reload()
+
+    (corpus / "new.txt").write_text("New FDA guidance on labeling. " * 10)
+    build.build_vector_store(str(corpus), str(store_path), embeddings)
+
+    assert handle.stale()
+    assert handle.reload()
+    assert handle.info["version"] == "v2"
+    assert [source["name"] for source in handle.info["sources"]] == ["clia.md", "guidance.txt", "new.txt"]
+    assert handle.info["chunks"] == len(handle.get().index_to_docstore_id)
+    assert handle.info["built_at"]
+    # A search that already holds the old store still runs against it
+    assert in_flight is not handle.get()
+    assert in_flight.similarity_search("labeling", k=50)
+    assert all(doc.metadata["filename"] != "new.txt" for doc in in_flight.similarity_search("labeling", k=50))
+
+
+def test_failed_reload_keeps_serving_previous_version(corpus, tmp_path):
+    store_path = tmp_path / "store"
+    embeddings = CountingEmbedding(size=8)
+    build.build_vector_store(str(corpus), str(store_path), embeddings)
+    handle = KnowledgeBaseHandle(
+        loader=lambda path: build.FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True),
+        store_root=str(store_path)
+    )
+    store = handle.get()
+
+    (corpus / "new.txt").write_text("New FDA guidance on labeling. " * 10)
+    build.build_vector_store(str(corpus), str(store_path), embeddings)
+    os.remove(store_path / "v2" / "index.pkl")
+
+    with pytest.raises(Exception):
+        handle.reload()
+    assert handle.get() is store
+    assert handle.ready and handle.info["version"] == "v1"
+
+
+def test_status_and_reload_endpoints_report_served_version(corpus, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import api_server
+
+    store_path = tmp_path / "store"
+    embeddings = CountingEmbedding(size=8)
+    build.build_vector_store(str(corpus), str(store_path), embeddings)
+    handle = KnowledgeBaseHandle(
+        loader=lambda path: build.FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True),
+        store_root=str(store_path)
+    )
+    monkeypatch.setattr(api_server, "knowledge_base", handle)
+    client = TestClient(api_server.app)
+
+    assert client.post("/api/knowledge-base/reload").status_code == 409
+    handle.get()
+    (corpus / "new.txt").write_text("New FDA guidance on labeling. " * 10)
+    build.build_vector_store(str(corpus), str(store_path), embeddings)
+
+    status = client.get("/api/knowledge-base-status").json()
+    assert (status["version"], status["current_version"], status["reload_pending"]) == ("v1", "v2", True)
+    assert [item["name"] for item in status["items"]] == ["clia.md", "guidance.txt"]
+    assert {item["status"] for item in status["items"]} == {"RELOAD_PENDING"}
+
+    reloaded = client.post("/api/knowledge-base/reload").json()
+    assert reloaded["reloaded"] and reloaded["version"] == "v2"
+    assert reloaded["chunks"] == sum(item["chunks"] for item in reloaded["items"])
+    assert {item["status"] for item in reloaded["items"]} == {"CURRENT"}
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the query embedding cache
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agent.embedding_cache import (
+    CachedQueryEmbeddings, QueryEmbeddingCache, QUERY_EMBEDDINGS_FILE,
+    precompute_query_embeddings, precomputed_queries
+)
+from agent.gap_critic import REQUIRED_SECTIONS
+from agent.knowledge_base import batch_similarity_search
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    encoded: list = []
+
+    def embed_documents(self, texts):
+        self.encoded = self.encoded + list(texts)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.encoded = self.encoded + [text]
+        return super().embed_query(text)
+
+
+def test_lookup_is_case_and_whitespace_insensitive():
+    cache = QueryEmbeddingCache()
+    cache.put("Risk Assessment", [1.0, 2.0])
+
+    vector = cache.get("  risk   ASSESSMENT ")
+
+    assert vector.dtype == np.float32
+    assert vector.tolist() == [1.0, 2.0]
+
+
+def test_lru_evicts_oldest_but_keeps_pinned():
+    cache = QueryEmbeddingCache(max_entries=2)
+    cache.put("pinned", [0.0], pinned=True)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.get("a")
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("pinned") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_precomputed_file_round_trip(tmp_path):
+    written = precompute_query_embeddings(CountingEmbedding(size=8), str(tmp_path), model="fake")
+    assert written == len(precomputed_queries())
+
+    cache = QueryEmbeddingCache(model="fake")
+    assert cache.load(str(tmp_path / QUERY_EMBEDDINGS_FILE)) == written
+    assert cache.stats()["pinned_entries"] == written
+
+    # Vectors built with another model are ignored
+    assert QueryEmbeddingCache(model="other").load(str(tmp_path / QUERY_EMBEDDINGS_FILE)) == 0
+
+
+def test_precomputed_sections_never_run_the_encoder(tmp_path):
+    base = CountingEmbedding(size=8)
+    precompute_query_embeddings(base, str(tmp_path))
+    cache = QueryEmbeddingCache()
+    cache.load(str(tmp_path / QUERY_EMBEDDINGS_FILE))
+
+    docs = [Document(page_content=f"Guidance chunk {i}") for i in range(10)]
+    store = FAISS.from_documents(docs, CachedQueryEmbeddings(base, cache))
+    base.encoded = []
+
+    results = batch_similarity_search(store, list(REQUIRED_SECTIONS), k=2)
+    store.similarity_search("Intended Use", k=2)
+
+    assert results
+    assert base.encoded == []
+
+
+def test_cached_queries_encode_misses_once():
+    base = CountingEmbedding(size=8)
+    embeddings = CachedQueryEmbeddings(base)
+
+    first = embeddings.embed_queries(["alpha", "beta"])
+    second = embeddings.embed_queries(["beta", "gamma"])
+    embeddings.embed_query("alpha")
+
+    assert base.encoded == ["alpha", "beta", "gamma"]
+    assert np.array_equal(first[1], second[0])
+
+
+def test_runtime_entries_survive_restarts_without_being_pinned(tmp_path):
+    store_file = str(tmp_path / QUERY_EMBEDDINGS_FILE)
+    runtime_file = str(tmp_path / "runtime.npz")
+    precomputed = precompute_query_embeddings(CountingEmbedding(size=8), str(tmp_path), model="fake")
+    with open(store_file, "rb") as f:
+        built = f.read()
+
+    for run in range(3):
+        # What load_knowledge_base and save_query_embeddings do around each run
+        cache = QueryEmbeddingCache(max_entries=4, model="fake")
+        cache.load(store_file)
+        restored = cache.load(runtime_file, pinned=False)
+        assert restored == min(3 * run, 4)
+        for i in range(3):
+            cache.put(f"query {run}-{i}", [float(i)] * 8)
+
+        stats = cache.stats()
+        assert stats["pinned_entries"] == precomputed
+        assert stats["lru_entries"] <= 4
+        assert cache.save(runtime_file, pinned=False) == stats["lru_entries"]
+
+    # Most recent queries are kept; the built store's file is never rewritten
+    assert cache.get("query 2-2") is not None and cache.get("query 0-0") is None
+    with open(store_file, "rb") as f:
+        assert f.read() == built
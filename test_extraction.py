@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for page-by-page PDF extraction and detection-only scans
+"""
+from io import BytesIO
+
+import pytest
+from reportlab.pdfgen import canvas
+
+from agent import pdf_backends
+from agent.extraction import ExtractionBudget, detect_document, extract_document, iter_pdf_pages
+from agent.extraction_cache import ExtractionCache
+from agent.gap_critic import analyze_completeness, detect_sections, section_registry
+from agent.llm_cache import LLMCache
+
+
+def make_pdf(pages):
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for text in pages:
+        pdf.drawString(72, 720, text)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def test_pages_are_yielded_in_order():
+    pdf = make_pdf(["Cover", "Intended Use", "Risk Assessment"])
+
+    pages = list(iter_pdf_pages(pdf))
+
+    assert [page_no for page_no, _ in pages] == [1, 2, 3]
+    assert "Risk Assessment" in pages[2][1]
+
+
+def test_page_budget_stops_extraction():
+    pdf = make_pdf([f"Page {i}" for i in range(5)])
+    budget = ExtractionBudget(max_pages=2)
+
+    pages = list(iter_pdf_pages(pdf, budget))
+
+    assert len(pages) == 2
+    assert "page limit of 2" in budget.exceeded
+
+
+def test_time_budget_stops_extraction():
+    pdf = make_pdf([f"Page {i}" for i in range(3)])
+    budget = ExtractionBudget(max_seconds=-1)
+
+    assert list(iter_pdf_pages(pdf, budget)) == []
+    assert "time limit" in budget.exceeded
+
+
+def test_truncated_document_is_flagged():
+    pdf = make_pdf(["Intended Use", "Quality System", "Risk Assessment"])
+
+    document = extract_document(pdf, "submission.pdf", ExtractionBudget(max_pages=2))
+
+    assert len(document.page_starts) == 2
+    assert "Risk Assessment" not in document.text
+    assert document.truncated
+
+
+def test_detection_stops_once_every_section_is_found():
+    every_section = " ".join(list(section_registry.required) + list(section_registry.recommended))
+    pages_read = []
+
+    def pages():
+        for page_no, text in enumerate(["Cover", every_section, "Appendix", "Appendix"], 1):
+            pages_read.append(page_no)
+            yield page_no, text
+
+    result = detect_sections(pages())
+
+    assert result["stopped_early"]
+    assert result["pages_scanned"] == 2
+    assert pages_read == [1, 2]
+    assert result["missing_required"] == {}
+    assert result["found_sections"]["Intended Use"] == 2
+
+
+def test_detection_reports_missing_sections_without_early_exit():
+    result = detect_sections(iter_pdf_pages(make_pdf(["Intended Use", "FMEA worksheet"])))
+
+    assert not result["stopped_early"]
+    assert result["pages_scanned"] == 2
+    assert result["found_sections"] == {"Intended Use": 1, "Risk Assessment": 2}
+    assert "Quality System" in result["missing_required"]
+
+
+def test_detect_document_stops_reading_a_complete_pdf(tmp_path):
+    every_section = " ".join(list(section_registry.required) + list(section_registry.recommended))
+    pdf = make_pdf(["Cover", every_section, "Appendix", "Appendix"])
+    cache = ExtractionCache(LLMCache(path=str(tmp_path / "extractions.sqlite3")))
+
+    result = detect_document(pdf, "submission.pdf", cache=cache)
+
+    assert result["stopped_early"]
+    assert result["pages_scanned"] == 2
+    assert result["completeness_score"] == 100.0
+    assert result["truncated"] is None
+
+
+def test_detect_document_matches_full_analysis(tmp_path):
+    cache = ExtractionCache(LLMCache(path=str(tmp_path / "extractions.sqlite3")))
+    pdf = make_pdf(["Intended Use", "FMEA worksheet"])
+    text = b"Intended use: serum. Precision CV 5%. Labeling per 21 CFR 809."
+
+    for content, filename in ((pdf, "submission.pdf"), (text, "submission.txt")):
+        expected = analyze_completeness(extract_document(content, filename, cache=cache).text)
+        for _ in range(2):  # extracted, then from the cached document
+            result = detect_document(content, filename, cache=cache)
+            assert {k: result[k] for k in expected if k != "section_locations"} == \
+                {k: v for k, v in expected.items() if k != "section_locations"}
+
+
+def test_detect_document_rejects_unreadable_files():
+    cache = ExtractionCache(LLMCache(enabled=False))
+
+    with pytest.raises(ValueError, match="Error extracting text"):
+        detect_document(b"not a pdf", "broken.pdf", cache=cache)
+
+
+@pytest.mark.parametrize("backend", pdf_backends.available_backends())
+def test_every_installed_backend_extracts_pages(backend):
+    pdf = make_pdf(["Intended Use", "Quality System"])
+
+    pages = list(iter_pdf_pages(pdf, backend=backend))
+
+    assert len(pages) == 2
+    assert "Quality System" in pages[1][1]
+
+
+def test_backend_selected_by_environment(monkeypatch):
+    monkeypatch.setenv("PDF_BACKEND", "pypdf2")
+
+    name, _, _ = pdf_backends.open_pdf(make_pdf(["Cover"]))
+
+    assert name == "pypdf2"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown PDF backend"):
+        pdf_backends.resolve_backends("acrobat")
+
+
+def test_missing_backend_falls_back(monkeypatch):
+    monkeypatch.setattr(pdf_backends.BACKENDS["pypdfium2"], "module", "not_installed_pdf_module")
+
+    name, _, _ = pdf_backends.open_pdf(make_pdf(["Cover"]), backend="pypdfium2")
+
+    assert name != "pypdfium2"
+
+
+@pytest.mark.skipif(len(pdf_backends.available_backends()) < 2, reason="needs a second PDF backend")
+def test_backend_that_cannot_open_document_falls_back(monkeypatch):
+    def broken_open(source, skip=()):
+        raise RuntimeError("cannot parse")
+
+    preferred = pdf_backends.available_backends()[0]
+    monkeypatch.setattr(pdf_backends.BACKENDS[preferred], "open", broken_open)
+
+    pages = list(iter_pdf_pages(make_pdf(["Risk Assessment"])))
+
+    assert "Risk Assessment" in pages[0][1]
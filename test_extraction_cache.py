@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed extraction and gap analysis cache
+"""
+from io import BytesIO
+
+import pytest
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DictionaryObject, NameObject, NumberObject
+from reportlab.pdfgen import canvas
+
+from agent import pdf_backends, run
+from agent.extraction import extract_document
+from agent.extraction_cache import ExtractionCache, content_digest
+from agent.gap_critic import section_registry
+from agent.llm_cache import LLMCache
+from agent.pdf_backends import page_fingerprints
+
+
+def make_pdf(pages):
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for text in pages:
+        pdf.drawString(72, 720, text)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def with_encoding(pdf, glyph):
+    """pdf with its font's /Encoding replaced by an indirect object mapping code 65 to glyph"""
+    writer = PdfWriter()
+    writer.append_pages_from_reader(PdfReader(BytesIO(pdf)))
+    font = writer.pages[0]["/Resources"]["/Font"]["/F1"]
+    font[NameObject("/Encoding")] = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Encoding"),
+        NameObject("/Differences"): ArrayObject([NumberObject(65), NameObject(glyph)]),
+    }))
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(LLMCache(path=str(tmp_path / "extractions.sqlite3")))
+
+
+@pytest.fixture
+def extracted_pages(monkeypatch):
+    """Record the page indexes each backend call actually extracts"""
+    extracted = []
+    backend = pdf_backends.BACKENDS[pdf_backends.available_backends()[0]]
+    original_open = backend.open
+
+    def recording_open(source, skip=()):
+        page_count, pages = original_open(source, skip)
+        wanted = [index for index in range(page_count or 0) if index not in skip]
+        extracted.append(wanted)
+        return page_count, pages
+
+    monkeypatch.setattr(backend, "open", recording_open)
+    return extracted
+
+
+def test_identical_upload_skips_parsing(cache, extracted_pages):
+    pdf = make_pdf(["Intended Use", "Quality System"])
+
+    first = extract_document(pdf, "submission.pdf", cache=cache)
+    second = extract_document(pdf, "copy-of-submission.pdf", cache=cache)
+
+    assert len(extracted_pages) == 1
+    assert second.text == first.text
+    assert second.page_starts == first.page_starts
+
+
+def test_edited_pdf_reextracts_only_changed_pages(cache, extracted_pages):
+    original = make_pdf(["Intended Use", "Quality System", "Risk Assessment"])
+    edited = make_pdf(["Intended Use", "Quality System (revised)", "Risk Assessment"])
+
+    extract_document(original, "submission.pdf", cache=cache)
+    document = extract_document(edited, "submission.pdf", cache=cache)
+
+    assert extracted_pages == [[0, 1, 2], [1]]
+    assert "Quality System (revised)" in document.text
+    assert "Risk Assessment" in document.text
+    assert len(document.page_starts) == 3
+
+
+def test_pages_read_by_a_fallback_backend_are_reused(monkeypatch, cache):
+    preferred, fallback = (pdf_backends.BACKENDS[name] for name in pdf_backends.available_backends()[:2])
+    extracted = []
+    original_open = fallback.open
+
+    def failing_open(source, skip=()):
+        raise ValueError("cannot parse")
+
+    def recording_open(source, skip=()):
+        page_count, pages = original_open(source, skip)
+        pages = list(pages)
+        extracted.append(len(pages))
+        return page_count, iter(pages)
+
+    monkeypatch.setattr(preferred, "open", failing_open)
+    monkeypatch.setattr(fallback, "open", recording_open)
+    original = make_pdf(["Intended Use", "Quality System", "Risk Assessment"])
+    edited = make_pdf(["Intended Use", "Quality System (revised)", "Risk Assessment"])
+
+    extract_document(original, "submission.pdf", cache=cache)
+    document = extract_document(edited, "submission.pdf", cache=cache)
+
+    assert extracted == [3, 1]
+    assert "Quality System (revised)" in document.text
+
+
+def test_page_fingerprints_hash_indirect_font_objects_by_content():
+    pdf = make_pdf(["Intended Use"])
+    fingerprints = page_fingerprints(with_encoding(pdf, "/A"))
+
+    # /Encoding has the same object number in every variant
+    assert page_fingerprints(with_encoding(pdf, "/A")) == fingerprints
+    assert page_fingerprints(with_encoding(pdf, "/B")) != fingerprints
+
+
+def test_text_uploads_are_cached_by_content(cache):
+    extract_document(b"Intended Use", "a.txt", cache=cache)
+
+    assert cache.stats()["writes"] == 1
+    assert extract_document(b"Intended Use", "b.txt", cache=cache).text == "Intended Use"
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = ExtractionCache(LLMCache(path=str(tmp_path / "extractions.sqlite3"), enabled=False))
+
+    extract_document(make_pdf(["Cover"]), "submission.pdf", cache=cache)
+
+    assert cache.stats()["writes"] == 0
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "extractions.sqlite3")
+    extract_document(b"Risk Assessment", "a.txt", cache=ExtractionCache(LLMCache(path=path)))
+
+    cache = ExtractionCache(LLMCache(path=path))
+    assert cache.get_document(content_digest(b"Risk Assessment"), "text", "") is not None
+
+
+def test_gap_analysis_is_cached_per_upload_and_rules(monkeypatch, cache):
+    monkeypatch.setattr(run, "extraction_cache", cache)
+    digest = content_digest(b"Intended Use")
+    calls = []
+    monkeypatch.setattr(run, "analyze_completeness", lambda text, page_starts: calls.append(text) or {"score": 1})
+
+    run.analysis_pipeline.analyze("Intended Use", [], digest)
+    assert run.analysis_pipeline.analyze("Intended Use", [], digest) == {"score": 1}
+    assert calls == ["Intended Use"]
+
+    assert cache.get_analysis(digest, "other-rules") is None
+    assert cache.get_analysis(digest, section_registry.version) == {"score": 1}
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for single-pass section detection in gap_critic
+"""
+import importlib.util
+import json
+import os
+import random
+
+import pytest
+
+from agent.extraction import extract_document
+from agent.gap_critic import (
+    SectionRegistry, SectionRule, analyze_completeness, find_section_hits, load_section_rules, section_registry
+)
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts", "benchmark_gap_critic.py")
+spec = importlib.util.spec_from_file_location("benchmark_gap_critic", SCRIPT)
+benchmark = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(benchmark)
+
+
+def test_hits_report_offsets_into_original_text():
+    text = "Section 1: INTENDED USE\nThe Risk-Assessment follows."
+
+    hits = {(hit.section, hit.pattern): (hit.start, hit.end) for hit in find_section_hits(text)}
+
+    assert hits[("Intended Use", "intended use")] == (11, 23)
+    start, end = hits[("Risk Assessment", "risk-assessment")]
+    assert text[start:end] == "Risk-Assessment"
+
+
+def test_overlapping_phrases_are_all_reported():
+    hits = find_section_hits("clinical validation")
+
+    assert {(hit.section, hit.pattern) for hit in hits} == {
+        ("Clinical Validity", "clinical validation"),
+        ("Analytical Validity", "validation"),
+    }
+
+
+def test_offsets_stay_aligned_when_lowercasing_changes_length():
+    text = "İİ Quality System"
+
+    hit = next(hit for hit in find_section_hits(text) if hit.section == "Quality System")
+
+    assert text[hit.start:hit.end] == "Quality System"
+
+
+def test_matches_legacy_substring_scans():
+    phrases = [phrase for section, patterns in benchmark.LEGACY_ALTERNATIVES.items() for phrase in patterns]
+    phrases += [section.lower() for section in benchmark.LEGACY_RECOMMENDED_SECTIONS]
+    rng = random.Random(7)
+    for _ in range(200):
+        words = [rng.choice(benchmark.FILLER_WORDS) for _ in range(40)]
+        for phrase in rng.sample(phrases, rng.randrange(6)):
+            words.insert(rng.randrange(len(words)), phrase.upper() if rng.random() < 0.3 else phrase)
+        text = " ".join(words)
+
+        current = benchmark.legacy_sections_only(benchmark.current_analyze(text))
+        assert current == benchmark.legacy_analyze(text)
+
+
+def test_presence_check_agrees_with_full_scan():
+    matcher = section_registry.matcher
+    phrases = list(matcher.sections_by_pattern) + ["42 CFR 493.817", "42cfr493.801", "İntended use"]
+    rng = random.Random(11)
+    for _ in range(300):
+        words = [rng.choice(benchmark.FILLER_WORDS) for _ in range(40)]
+        for phrase in rng.sample(phrases, rng.randrange(12)):
+            words.insert(rng.randrange(len(words)), phrase.upper() if rng.random() < 0.3 else phrase)
+        text = " ".join(words)
+
+        found = {hit.section for hit in matcher.find_all(text)}
+        assert matcher.found_sections(text) == found
+        assert matcher.found_sections(text, skip=["Intended Use"]) == found - {"Intended Use"}
+
+        located = analyze_completeness(text)
+        located["section_locations"] = {}
+        assert analyze_completeness(text, locate=False) == located
+
+
+def test_analyze_completeness_result_shape():
+    analysis = analyze_completeness("Intended use: serum. Precision CV 5%. Labeling per 21 CFR 809.")
+
+    assert analysis["present_sections"] == ["Intended Use", "Analytical Validity"]
+    assert analysis["missing_count"] == 3
+    assert analysis["completeness_score"] == 40.0
+    assert "Labeling" not in analysis["missing_recommended"]
+    assert "Reference Standards" in analysis["missing_recommended"]
+
+
+def test_section_locations_include_pages_and_snippets():
+    pages = ["Cover page for the submission.\n", "Risk assessment follows the FMEA template.\n"]
+    text = "".join(pages)
+
+    analysis = analyze_completeness(text, page_starts=[0, len(pages[0])])
+
+    location = analysis["section_locations"]["Risk Assessment"][0]
+    assert location["page"] == 2
+    assert text[location["start"]:location["end"]] == "Risk assessment"
+    assert "FMEA template" in location["snippet"]
+    assert analysis["section_locations"]["Risk Assessment"][1]["match"] == "FMEA"
+
+
+def test_pdf_extraction_records_page_starts():
+    from io import BytesIO
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    pdf.drawString(72, 720, "Cover page")
+    pdf.showPage()
+    pdf.drawString(72, 720, "Quality System per ISO 13485")
+    pdf.save()
+
+    document = extract_document(buffer.getvalue(), "submission.pdf")
+    analysis = analyze_completeness(document.text, document.page_starts)
+
+    assert len(document.page_starts) == 2
+    assert analysis["section_locations"]["Quality System"][0]["page"] == 2
+
+
+def test_rule_added_in_json_needs_no_code_change(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps({"sections": [
+        {"name": "Intended Use", "tier": "required", "description": "population", "weight": 3},
+        {"name": "Proficiency Testing", "tier": "required", "description": "PT enrollment",
+         "synonyms": ["PT program"], "patterns": [r"\b42\s*cfr\s*493\.8\d\d\b"]},
+        {"name": "Biosafety", "tier": "recommended", "description": "BSL procedures"}
+    ]}))
+    registry = SectionRegistry(load_section_rules(str(rules_file)))
+
+    analysis = analyze_completeness("Intended use is screening. Enrolled per 42 CFR 493.801.", registry=registry)
+    assert analysis["present_sections"] == ["Intended Use", "Proficiency Testing"]
+    assert analysis["missing_recommended"] == {"Biosafety": "BSL procedures"}
+    assert analysis["section_locations"]["Proficiency Testing"][0]["match"] == "42 CFR 493.801"
+
+    # Weighted score: Intended Use (3) present, Proficiency Testing (1) missing
+    analysis = analyze_completeness("Intended use is screening.", registry=registry)
+    assert analysis["completeness_score"] == 75.0
+
+
+def test_recommended_sections_match_name_variants():
+    analysis = analyze_completeness("See the specimen_requirements and Method-Description appendices.")
+
+    assert "Specimen Requirements" not in analysis["missing_recommended"]
+    assert "Method Description" not in analysis["missing_recommended"]
+
+
+def test_invalid_rules_are_rejected(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps({"sections": [{"name": "Bad", "tier": "optional"}]}))
+    with pytest.raises(ValueError, match="unknown tier"):
+        load_section_rules(str(rules_file))
+
+    rules_file.write_text(json.dumps({"sections": [{"name": "Bad", "patterns": ["(unclosed"]}]}))
+    with pytest.raises(ValueError, match="invalid pattern"):
+        load_section_rules(str(rules_file))
+
+
+def test_rule_phrases_include_variants():
+    rule = SectionRule(name="Risk Assessment", tier="required", description="", synonyms=["FMEA"])
+
+    assert rule.phrases() == ["risk assessment", "risk_assessment", "risk-assessment", "fmea"]
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite-backed background job queue
+"""
+import time
+import asyncio
+import threading
+
+from agent.jobs import JobStore, JobWorkerPool, QUEUED, RUNNING, SUCCEEDED, FAILED
+
+
+def test_jobs_are_claimed_oldest_first(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    first = store.create("a.txt", b"a")
+    store.create("b.txt", b"b")
+
+    job, payload = store.claim_next()
+
+    assert job.id == first.id
+    assert payload == b"a"
+    assert store.get(first.id).status == RUNNING
+
+
+def test_finished_job_keeps_result_and_drops_payload(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job = store.create("a.txt", b"a")
+    store.claim_next()
+
+    store.finish(job.id, SUCCEEDED, result={"score": 80.0}, timings={"extract": 0.1})
+
+    finished = store.get(job.id)
+    assert finished.status == SUCCEEDED
+    assert finished.result == {"score": 80.0}
+    assert finished.timings == {"extract": 0.1}
+    assert store.claim_next() is None
+
+
+def test_interrupted_jobs_are_requeued_once_their_lease_expires(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    job = JobStore(path).create("a.txt", b"a")
+    JobStore(path, lease_seconds=0.05).claim_next()
+
+    store = JobStore(path)
+    assert store.requeue_expired() == 0
+    assert store.claim_next() is None
+    time.sleep(0.1)
+
+    assert store.requeue_expired() == 1
+    assert store.get(job.id).status == QUEUED
+    assert store.claim_next()[1] == b"a"
+
+
+def test_expired_lease_is_taken_over_and_old_owner_cannot_finish(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    stale = JobStore(path, lease_seconds=0.05)
+    job = stale.create("a.txt", b"a")
+    stale.claim_next()
+    time.sleep(0.1)
+
+    current = JobStore(path)
+    claimed, payload = current.claim_next()
+    assert claimed.id == job.id and payload == b"a"
+
+    assert not stale.renew_lease(job.id)
+    assert not stale.finish(job.id, FAILED, error={"detail": "stale"})
+    assert current.finish(job.id, SUCCEEDED, result={"score": 80.0})
+    assert current.get(job.id).status == SUCCEEDED
+    assert current.get(job.id).error is None
+
+
+def test_concurrent_stores_never_claim_the_same_job(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    jobs = [JobStore(path).create(f"{i}.txt", b"x") for i in range(40)]
+    claimed = []
+    start = threading.Barrier(4)
+
+    def claim_all():
+        store = JobStore(path)
+        start.wait()
+        while (next_job := store.claim_next()) is not None:
+            claimed.append(next_job[0].id)
+
+    threads = [threading.Thread(target=claim_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(job.id for job in jobs)
+
+
+def test_workers_renew_the_lease_of_long_jobs(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path, lease_seconds=0.1)
+    other = JobStore(path)
+    takeovers = []
+
+    async def handler(job, filename, payload):
+        for _ in range(4):
+            await asyncio.sleep(0.1)
+            takeovers.append(await asyncio.to_thread(other.claim_next))
+        return {"filename": filename}
+
+    async def scenario():
+        pool = JobWorkerPool(store, handler, workers=1)
+        job = await pool.submit("a.txt", b"x")
+        while store.get(job.id).status in (QUEUED, RUNNING):
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert takeovers == [None] * 4
+    assert store.get(job.id).status == SUCCEEDED
+
+
+def test_stopping_the_pool_requeues_running_jobs():
+    store = JobStore()
+
+    async def handler(job, filename, payload):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        pool = JobWorkerPool(store, handler, workers=1)
+        job = await pool.submit("a.txt", b"x")
+        while store.get(job.id).status != RUNNING:
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert store.get(job.id).status == QUEUED
+    assert store.claim_next()[1] == b"x"
+
+
+def test_workers_run_jobs_with_bounded_concurrency():
+    store = JobStore()
+    running = []
+    peak = []
+
+    async def handler(job, filename, payload):
+        running.append(filename)
+        peak.append(len(running))
+        await job.update(stage="working", partial={"seen": filename})
+        await asyncio.sleep(0.01)
+        running.remove(filename)
+        return {"filename": filename}
+
+    async def scenario():
+        pool = JobWorkerPool(store, handler, workers=2)
+        jobs = [await pool.submit(f"{i}.txt", b"x") for i in range(5)]
+        while any(store.get(job.id).status in (QUEUED, RUNNING) for job in jobs):
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        return jobs
+
+    jobs = asyncio.run(scenario())
+
+    assert max(peak) == 2
+    for job in jobs:
+        finished = store.get(job.id)
+        assert finished.status == SUCCEEDED
+        assert finished.result == {"filename": job.filename}
+        assert finished.partial == {"seen": job.filename}
+        assert "queued" in finished.timings
+
+
+def test_failed_job_records_mapped_error():
+    store = JobStore()
+
+    async def handler(job, filename, payload):
+        raise ValueError("unreadable")
+
+    async def scenario():
+        pool = JobWorkerPool(store, handler, workers=1,
+                             error_mapper=lambda e: {"status_code": 400, "detail": str(e)})
+        job = await pool.submit("a.pdf", b"x")
+        while store.get(job.id).status != FAILED:
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert store.get(job.id).error == {"status_code": 400, "detail": "unreadable"}
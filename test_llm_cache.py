@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the two-tier LLM response cache
+"""
+import os
+import time
+import select
+import signal
+
+import pytest
+
+from agent.llm_cache import LLMCache, make_cache_key
+
+
+def test_key_depends_on_model_prompt_and_params():
+    base = make_cache_key("model-a", "prompt", temperature=0.6, max_tokens=1024)
+
+    assert base == make_cache_key("model-a", "prompt", max_tokens=1024, temperature=0.6)
+    assert base != make_cache_key("model-b", "prompt", temperature=0.6, max_tokens=1024)
+    assert base != make_cache_key("model-a", "other", temperature=0.6, max_tokens=1024)
+    assert base != make_cache_key("model-a", "prompt", temperature=0.2, max_tokens=1024)
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    LLMCache(path=path).set("key", "answer")
+
+    cache = LLMCache(path=path)
+    assert cache.get("key") == "answer"
+    assert cache.stats()['disk_hits'] == 1
+    assert cache.get("key") == "answer"
+    assert cache.stats()['memory_hits'] == 1
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = LLMCache(max_memory_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), ttl_seconds=0.05)
+    cache.set("key", "answer")
+    time.sleep(0.1)
+
+    assert cache.get("key") is None
+    assert cache.stats()['expired'] >= 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), max_disk_bytes=25, max_memory_entries=0)
+    cache.set("old", "x" * 10)
+    time.sleep(0.01)
+    cache.set("mid", "y" * 10)
+    time.sleep(0.01)
+    cache.get("old")
+    cache.set("new", "z" * 10)
+
+    assert cache.get("mid") is None
+    assert cache.get("old") == "x" * 10
+    assert cache.stats()['evictions'] == 1
+
+
+def test_disabled_cache_is_bypassed(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), enabled=False)
+    cache.set("key", "answer")
+
+    assert cache.get("key") is None
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork start method only")
+def test_forked_child_opens_its_own_connection_and_lock(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), max_memory_entries=0)
+    cache.set("parent", "a")
+    parent_conn = cache._conn
+    read_fd, write_fd = os.pipe()
+
+    with cache._lock:  # held by this thread while the child is forked
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                fresh = cache._conn is None and cache.get("parent") == "a" and cache._conn is not parent_conn
+                cache.set("child", "b")
+                os.write(write_fd, b"ok" if fresh else b"shared")
+            finally:
+                os._exit(0)
+    os.close(write_fd)
+
+    ready, _, _ = select.select([read_fd], [], [], 10)
+    result = os.read(read_fd, 16) if ready else b"deadlocked"
+    os.close(read_fd)
+    if not ready:
+        os.kill(pid, signal.SIGKILL)
+    os.waitpid(pid, 0)
+    assert result == b"ok"
+    assert cache.get("child") == "b"
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled Nemotron client against the local stub server
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+
+from nemotron_stub_server import start_stub_server, STUB_ANSWER
+from agent import nemotron_llm
+from agent.llm_cache import LLMCache
+
+
+@pytest.fixture
+def stub_endpoint(monkeypatch):
+    server, base_url = start_stub_server()
+    monkeypatch.setenv("NVIDIA_API_KEY", "stub")
+    monkeypatch.setattr(nemotron_llm, "NVIDIA_BASE_URL", base_url)
+    monkeypatch.setattr(nemotron_llm, "llm_cache", LLMCache(enabled=False))
+    nemotron_llm.reset_latency_metrics()
+    yield base_url
+    nemotron_llm.close_clients()
+    server.shutdown()
+
+
+def test_sync_client_is_reused(stub_endpoint):
+    assert nemotron_llm.nemotron("ping") == STUB_ANSWER
+    assert nemotron_llm.nemotron("ping") == STUB_ANSWER
+
+    assert nemotron_llm.get_client() is nemotron_llm.get_client()
+    calls = nemotron_llm.get_recent_call_metrics()
+    assert len(calls) == 2
+    assert calls[0]['reused_connection'] is False
+    assert calls[1]['reused_connection'] is True
+    assert calls[1]['connect_ms'] == 0.0
+
+
+def test_async_client_is_reused(stub_endpoint):
+    async def two_calls():
+        first = await nemotron_llm.nemotron_async("ping")
+        second = await nemotron_llm.nemotron_async("ping")
+        same_client = nemotron_llm.get_async_client() is nemotron_llm.get_async_client()
+        await nemotron_llm.aclose_clients()
+        return first, second, same_client
+
+    first, second, same_client = asyncio.run(two_calls())
+
+    assert first == second == STUB_ANSWER
+    assert same_client
+    assert nemotron_llm.get_latency_metrics()['connection_reuse_rate'] == 0.5
+
+
+def test_stream_yields_tokens(stub_endpoint):
+    tokens = list(nemotron_llm.nemotron_stream("ping"))
+
+    assert len(tokens) > 1
+    assert "".join(tokens) == STUB_ANSWER
+    calls = nemotron_llm.get_recent_call_metrics()
+    assert calls[-1]['mode'] == "stream"
+    assert calls[-1]['first_token_ms'] is not None
+
+
+def test_async_stream_yields_tokens(stub_endpoint):
+    async def collect():
+        tokens = [token async for token in nemotron_llm.nemotron_stream_async("ping")]
+        await nemotron_llm.aclose_clients()
+        return tokens
+
+    assert "".join(asyncio.run(collect())) == STUB_ANSWER
+
+
+def test_cached_response_skips_request(stub_endpoint, tmp_path, monkeypatch):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(nemotron_llm, "llm_cache", cache)
+
+    assert nemotron_llm.nemotron("ping") == STUB_ANSWER
+    assert nemotron_llm.nemotron("ping") == STUB_ANSWER
+    assert "".join(nemotron_llm.nemotron_stream("ping")) == STUB_ANSWER
+    assert nemotron_llm.nemotron("ping", use_cache=False) == STUB_ANSWER
+
+    assert len(nemotron_llm.get_recent_call_metrics()) == 2
+    stats = cache.stats()
+    assert stats['memory_hits'] == 2
+    assert stats['misses'] == 1
+
+
+def test_async_cached_response_skips_request(stub_endpoint, tmp_path, monkeypatch):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), max_memory_entries=0)
+    monkeypatch.setattr(nemotron_llm, "llm_cache", cache)
+
+    async def calls():
+        first = await nemotron_llm.nemotron_async("ping")
+        second = await nemotron_llm.nemotron_async("ping")
+        streamed = "".join([token async for token in nemotron_llm.nemotron_stream_async("ping")])
+        await nemotron_llm.aclose_clients()
+        return first, second, streamed
+
+    assert asyncio.run(calls()) == (STUB_ANSWER, STUB_ANSWER, STUB_ANSWER)
+    assert len(nemotron_llm.get_recent_call_metrics()) == 1
+    assert cache.stats()['disk_hits'] == 2
+
+
+def test_cache_key_depends_on_endpoint(monkeypatch):
+    key = nemotron_llm._cache_key("ping", 16, 0.6)
+
+    monkeypatch.setattr(nemotron_llm, "NVIDIA_BASE_URL", "http://127.0.0.1:8999/v1")
+
+    assert nemotron_llm._cache_key("ping", 16, 0.6) != key
+
+
+def test_missing_api_key_raises(monkeypatch):
+    monkeypatch.delenv("NVIDIA_API_KEY", raising=False)
+    with pytest.raises(ValueError):
+        nemotron_llm.nemotron("ping")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
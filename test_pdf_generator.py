@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for compliance PDF report generation
+"""
+import random
+import re
+
+import markdown
+import pytest
+from PyPDF2 import PdfReader
+
+from utils.pdf_generator import (
+    REPORT_STYLES, THIRD_PERSON_REPLACEMENTS, clean_markdown_for_pdf, convert_to_third_person_analysis,
+    generate_compliance_pdf, generate_professional_regulatory_analysis, normalize_summary_text,
+    score_interpretation, write_compliance_pdf
+)
+
+
+def report(score, **overrides):
+    return {
+        "filename": "submission.pdf",
+        "score": score,
+        "missing_sections": {"Risk Assessment": "Risk management file per ISO 14971"},
+        "present_sections": ["Intended Use"],
+        "section_locations": {"Intended Use": [{"page": 2, "snippet": "intended for <detection>"}]},
+        "ai_analysis": "**Risk Assessment** is missing.\n\nYou should add an FMEA.",
+        **overrides
+    }
+
+
+@pytest.mark.parametrize("score, interpretation", [
+    (95, "Excellent - Ready for submission"),
+    (70, "Good - Minor improvements needed"),
+    (40, "Moderate - Significant gaps identified"),
+    (0, "Critical - Immediate action required"),
+])
+def test_report_shows_score_interpretation(score, interpretation):
+    text = "".join(page.extract_text() for page in PdfReader(generate_compliance_pdf(report(score))).pages)
+
+    assert f"{score}%" in text
+    assert interpretation in text
+    assert "the laboratory should add an FMEA" in text
+
+
+def test_shared_styles_are_not_modified_by_rendering():
+    before = {name: dict(style.__dict__) for name, style in REPORT_STYLES.interpretation.items()}
+    commands = list(REPORT_STYLES.gap_table.getCommands())
+
+    for score in (95, 50, 10):
+        generate_compliance_pdf(report(score))
+
+    assert {name: dict(style.__dict__) for name, style in REPORT_STYLES.interpretation.items()} == before
+    assert REPORT_STYLES.gap_table.getCommands() == commands
+    assert score_interpretation(69.9)[1] == score_interpretation(40)[1]
+
+
+def test_write_compliance_pdf_returns_a_file_path(tmp_path):
+    path = write_compliance_pdf(report(80), directory=str(tmp_path))
+
+    with open(path, 'rb') as f:
+        assert f.read(5) == b"%PDF-"
+    assert len(PdfReader(path).pages) >= 1
+
+
+def test_generate_pdf_endpoint_streams_file_with_length_and_removes_it(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import api_server
+    from agent.artifact_cache import ArtifactCache
+    from utils import pdf_generator
+
+    monkeypatch.setattr(api_server, "run_in_process",
+                        lambda fn, *args: _resolved(fn(*args)))
+    monkeypatch.setattr(api_server, "artifact_cache", ArtifactCache(str(tmp_path / "artifacts"), enabled=False))
+    monkeypatch.setattr(pdf_generator.tempfile, "tempdir", str(tmp_path))
+    payload = {**report(80), "executive_summary": "", "report_markdown": ""}
+
+    response = TestClient(api_server.app).post("/api/generate-pdf", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-disposition"] == "attachment; filename=LDT_Compliance_Report_submission.pdf"
+    assert int(response.headers["content-length"]) == len(response.content)
+    assert response.content.startswith(b"%PDF-")
+    assert list(tmp_path.iterdir()) == []
+
+
+async def _resolved(value):
+    return value
+
+
+# The text normalization as it was before it was precompiled: one re.sub
+# per step, in order. The single-pass versions must match it exactly.
+def reference_clean_markdown(text):
+    clean_text = re.sub(r'<[^>]+>', '', markdown.markdown(text))
+    clean_text = re.sub(r'\*\*(.*?)\*\*', r'\1', clean_text)
+    clean_text = re.sub(r'\*(.*?)\*', r'\1', clean_text)
+    clean_text = re.sub(r'`(.*?)`', r'\1', clean_text)
+    clean_text = re.sub(r'#{1,6}\s+', '', clean_text)
+    clean_text = re.sub(r'\n\s*\n', '\n\n', clean_text)
+    clean_text = re.sub(r'---+', '', clean_text)
+    return clean_text.strip()
+
+
+def reference_third_person(text):
+    clean_text = reference_clean_markdown(text)
+    if "Okay, let's tackle this query" in clean_text or "The user is asking" in clean_text:
+        return generate_professional_regulatory_analysis(clean_text)
+    for pattern, replacement in THIRD_PERSON_REPLACEMENTS:
+        clean_text = re.sub(pattern, replacement, clean_text, flags=re.IGNORECASE)
+    return clean_text
+
+
+def reference_summary(text):
+    text = re.sub(r'[^\w\s\.\,\!\?\;\:\(\)\-\%]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r'^\s+|\s+$', '', text, flags=re.MULTILINE)
+    return text.replace('\t', ' ').strip()
+
+
+@pytest.mark.parametrize("analysis, expected", [
+    ("I recommend that you update your SOPs.", "The analysis recommend that the laboratory update the laboratory's SOPs."),
+    ("We reviewed our user provided documents.", "the regulatory team reviewed the submission contained documents."),
+    ("Based on your context, add a CAPA.", "Based on regulatory requirements, add a CAPA."),
+    ("Based on The analysis remember the context.", "Based on regulatory requirements indicate the context."),
+    ("Let me outline the gaps.\n\n---\n\nIn my assessment, it is incomplete.",
+     "The following outlines the gaps.\n\nThe assessment reveals, it is incomplete."),
+    ("<b>Key gap</b>Your LDT lacks a risk file.", "Key gapThe LDT lacks a risk file."),
+    ("-## -- **Bold** and `code` stay", "Bold and code stay"),
+])
+def test_third_person_rewrite_matches_sequential_replacements(analysis, expected):
+    assert reference_third_person(analysis) == expected
+    assert convert_to_third_person_analysis(analysis) == expected
+
+
+def test_text_normalization_matches_previous_implementation_on_random_text():
+    fragments = [phrase for phrase, _ in THIRD_PERSON_REPLACEMENTS if '\\' not in phrase and '.*?' not in phrase] + [
+        "I", "you", "Your", "we", "OUR", "the user provided", "Based on", "the", "context", "Okay", "query.",
+        "The user is asking", "sections.", "**", "*", "`", "##", "---", "-", "<b>", "</b>", "&", "\n", "\n\n",
+        " \n ", "\t", "right", "re", "x", "'s", "i.e.", "%", "@", "é",
+    ]
+    rng = random.Random(20240601)
+    for _ in range(1500):
+        text = "".join(rng.choice(fragments) + rng.choice(["", " ", " ", "\n", ", ", ". "])
+                       for _ in range(rng.randint(1, 30)))
+        assert clean_markdown_for_pdf(text) == reference_clean_markdown(text), text
+        assert convert_to_third_person_analysis(text) == reference_third_person(text), text
+        assert normalize_summary_text(text) == reference_summary(text), text
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for batched multi-query retrieval
+Verifies the batched search matches per-query search with a single embedding pass
+"""
+import pytest
+
+pytest.importorskip("faiss")
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agent.knowledge_base import batch_similarity_search
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    embed_calls: int = 0
+
+    def embed_documents(self, texts):
+        self.embed_calls += 1
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.embed_calls += 1
+        return super().embed_query(text)
+
+
+SECTIONS = ["Intended Use", "Precision", "Accuracy", "Reference Range"]
+
+
+@pytest.fixture
+def store():
+    docs = [Document(page_content=f"Guidance chunk {i}", metadata={"source": f"doc{i % 3}.pdf"}) for i in range(30)]
+    # Exact duplicates of section names make overlapping hits likely
+    docs += [Document(page_content=name) for name in SECTIONS]
+    return FAISS.from_documents(docs, CountingEmbedding(size=16))
+
+
+def looped_search(store, queries, k):
+    merged, seen = [], set()
+    for query in queries:
+        for doc in store.similarity_search(query, k=k):
+            if doc.id not in seen:
+                seen.add(doc.id)
+                merged.append(doc)
+    return merged
+
+
+def test_batched_search_matches_looped_search(store):
+    expected = looped_search(store, SECTIONS, k=3)
+    store.embeddings.embed_calls = 0
+
+    results = batch_similarity_search(store, SECTIONS, k=3)
+
+    assert [doc.page_content for doc in results] == [doc.page_content for doc in expected]
+    assert store.embeddings.embed_calls == 1
+
+
+def test_batched_search_dedupes_by_chunk_id(store):
+    results = batch_similarity_search(store, ["Precision", "Precision"], k=5)
+
+    assert len(results) == 5
+    assert len({doc.id for doc in results}) == 5
+
+
+def test_batched_search_with_no_queries(store):
+    assert batch_similarity_search(store, [], k=3) == []
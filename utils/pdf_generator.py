@@ -1,8 +1,17 @@
 """
 Improved PDF Generation utility for LDT Compliance Reports
+
+Paragraph styles, table styles and column widths are the same for every
+report, so they are built once at import time into REPORT_STYLES and
+shared (read-only) by every generate_compliance_pdf call.
 """
 import io
+import os
+import tempfile
+from dataclasses import dataclass
 from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping, Tuple
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -12,24 +21,58 @@ from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
 import re
 import markdown
 
+# Markdown left in the text once it has been rendered to HTML and the tags
+# removed. Emphasis and code markers pair up per line, bold before italic,
+# and removing a header marker can join dashes into a rule ("-## --"), so
+# those keep their own passes, which are skipped when no marker is left
+# (the usual case, since markdown has already rendered them).
+_HTML_TAG = re.compile(r'<[^>]+>')
+_BOLD = re.compile(r'\*\*(.*?)\*\*')
+_ITALIC = re.compile(r'\*(.*?)\*')
+_CODE = re.compile(r'`(.*?)`')
+_HEADER = re.compile(r'#{1,6}\s+')
+# Blank-line runs and horizontal rules never overlap, so they are handled
+# together in one pass
+_LAYOUT = re.compile(r'(\n\s*\n)|---+')
+
+def _layout_replacement(match):
+    return '\n\n' if match.group(1) else ''
+
 def clean_markdown_for_pdf(text):
     """Clean markdown text for PDF generation"""
     # Convert markdown to HTML first
     html = markdown.markdown(text)
     
     # Remove HTML tags but keep the content
-    clean_text = re.sub(r'<[^>]+>', '', html)
+    clean_text = _HTML_TAG.sub('', html)
     
     # Clean up common markdown artifacts
-    clean_text = re.sub(r'\*\*(.*?)\*\*', r'\1', clean_text)  # Bold
-    clean_text = re.sub(r'\*(.*?)\*', r'\1', clean_text)      # Italic
-    clean_text = re.sub(r'`(.*?)`', r'\1', clean_text)        # Code
-    clean_text = re.sub(r'#{1,6}\s+', '', clean_text)         # Headers
-    clean_text = re.sub(r'\n\s*\n', '\n\n', clean_text)       # Multiple newlines
-    clean_text = re.sub(r'---+', '', clean_text)              # Horizontal rules
+    if '*' in clean_text:
+        clean_text = _BOLD.sub(r'\1', clean_text)    # Bold
+        clean_text = _ITALIC.sub(r'\1', clean_text)  # Italic
+    if '`' in clean_text:
+        clean_text = _CODE.sub(r'\1', clean_text)    # Code
+    if '#' in clean_text:
+        clean_text = _HEADER.sub('', clean_text)     # Headers
+    # Multiple newlines and horizontal rules
+    clean_text = _LAYOUT.sub(_layout_replacement, clean_text)
     
     return clean_text.strip()
 
+_NON_WORD_RUN = re.compile(r'\W+')
+
+# Characters that are not allowed in the executive summary
+_SUMMARY_UNUSUAL = re.compile(r'[^\w\s.,!?;:()\-%]+')
+
+def normalize_summary_text(text):
+    """
+    Drop unusual characters and collapse all whitespace to single spaces
+
+    str.split() splits on the same characters as \\s, so this also covers
+    the paragraph, line-end and tab clean-up that used to follow.
+    """
+    return ' '.join(_SUMMARY_UNUSUAL.sub('', text).split())
+
 def generate_natural_executive_summary(analysis_data):
     """Generate a more natural, readable executive summary"""
     score = analysis_data.get('score', 0)
@@ -56,8 +99,7 @@ def generate_natural_executive_summary(analysis_data):
         action = "immediate and comprehensive intervention"
     
     # Clean filename more aggressively - completely rebuild it
-    clean_filename = re.sub(r'[^\w]', ' ', filename)  # Replace ALL non-word chars with spaces
-    clean_filename = re.sub(r'\s+', ' ', clean_filename).strip()  # Normalize spaces
+    clean_filename = _NON_WORD_RUN.sub(' ', filename).strip()  # Replace ALL non-word chars with single spaces
     if len(clean_filename) > 50:
         clean_filename = clean_filename[:50] + "..."
     
@@ -74,6 +116,80 @@ def generate_natural_executive_summary(analysis_data):
 
     return summary
 
+# First-person and direct references, applied in order by
+# convert_to_third_person_analysis. Later patterns can match text produced
+# by earlier ones ("our user provided" -> "the user provided"), so the order
+# matters and they stay separate passes.
+THIRD_PERSON_REPLACEMENTS = [
+    (r'Okay.*?query\.', 'The regulatory analysis begins with'),
+    (r'The user is asking.*?sections\.', 'This analysis addresses missing regulatory sections.'),
+    (r'Let me start with', 'Beginning with'),
+    (r'The analysis remember', 'regulatory requirements indicate'),
+    (r'The analysis should', 'The assessment must'),
+    (r'The analysis need to', 'It is necessary to'),
+    (r'The analysis get those right', 'ensure accuracy'),
+    (r'From what The analysis remember', 'Based on regulatory standards'),
+    (r'The user wants specific CFR sections', 'Specific CFR citations are required'),
+    (r'the submission contained some bullet points', 'the submission included limited information'),
+    (r'The analysis need to expand on that', 'further detail is required'),
+    (r'The user mentioned', 'The submission referenced'),
+    (r'The analysis\'m missing', 'additional consideration of'),
+    (r'Let me check if', 'It is important to verify'),
+    (r'Wait, the user mentioned', 'Additionally,'),
+    (r'The analysis need to structure', 'The assessment must organize'),
+    (r'Let me outline', 'The following outlines'),
+    (r'Double-checking the regulatory references to ensure accuracy', 'Regulatory citations have been verified'),
+    (r'\bI\b', 'The analysis'),
+    (r'\byou\b', 'the laboratory'),
+    (r'\byour\b', 'the laboratory\'s'),
+    (r'\bwe\b', 'the regulatory team'),
+    (r'\bour\b', 'the'),
+    (r'the user provided', 'the submission contained'),
+    (r'Based on the.*?context', 'Based on regulatory requirements'),
+    (r'I recommend', 'It is recommended'),
+    (r'You should', 'The laboratory should'),
+    (r'You need to', 'The laboratory needs to'),
+    (r'Your submission', 'The submission'),
+    (r'Your LDT', 'The LDT'),
+    (r'As a regulatory expert', 'The regulatory analysis indicates'),
+    (r'In my assessment', 'The assessment reveals'),
+]
+
+def _required_text(pattern):
+    """Lowercased literal pieces that any match of a replacement pattern contains"""
+    return [re.sub(r'\\(.)', r'\1', piece).lower() for piece in re.split(r'\\b|\.\*\?', pattern) if piece]
+
+def _compile_third_person_passes(replacements):
+    """
+    Precompile the replacements into passes of (pattern, replacement,
+    required text). Consecutive whole-word replacements (the pronouns) are
+    merged into one pass: they are distinct words and none of their
+    replacements contains another, so one pass gives the same text.
+    """
+    passes = []
+    words = []
+
+    def flush_words():
+        if words:
+            outputs = [replacement for _, replacement in words]
+            pattern = r'\b(?:' + '|'.join(f'({word})' for word, _ in words) + r')\b'
+            passes.append((re.compile(pattern, re.IGNORECASE),
+                           lambda match: outputs[match.lastindex - 1],
+                           []))
+            words.clear()
+
+    for pattern, replacement in replacements:
+        word = re.fullmatch(r'\\b(\w+)\\b', pattern)
+        if word:
+            words.append((word.group(1), replacement))
+            continue
+        flush_words()
+        passes.append((re.compile(pattern, re.IGNORECASE), replacement, _required_text(pattern)))
+    flush_words()
+    return passes
+
+_THIRD_PERSON_PASSES = _compile_third_person_passes(THIRD_PERSON_REPLACEMENTS)
+
 def convert_to_third_person_analysis(ai_analysis):
     """Convert LLM reasoning to third-person regulatory analysis"""
     if not ai_analysis:
@@ -87,45 +203,16 @@ def convert_to_third_person_analysis(ai_analysis):
         # This is clearly LLM reasoning, replace with a proper regulatory analysis
         return generate_professional_regulatory_analysis(clean_text)
     
-    # Replace first-person and direct references
-    replacements = [
-        (r'Okay.*?query\.', 'The regulatory analysis begins with'),
-        (r'The user is asking.*?sections\.', 'This analysis addresses missing regulatory sections.'),
-        (r'Let me start with', 'Beginning with'),
-        (r'The analysis remember', 'regulatory requirements indicate'),
-        (r'The analysis should', 'The assessment must'),
-        (r'The analysis need to', 'It is necessary to'),
-        (r'The analysis get those right', 'ensure accuracy'),
-        (r'From what The analysis remember', 'Based on regulatory standards'),
-        (r'The user wants specific CFR sections', 'Specific CFR citations are required'),
-        (r'the submission contained some bullet points', 'the submission included limited information'),
-        (r'The analysis need to expand on that', 'further detail is required'),
-        (r'The user mentioned', 'The submission referenced'),
-        (r'The analysis\'m missing', 'additional consideration of'),
-        (r'Let me check if', 'It is important to verify'),
-        (r'Wait, the user mentioned', 'Additionally,'),
-        (r'The analysis need to structure', 'The assessment must organize'),
-        (r'Let me outline', 'The following outlines'),
-        (r'Double-checking the regulatory references to ensure accuracy', 'Regulatory citations have been verified'),
-        (r'\bI\b', 'The analysis'),
-        (r'\byou\b', 'the laboratory'),
-        (r'\byour\b', 'the laboratory\'s'),
-        (r'\bwe\b', 'the regulatory team'),
-        (r'\bour\b', 'the'),
-        (r'the user provided', 'the submission contained'),
-        (r'Based on the.*?context', 'Based on regulatory requirements'),
-        (r'I recommend', 'It is recommended'),
-        (r'You should', 'The laboratory should'),
-        (r'You need to', 'The laboratory needs to'),
-        (r'Your submission', 'The submission'),
-        (r'Your LDT', 'The LDT'),
-        (r'As a regulatory expert', 'The regulatory analysis indicates'),
-        (r'In my assessment', 'The assessment reveals'),
-    ]
-    
-    for pattern, replacement in replacements:
-        clean_text = re.sub(pattern, replacement, clean_text, flags=re.IGNORECASE)
-    
+    # Replace first-person and direct references, skipping passes whose
+    # text is not there. The check is exact for ASCII text; other text
+    # (where case-insensitive matching differs from str.lower) runs them all.
+    lowered = clean_text.lower() if clean_text.isascii() else None
+    for pattern, replacement, required in _THIRD_PERSON_PASSES:
+        if lowered is not None and not all(text in lowered for text in required):
+            continue
+        clean_text, count = pattern.subn(replacement, clean_text)
+        if count and lowered is not None:
+            lowered = clean_text.lower()
     return clean_text
 
 def generate_professional_regulatory_analysis(raw_analysis):
@@ -171,33 +258,49 @@ Successful remediation requires systematic approach to documentation development
 
     return analysis
 
-def generate_compliance_pdf(report_data):
-    """
-    Generate a professional PDF report for LDT compliance analysis
-    
-    Args:
-        report_data: Dictionary containing report information
-        
-    Returns:
-        BytesIO object containing the PDF
-    """
+def describe_section_location(locations, style):
+    """Cite where a present section was found: page number and evidence snippet"""
+    if not locations:
+        return ''
+    location = locations[0]
+    page = f"Page {location['page']}: " if location.get('page') else ''
+    snippet = location.get('snippet', '').replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return Paragraph(f'{page}<i>"{snippet}"</i>', style)
 
-    buffer = io.BytesIO()
-    
-    # Create document
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=72,
-        leftMargin=72,
-        topMargin=72,
-        bottomMargin=72
-    )
-    
-    # Define styles
+@dataclass(frozen=True)
+class ReportStyles:
+    """Styles shared by every compliance report; never modify them in place"""
+    title: ParagraphStyle
+    heading: ParagraphStyle
+    subheading: ParagraphStyle
+    body: ParagraphStyle
+    table_cell: ParagraphStyle
+    score_pass: ParagraphStyle
+    score_fail: ParagraphStyle
+    # Score interpretation style by text color
+    interpretation: Mapping[str, ParagraphStyle]
+    info_table: TableStyle
+    gap_table: TableStyle
+    present_table: TableStyle
+    info_col_widths: Tuple[float, ...]
+    gap_col_widths: Tuple[float, ...]
+    present_col_widths: Tuple[float, ...]
+
+PASS_COLOR = '#10b981'
+WARN_COLOR = '#f59e0b'
+FAIL_COLOR = '#ef4444'
+
+# (minimum score, interpretation, color), highest band first
+SCORE_BANDS = (
+    (90, "Excellent - Ready for submission", PASS_COLOR),
+    (70, "Good - Minor improvements needed", PASS_COLOR),
+    (40, "Moderate - Significant gaps identified", WARN_COLOR),
+    (float('-inf'), "Critical - Immediate action required", FAIL_COLOR),
+)
+
+def _build_report_styles():
     styles = getSampleStyleSheet()
     
-    # Custom styles
     title_style = ParagraphStyle(
         'CustomTitle',
         parent=styles['Title'],
@@ -237,15 +340,141 @@ def generate_compliance_pdf(report_data):
         rightIndent=0
     )
     
-    score_style = ParagraphStyle(
-        'ScoreStyle',
+    table_cell_style = ParagraphStyle(
+        'TableCell',
         parent=styles['Normal'],
-        fontSize=48,  # Slightly smaller to prevent overlap
-        alignment=TA_CENTER,
-        textColor=HexColor('#10b981') if report_data.get('score', 0) >= 70 else HexColor('#ef4444'),
-        spaceAfter=0,   # No space - using explicit Spacer instead
-        spaceBefore=15
+        fontSize=9,
+        leading=11,
+        alignment=TA_LEFT
+    )
+    
+    def score_style(color):
+        return ParagraphStyle(
+            'ScoreStyle',
+            parent=styles['Normal'],
+            fontSize=48,  # Slightly smaller to prevent overlap
+            alignment=TA_CENTER,
+            textColor=HexColor(color),
+            spaceAfter=0,   # No space - using explicit Spacer instead
+            spaceBefore=15
+        )
+    
+    def interpretation_style(color):
+        return ParagraphStyle(
+            'InterpStyle',
+            parent=body_style,
+            fontSize=13,  # Slightly smaller
+            alignment=TA_CENTER,
+            textColor=HexColor(color),
+            spaceBefore=0,   # No space since we have explicit Spacer above
+            spaceAfter=35
+        )
+    
+    info_table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), HexColor('#f8fafc')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Changed to TOP for better text alignment
+        ('LEFTPADDING', (0, 0), (-1, -1), 12),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 12),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('WORDWRAP', (0, 0), (-1, -1), 'LTR'),  # Enable word wrapping
+    ])
+    
+    gap_table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#dc2626')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), white),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),  # Smaller font to prevent overflow
+        ('GRID', (0, 0), (-1, -1), 1, black),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ])
+    
+    present_table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#16a34a')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), white),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, black),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ])
+    
+    return ReportStyles(
+        title=title_style,
+        heading=heading_style,
+        subheading=subheading_style,
+        body=body_style,
+        table_cell=table_cell_style,
+        score_pass=score_style(PASS_COLOR),
+        score_fail=score_style(FAIL_COLOR),
+        interpretation=MappingProxyType({
+            color: interpretation_style(color) for color in (PASS_COLOR, WARN_COLOR, FAIL_COLOR)
+        }),
+        info_table=info_table_style,
+        gap_table=gap_table_style,
+        present_table=present_table_style,
+        info_col_widths=(2*inch, 4.5*inch),
+        # FIXED: Better column widths to prevent overflow
+        gap_col_widths=(2.2*inch, 3.5*inch, 0.8*inch),
+        present_col_widths=(1.8*inch, 1.2*inch, 3.5*inch)
     )
+
+REPORT_STYLES = _build_report_styles()
+
+def score_interpretation(score):
+    """Return (interpretation text, color) for a compliance score"""
+    for minimum, interpretation, color in SCORE_BANDS:
+        if score >= minimum:
+            return interpretation, color
+
+def generate_compliance_pdf(report_data, output=None):
+    """
+    Generate a professional PDF report for LDT compliance analysis
+    
+    Args:
+        report_data: Dictionary containing report information
+        output: File path or binary file to write the PDF to (default: a new BytesIO)
+        
+    Returns:
+        output, or the BytesIO containing the PDF
+    """
+
+    buffer = io.BytesIO() if output is None else output
+    
+    # Create document
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=72
+    )
+    
+    styles = REPORT_STYLES
+    title_style = styles.title
+    heading_style = styles.heading
+    subheading_style = styles.subheading
+    body_style = styles.body
+    table_cell_style = styles.table_cell
+    score_style = styles.score_pass if report_data.get('score', 0) >= 70 else styles.score_fail
     
     # Build story
     story = []
@@ -266,22 +495,8 @@ def generate_compliance_pdf(report_data):
         ['Document Analyzed:', filename]
     ]
     
-    info_table = Table(report_info, colWidths=[2*inch, 4.5*inch])
-    info_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), HexColor('#f8fafc')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Changed to TOP for better text alignment
-        ('LEFTPADDING', (0, 0), (-1, -1), 12),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('WORDWRAP', (0, 0), (-1, -1), 'LTR'),  # Enable word wrapping
-    ]))
+    info_table = Table(report_info, colWidths=list(styles.info_col_widths))
+    info_table.setStyle(styles.info_table)
     story.append(info_table)
     story.append(Spacer(1, 40))
     
@@ -295,28 +510,8 @@ def generate_compliance_pdf(report_data):
     story.append(Spacer(1, 50))  # 50 points of space - much larger gap
     
     # Score interpretation - UNDERNEATH the score
-    if score >= 90:
-        interpretation = "Excellent - Ready for submission"
-        color = HexColor('#10b981')
-    elif score >= 70:
-        interpretation = "Good - Minor improvements needed"  
-        color = HexColor('#10b981')
-    elif score >= 40:
-        interpretation = "Moderate - Significant gaps identified"
-        color = HexColor('#f59e0b')
-    else:
-        interpretation = "Critical - Immediate action required"
-        color = HexColor('#ef4444')
-    
-    interp_style = ParagraphStyle(
-        'InterpStyle',
-        parent=body_style,
-        fontSize=13,  # Slightly smaller
-        alignment=TA_CENTER,
-        textColor=color,
-        spaceBefore=0,   # No space since we have explicit Spacer above
-        spaceAfter=35
-    )
+    interpretation, color = score_interpretation(score)
+    interp_style = styles.interpretation[color]
 
     story.append(Paragraph(interpretation, interp_style))
     
@@ -329,12 +524,7 @@ def generate_compliance_pdf(report_data):
 
     
     # SUPER AGGRESSIVE text cleaning - rebuild the text completely
-    natural_summary = re.sub(r'[^\w\s\.\,\!\?\;\:\(\)\-\%]', '', natural_summary)  # Remove weird characters
-    natural_summary = re.sub(r'\s+', ' ', natural_summary)  # Replace multiple spaces with single space
-    natural_summary = re.sub(r'\n\s*\n', '\n\n', natural_summary)  # Fix paragraph breaks
-    natural_summary = re.sub(r'^\s+|\s+$', '', natural_summary, flags=re.MULTILINE)  # Trim line ends
-    natural_summary = natural_summary.replace('\t', ' ')  # Replace tabs with spaces
-    natural_summary = natural_summary.strip()  # Trim overall
+    natural_summary = normalize_summary_text(natural_summary)
     
     paragraphs = natural_summary.split('\n\n')
     for para in paragraphs:
@@ -359,22 +549,8 @@ def generate_compliance_pdf(report_data):
             truncated_desc = description[:100] + "..." if len(description) > 100 else description
             gap_data.append([section, truncated_desc, 'HIGH'])
         
-        # FIXED: Better column widths to prevent overflow
-        gap_table = Table(gap_data, colWidths=[2.2*inch, 3.5*inch, 0.8*inch])
-        gap_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#dc2626')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),  # Smaller font to prevent overflow
-            ('GRID', (0, 0), (-1, -1), 1, black),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        gap_table = Table(gap_data, colWidths=list(styles.gap_col_widths))
+        gap_table.setStyle(styles.gap_table)
         story.append(gap_table)
     else:
         story.append(Paragraph("✓ COMPLIANCE ACHIEVED - All required sections are present in the submission.", body_style))
@@ -386,25 +562,13 @@ def generate_compliance_pdf(report_data):
     
     if present_sections:
         # Create table for present sections with better formatting
-        present_data = [['Section', 'Status']]
+        section_locations = report_data.get('section_locations') or {}
+        present_data = [['Section', 'Status', 'Location in Submission']]
         for section in present_sections:
-            present_data.append([section, '✓ Compliant'])
+            present_data.append([section, '✓ Compliant', describe_section_location(section_locations.get(section), table_cell_style)])
         
-        present_table = Table(present_data, colWidths=[4*inch, 2*inch])
-        present_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#16a34a')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, black),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        present_table = Table(present_data, colWidths=list(styles.present_col_widths))
+        present_table.setStyle(styles.present_table)
         story.append(present_table)
     else:
         story.append(Paragraph("No required sections have been identified in the current submission.", body_style))
@@ -426,5 +590,22 @@ def generate_compliance_pdf(report_data):
     
     # Build PDF
     doc.build(story)
-    buffer.seek(0)
-    return buffer
\ No newline at end of file
+    if output is None:
+        buffer.seek(0)
+    return buffer
+
+def write_compliance_pdf(report_data, directory=None):
+    """
+    Render a report into a new temporary file and return its path
+    
+    Lets a worker process hand back a path instead of the PDF bytes; the
+    caller streams the file and deletes it.
+    """
+    fd, path = tempfile.mkstemp(prefix="ldt-report-", suffix=".pdf", dir=directory)
+    os.close(fd)
+    try:
+        generate_compliance_pdf(report_data, path)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
\ No newline at end of file